@@ -0,0 +1,5 @@
+"""Performance benchmarks for the core engines.
+
+Run with `python -m benchmarks.run` from the repository root, and compare two
+runs with `python -m benchmarks.compare`.
+"""
@@ -0,0 +1,137 @@
+"""Benchmark cases.
+
+Each case is a function taking a size and returning the result of the
+computation, which is checksummed so that comparisons can also detect changes
+in results. Cases should construct their own dice rather than using module
+constants such as `icepool.d6`, since dice cache some of their results.
+"""
+
+import icepool
+from icepool.evaluator import (JointEvaluator, LargestCountEvaluator,
+                               SumEvaluator)
+
+from typing import Any, Callable, NamedTuple
+
+SIZES = ('small', 'medium', 'large')
+"""The size names, from fastest to slowest."""
+
+
+class Case(NamedTuple):
+    """A benchmark case."""
+    name: str
+    """The name of the case, unique within the suite."""
+    function: Callable[[int], Any]
+    """A function taking the size parameter and returning a result."""
+    sizes: dict[str, int]
+    """A map from size name to the size parameter."""
+
+
+CASES: list[Case] = []
+
+
+def case(**sizes: int) -> Callable[[Callable[[int], Any]], Callable[[int], Any]]:
+    """Registers a benchmark case under the function's name."""
+
+    def decorator(function: Callable[[int], Any]) -> Callable[[int], Any]:
+        CASES.append(Case(function.__name__, function, sizes))
+        return function
+
+    return decorator
+
+
+@case(small=30, medium=100, large=300)
+def pool_keep_sum(n: int):
+    """Sum of the highest 3 of `n` d6."""
+    return icepool.d(6).pool(n).highest(3).sum()
+
+
+@case(small=10, medium=30, large=100)
+def mixed_pool_sum(n: int):
+    """Sum of `n` each of d6, d8, d10, and d12."""
+    pool = icepool.Pool([icepool.d(sides) for sides in (6, 8, 10, 12)] * n)
+    return pool.sum()
+
+
+@case(small=4, medium=8, large=16)
+def mixed_pool_keep_sum(n: int):
+    """Sum of the middle of `n` each of d6, d8, d10, and d12."""
+    pool = icepool.Pool([icepool.d(sides) for sides in (6, 8, 10, 12)] * n)
+    return pool.middle(n).sum()
+
+
+@case(small=4, medium=8, large=16)
+def cortex_pool_largest_count(n: int):
+    """Largest matching set of `n` each of d4, d6, d8, d10, and d12.
+
+    The dice remain distinct after popping low outcomes, so each such pop
+    takes the product over all of their hit counts.
+    """
+    pool = icepool.Pool(
+        [icepool.d(sides) for sides in (4, 6, 8, 10, 12)] * n)
+    return pool.largest_count()
+
+
+@case(small=5, medium=21, large=51)
+def mixed_pool_median(n: int):
+    """Median of `n` each of d6, d8, d10, and d12."""
+    pool = icepool.Pool([icepool.d(sides) for sides in (6, 8, 10, 12)] * n)
+    return pool[2 * n]
+
+
+@case(small=5, medium=10, large=20)
+def deal_largest_count(n: int):
+    """Largest matching set in a hand of `n` cards from a 52-card deck."""
+    deck = icepool.Deck(range(1, 14), times=4)
+    return deck.deal(n).largest_count()
+
+
+@case(small=30, medium=100, large=300)
+def map_repeat_none(n: int):
+    """Gambler's ruin starting from `n // 2` with a target of `n`."""
+
+    def step(x: int):
+        if x <= 0 or x >= n:
+            return x
+        return x + icepool.Die([-1, 1])
+
+    return icepool.map(step, n // 2, repeat=None)
+
+
+@case(small=5, medium=20, large=50)
+def again_depth(n: int):
+    """An exploding d6 with `again_depth=n`."""
+    return icepool.Die([1, 2, 3, 4, 5, 6 + icepool.Again], again_depth=n)
+
+
+@case(small=4, medium=8, large=16)
+def again_count(n: int):
+    """An exploding d6 with `again_count=n`."""
+    return icepool.Die([1, 2, 3, 4, 5, 6 + icepool.Again], again_count=n)
+
+
+@case(small=20, medium=60, large=120)
+def matmul_sum(n: int):
+    """Sum of `n` d20."""
+    return n @ icepool.d(20)
+
+
+@case(small=20, medium=60, large=200)
+def matmul_die(n: int):
+    """Sum of d`n` d6."""
+    return icepool.d(n) @ icepool.d(6)
+
+
+@case(small=6, medium=10, large=16)
+def joint_evaluator(n: int):
+    """Sum and largest count of `n` d10 together."""
+    evaluator = JointEvaluator(SumEvaluator(), LargestCountEvaluator())
+    return evaluator.evaluate(icepool.d(10).pool(n))
+
+
+@case(small=3, medium=5, large=7)
+def expression_chain(n: int):
+    """Sum of unique elements of a difference and union of pools."""
+    a = icepool.d(8).pool(n)
+    b = icepool.d(8).pool(n // 2)
+    c = icepool.d(6).pool(n // 2)
+    return ((a - b) | c).unique().sum()
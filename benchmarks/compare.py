@@ -0,0 +1,168 @@
+"""Compares benchmark results against a baseline and flags regressions.
+
+Usage:
+
+```
+python -m benchmarks.compare baseline.json current.json
+                             [--threshold 0.2] [--min-time 0.001]
+                             [--statistic min]
+```
+
+A case is flagged as a regression if its time increased by more than
+`threshold` as a fraction of the baseline time and by more than `min-time`
+seconds. Cases whose results changed are also flagged. The exit status is 1 if
+anything was flagged and 0 otherwise.
+"""
+
+import argparse
+import json
+import sys
+
+from benchmarks.run import FORMAT
+
+from typing import Any, Iterable, NamedTuple
+
+
+class Comparison(NamedTuple):
+    """The comparison of a single benchmark between two runs."""
+    key: str
+    """The full name of the benchmark, `case[size]`."""
+    baseline: float | None
+    """The baseline time in seconds, or `None` if the case is new."""
+    current: float | None
+    """The current time in seconds, or `None` if the case was removed."""
+    status: str
+    """One of `'ok'`, `'regression'`, `'improvement'`, `'changed'`, `'new'`,
+    or `'missing'`."""
+
+    @property
+    def ratio(self) -> float | None:
+        """`current / baseline`, or `None` if either is missing."""
+        if self.baseline is None or self.current is None or self.baseline == 0:
+            return None
+        return self.current / self.baseline
+
+    @property
+    def flagged(self) -> bool:
+        """Whether this comparison should fail the check."""
+        return self.status in ('regression', 'changed')
+
+
+def load(path: str) -> dict[str, Any]:
+    """Loads results written by `benchmarks.run`.
+
+    Raises:
+        ValueError: If the file is in a different format version.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if data.get('format') != FORMAT:
+        raise ValueError(
+            f'{path} has format {data.get("format")!r}, expected {FORMAT}.')
+    return data
+
+
+def compare(baseline: dict[str, Any],
+            current: dict[str, Any],
+            *,
+            threshold: float = 0.2,
+            min_time: float = 0.001,
+            statistic: str = 'min') -> list[Comparison]:
+    """Compares two sets of results.
+
+    Args:
+        baseline, current: Results in the format written by `benchmarks.run`.
+        threshold: The fraction by which a time must increase or decrease to
+            be flagged.
+        min_time: The number of seconds by which a time must increase or
+            decrease to be flagged. This avoids flagging noise in very fast
+            cases.
+        statistic: Which statistic to compare, `'min'` or `'median'`.
+
+    Returns:
+        A `Comparison` for each case in either set, in the order of the
+        baseline followed by any new cases.
+    """
+    baseline_results = baseline['results']
+    current_results = current['results']
+    result = []
+    for key, old in baseline_results.items():
+        if key not in current_results:
+            result.append(Comparison(key, old[statistic], None, 'missing'))
+            continue
+        new = current_results[key]
+        old_time = old[statistic]
+        new_time = new[statistic]
+        if old['checksum'] != new['checksum']:
+            status = 'changed'
+        elif (new_time > old_time * (1 + threshold)
+              and new_time - old_time > min_time):
+            status = 'regression'
+        elif (new_time < old_time / (1 + threshold)
+              and old_time - new_time > min_time):
+            status = 'improvement'
+        else:
+            status = 'ok'
+        result.append(Comparison(key, old_time, new_time, status))
+    for key, new in current_results.items():
+        if key not in baseline_results:
+            result.append(Comparison(key, None, new[statistic], 'new'))
+    return result
+
+
+def format_table(comparisons: Iterable[Comparison]) -> str:
+    """Formats comparisons as a plain-text table."""
+
+    def format_time(t: float | None) -> str:
+        return '-' if t is None else f'{t:.4f}'
+
+    lines = [
+        f'{"benchmark":<40} {"baseline":>10} {"current":>10} {"ratio":>7}  status'
+    ]
+    for comparison in comparisons:
+        ratio = comparison.ratio
+        lines.append(f'{comparison.key:<40} '
+                     f'{format_time(comparison.baseline):>10} '
+                     f'{format_time(comparison.current):>10} '
+                     f'{"-" if ratio is None else f"{ratio:.2f}":>7}  '
+                     f'{comparison.status.upper() if comparison.flagged else comparison.status}')
+    return '\n'.join(lines)
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline', help='Baseline results JSON.')
+    parser.add_argument('current', help='Current results JSON.')
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.2,
+        help='Fractional slowdown to flag as a regression. Default: 0.2.')
+    parser.add_argument(
+        '--min-time',
+        type=float,
+        default=0.001,
+        help='Absolute slowdown in seconds required to flag. Default: 0.001.')
+    parser.add_argument('--statistic',
+                        choices=('min', 'median'),
+                        default='min',
+                        help='Statistic to compare. Default: min.')
+    args = parser.parse_args(None if argv is None else list(argv))
+
+    baseline = load(args.baseline)
+    current = load(args.current)
+    comparisons = compare(baseline,
+                          current,
+                          threshold=args.threshold,
+                          min_time=args.min_time,
+                          statistic=args.statistic)
+    print(format_table(comparisons))
+    flagged = [comparison for comparison in comparisons if comparison.flagged]
+    if flagged:
+        print(f'\n{len(flagged)} benchmark(s) flagged.')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
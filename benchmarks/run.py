@@ -0,0 +1,190 @@
+"""Runs the benchmark suite and writes the results as JSON.
+
+Usage:
+
+```
+python -m benchmarks.run [--sizes small,medium] [--filter REGEX]
+                         [--repeat N] [--output results.json]
+```
+
+Each repetition starts from cold caches. The output has the form:
+
+```
+{
+    "format": 1,
+    "environment": {"icepool": ..., "python": ..., ...},
+    "results": {
+        "<case>[<size>]": {
+            "case": ..., "size": ..., "n": ...,
+            "times": [...], "min": ..., "median": ..., "checksum": ...
+        },
+        ...
+    }
+}
+```
+
+Times are in seconds. `checksum` identifies the result of the computation, so
+that a comparison can also detect changed results.
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import platform
+import re
+import statistics
+import sys
+import time
+
+import icepool
+from icepool.evaluator.multiset_evaluator import MultisetEvaluator
+
+from benchmarks.cases import CASES, SIZES, Case
+
+from typing import Any, Iterable, Sequence
+
+FORMAT = 1
+"""The version of the JSON output format."""
+
+
+def reset_caches() -> None:
+    """Clears the global caches so that each repetition starts cold.
+
+    Caches that do not exist in the installed version of icepool are skipped,
+    so that a baseline can be taken with an older version.
+    """
+    icepool.d.cache_clear()
+    icepool.Pool.clear_cache()
+    if hasattr(MultisetEvaluator, 'set_default_cache'):
+        MultisetEvaluator.set_default_cache(None)
+    if hasattr(MultisetEvaluator, 'clear_interned_caches'):
+        MultisetEvaluator.clear_interned_caches()
+    if hasattr(icepool, 'set_persistent_cache'):
+        icepool.set_persistent_cache(None)
+    # Module-level evaluators such as `sum_evaluator` keep their caches.
+    for obj in gc.get_objects():
+        if isinstance(obj, MultisetEvaluator):
+            obj.__dict__.pop('_cache', None)
+    gc.collect()
+
+
+def checksum(result: Any) -> str:
+    """A stable digest of a benchmark result."""
+    if isinstance(result, icepool.Population):
+        data = repr(tuple(result.items()))
+    else:
+        data = repr(result)
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+def environment() -> dict[str, str]:
+    """Information about the environment the benchmarks ran in."""
+    return {
+        'icepool': icepool.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def run_case(case: Case, size: str, repeat: int) -> dict[str, Any]:
+    """Times a single case at a single size."""
+    n = case.sizes[size]
+    times = []
+    digest = None
+    for _ in range(repeat):
+        reset_caches()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = case.function(n)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+        digest = checksum(result)
+    return {
+        'case': case.name,
+        'size': size,
+        'n': n,
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'checksum': digest,
+    }
+
+
+def run(sizes: Sequence[str] = SIZES,
+        pattern: str | None = None,
+        repeat: int = 5,
+        log=None) -> dict[str, Any]:
+    """Runs the suite.
+
+    Args:
+        sizes: Which sizes to run.
+        pattern: If provided, only cases whose full names (`case[size]`)
+            match this regular expression are run.
+        repeat: The number of times to run each case.
+        log: If provided, a file to write progress to.
+
+    Returns:
+        The results in the JSON output format.
+    """
+    results = {}
+    for case in CASES:
+        for size in sizes:
+            if size not in case.sizes:
+                continue
+            key = f'{case.name}[{size}]'
+            if pattern is not None and not re.search(pattern, key):
+                continue
+            results[key] = run_case(case, size, repeat)
+            if log is not None:
+                print(f'{key:<40} {results[key]["min"]:10.4f} s',
+                      file=log,
+                      flush=True)
+    return {
+        'format': FORMAT,
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes',
+                        default=','.join(SIZES),
+                        help='Comma-separated sizes to run. Default: all.')
+    parser.add_argument('--filter',
+                        default=None,
+                        help='Only run cases matching this regex.')
+    parser.add_argument('--repeat',
+                        type=int,
+                        default=5,
+                        help='Repetitions per case. Default: 5.')
+    parser.add_argument('--output',
+                        default=None,
+                        help='File to write the JSON to. Default: stdout.')
+    args = parser.parse_args(None if argv is None else list(argv))
+
+    sizes = [size for size in args.sizes.split(',') if size]
+    for size in sizes:
+        if size not in SIZES:
+            parser.error(f'Unknown size {size!r}.')
+    if args.repeat < 1:
+        parser.error('--repeat must be positive.')
+
+    data = run(sizes, args.filter, args.repeat, log=sys.stderr)
+    text = json.dumps(data, indent=2, sort_keys=True)
+    if args.output is None:
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -131,6 +131,12 @@ from icepool.generator.mixture import MixtureGenerator
 from icepool.generator.multiset_generator import MultisetGenerator, InitialMultisetGenerator, NextMultisetGenerator
 from icepool.generator.alignment import Alignment
 from icepool.evaluator.multiset_evaluator import MultisetEvaluator
+from icepool.evaluator.many import evaluate_many
+from icepool.cache import LRUCache, CacheStats, PersistentCache, set_persistent_cache
+from icepool.instrumentation import (EvaluationMetrics, instrument,
+                                     add_evaluation_callback,
+                                     remove_evaluation_callback)
+from icepool.precision import set_precision, get_precision
 
 from icepool.population.deck import Deck
 from icepool.generator.deal import Deal
@@ -152,6 +158,10 @@ __all__ = [
     'align', 'align_range', 'commonize_denominator', 'reduce', 'accumulate',
     'map', 'map_function', 'map_and_time', 'map_to_pool', 'Reroll',
     'RerollType', 'Pool', 'standard_pool', 'MultisetGenerator', 'Alignment',
-    'MultisetExpression', 'MultisetEvaluator', 'Order', 'Deck', 'Deal',
-    'multiset_function', 'function', 'typing', 'evaluator'
+    'MultisetExpression', 'MultisetEvaluator', 'evaluate_many', 'Order',
+    'Deck', 'Deal', 'multiset_function', 'function', 'typing', 'evaluator',
+    'LRUCache', 'CacheStats', 'PersistentCache', 'set_persistent_cache',
+    'EvaluationMetrics', 'instrument', 'add_evaluation_callback',
+    'remove_evaluation_callback',
+    'set_precision', 'get_precision'
 ]
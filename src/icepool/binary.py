@@ -0,0 +1,341 @@
+"""Compact binary serialization for `Die`, `Deck`, and `Counts`.
+
+The format consists of a header followed by an outcome column and a quantity
+column. Columns of `int` outcomes, `float` outcomes, and quantities that fit in
+64 bits are stored as packed little-endian arrays of the narrowest sufficient
+width, aligned to their item size, so they can be viewed without copying using
+`read_columns()`. Larger quantities are stored as fixed-width little-endian
+limbs. `str` outcomes are stored as UTF-8, and other outcomes as tagged values
+built from `None`, `bool`, `int`, `float`, `Fraction`, `str`, `tuple`, and
+`Vector`. Other outcome types cannot be serialized. Loading never executes code from the data.
+
+Layout:
+
+* 4 bytes: `b'ICPL'`.
+* 1 byte: Format version.
+* 1 byte: Kind, one of `D` (`Die`), `K` (`Deck`), or `C` (`Counts`).
+* 1 byte: Outcome column type, one of `b`, `h`, `i`, `q` (8, 16, 32, or 64
+    bit signed integers), `d` (float64), `s` (str), or `t` (tagged values).
+* 1 byte: Quantity column type, one of `B`, `H`, `I`, `Q` (8, 16, 32, or 64
+    bit unsigned integers), `L` (unsigned limbs), or `V` (zigzag varints).
+* varint: The number of outcomes.
+* The outcome column, then the quantity column.
+"""
+
+__docformat__ = 'google'
+
+import icepool
+from icepool.collection.counts import Counts
+
+from array import array
+from fractions import Fraction
+import struct
+import sys
+
+from typing import Any, Sequence
+
+MAGIC = b'ICPL'
+VERSION = 1
+
+_KINDS = {'D': 'Die', 'K': 'Deck', 'C': 'Counts'}
+
+# Typecodes of packed columns, narrowest first.
+_SIGNED_TYPES = 'bhiq'
+_UNSIGNED_TYPES = 'BHIQ'
+_FIXED_TYPES = _SIGNED_TYPES + _UNSIGNED_TYPES + 'd'
+
+
+def _itemsize(typecode: str) -> int:
+    return array(typecode).itemsize
+
+
+def _narrowest(typecode_options: str, low: int, high: int) -> str | None:
+    """The narrowest typecode that can represent all values in `[low, high]`."""
+    for typecode in typecode_options:
+        bits = 8 * _itemsize(typecode)
+        if typecode.islower():
+            if -(1 << (bits - 1)) <= low and high < (1 << (bits - 1)):
+                return typecode
+        elif low >= 0 and high < (1 << bits):
+            return typecode
+    return None
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(data: memoryview, offset: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, offset
+        shift += 7
+
+
+def _write_fixed(out: bytearray, typecode: str, values: Sequence) -> None:
+    # Align to the item size.
+    out.extend(bytes(-len(out) % _itemsize(typecode)))
+    column = array(typecode, values)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    out.extend(column.tobytes())
+
+
+def _read_fixed(data: memoryview, offset: int, typecode: str,
+                n: int) -> tuple[Sequence, int]:
+    """Reads a fixed-width column, without copying if possible."""
+    itemsize = _itemsize(typecode)
+    offset += -offset % itemsize
+    end = offset + itemsize * n
+    view = data[offset:end]
+    if sys.byteorder == 'little':
+        return view.cast(typecode), end
+    column = array(typecode, view.tobytes())
+    column.byteswap()
+    return column, end
+
+
+def _write_zigzag(out: bytearray, value: int) -> None:
+    _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+def _read_zigzag(data: memoryview, offset: int) -> tuple[int, int]:
+    value, offset = _read_varint(data, offset)
+    return (value >> 1 if not value & 1 else -(value >> 1) - 1), offset
+
+
+def _write_tagged(out: bytearray, value: Any) -> None:
+    """Writes a single outcome with a one-byte type tag.
+
+    Raises:
+        TypeError: If the value is not of a supported type.
+    """
+    if value is None:
+        out.extend(b'n')
+    elif type(value) is bool:
+        out.extend(b'T' if value else b'F')
+    elif type(value) is int:
+        out.extend(b'i')
+        _write_zigzag(out, value)
+    elif type(value) is float:
+        out.extend(b'd')
+        out.extend(struct.pack('<d', value))
+    elif type(value) is Fraction:
+        out.extend(b'f')
+        _write_zigzag(out, value.numerator)
+        _write_varint(out, value.denominator)
+    elif type(value) is str:
+        encoded = value.encode('utf-8')
+        out.extend(b's')
+        _write_varint(out, len(encoded))
+        out.extend(encoded)
+    elif type(value) is tuple or type(value) is icepool.Vector:
+        out.extend(b't' if type(value) is tuple else b'v')
+        _write_varint(out, len(value))
+        for x in value:
+            _write_tagged(out, x)
+    else:
+        raise TypeError(
+            f'Cannot serialize outcomes of type {type(value).__name__}.')
+
+
+def _read_tagged(data: memoryview, offset: int) -> tuple[Any, int]:
+    tag = chr(data[offset])
+    offset += 1
+    if tag == 'n':
+        return None, offset
+    elif tag == 'T':
+        return True, offset
+    elif tag == 'F':
+        return False, offset
+    elif tag == 'i':
+        return _read_zigzag(data, offset)
+    elif tag == 'd':
+        return struct.unpack_from('<d', data, offset)[0], offset + 8
+    elif tag == 'f':
+        numerator, offset = _read_zigzag(data, offset)
+        denominator, offset = _read_varint(data, offset)
+        if denominator == 0:
+            raise ValueError('Fraction outcome has a zero denominator.')
+        return Fraction(numerator, denominator), offset
+    elif tag == 's':
+        length, offset = _read_varint(data, offset)
+        return str(data[offset:offset + length], 'utf-8'), offset + length
+    elif tag in 'tv':
+        length, offset = _read_varint(data, offset)
+        items = []
+        for _ in range(length):
+            item, offset = _read_tagged(data, offset)
+            items.append(item)
+        if tag == 't':
+            return tuple(items), offset
+        return icepool.Vector(items), offset
+    else:
+        raise ValueError(f'Unknown outcome tag {tag!r}.')
+
+
+def dumps(obj: 'icepool.Die | icepool.Deck | Counts') -> bytes:
+    """Serializes a `Die`, `Deck`, or `Counts` to bytes.
+
+    Raises:
+        TypeError: If `obj` or one of its outcomes is of an unsupported type.
+    """
+    if isinstance(obj, icepool.Die):
+        kind = 'D'
+        counts = obj._data
+    elif isinstance(obj, icepool.Deck):
+        kind = 'K'
+        counts = obj._data
+    elif isinstance(obj, Counts):
+        kind = 'C'
+        counts = obj
+    else:
+        raise TypeError(f'Cannot serialize {type(obj).__name__}.')
+
+    outcomes = counts.keys()
+    quantities = counts.values()
+
+    outcome_type: str | None = None
+    if all(type(outcome) is int for outcome in outcomes):
+        # Outcomes are sorted.
+        outcome_type = _narrowest(_SIGNED_TYPES, min(outcomes, default=0),
+                                  max(outcomes, default=0))
+    elif all(type(outcome) is float for outcome in outcomes):
+        outcome_type = 'd'
+    elif all(type(outcome) is str for outcome in outcomes):
+        outcome_type = 's'
+    if outcome_type is None:
+        outcome_type = 't'
+
+    min_quantity = min(quantities, default=0)
+    max_quantity = max(quantities, default=0)
+    if min_quantity >= 0:
+        quantity_type = _narrowest(_UNSIGNED_TYPES, min_quantity,
+                                   max_quantity) or 'L'
+    else:
+        quantity_type = 'V'
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    out.extend((kind + outcome_type + quantity_type).encode('ascii'))
+    _write_varint(out, len(counts))
+
+    if outcome_type in _FIXED_TYPES:
+        _write_fixed(out, outcome_type, outcomes)
+    elif outcome_type == 's':
+        for outcome in outcomes:
+            encoded = outcome.encode('utf-8')
+            _write_varint(out, len(encoded))
+            out.extend(encoded)
+    else:
+        for outcome in outcomes:
+            _write_tagged(out, outcome)
+
+    if quantity_type in _FIXED_TYPES:
+        _write_fixed(out, quantity_type, quantities)
+    elif quantity_type == 'L':
+        width = (max_quantity.bit_length() + 7) // 8
+        _write_varint(out, width)
+        for quantity in quantities:
+            out.extend(quantity.to_bytes(width, 'little'))
+    else:
+        for quantity in quantities:
+            _write_zigzag(out, quantity)
+
+    return bytes(out)
+
+
+def read_columns(data: 'bytes | bytearray | memoryview',
+                 /) -> tuple[str, Sequence[Any], Sequence[int]]:
+    """Reads the columns of serialized data without constructing an object.
+
+    Fixed-width columns are returned as `memoryview`s into `data` without
+    copying where the platform allows. Other columns are returned as `tuple`s.
+
+    Returns:
+        The kind of object (`'Die'`, `'Deck'`, or `'Counts'`), the outcomes,
+        and the quantities.
+
+    Raises:
+        ValueError: If `data` is not in this format.
+    """
+    view = memoryview(data).cast('B')
+    if bytes(view[:4]) != MAGIC:
+        raise ValueError('Data is not in icepool binary format.')
+    if view[4] != VERSION:
+        raise ValueError(f'Unsupported format version {view[4]}.')
+    kind, outcome_type, quantity_type = bytes(view[5:8]).decode('ascii')
+    if kind not in _KINDS:
+        raise ValueError(f'Unknown kind {kind!r}.')
+    n, offset = _read_varint(view, 8)
+
+    outcomes: Sequence[Any]
+    if outcome_type in _FIXED_TYPES:
+        outcomes, offset = _read_fixed(view, offset, outcome_type, n)
+    elif outcome_type == 's':
+        strings = []
+        for _ in range(n):
+            length, offset = _read_varint(view, offset)
+            strings.append(str(view[offset:offset + length], 'utf-8'))
+            offset += length
+        outcomes = tuple(strings)
+    elif outcome_type == 't':
+        values = []
+        for _ in range(n):
+            value, offset = _read_tagged(view, offset)
+            values.append(value)
+        outcomes = tuple(values)
+    else:
+        raise ValueError(f'Unknown outcome column type {outcome_type!r}.')
+
+    quantities: Sequence[int]
+    if quantity_type in _FIXED_TYPES:
+        quantities, offset = _read_fixed(view, offset, quantity_type, n)
+    elif quantity_type == 'L':
+        width, offset = _read_varint(view, offset)
+        quantities = tuple(
+            int.from_bytes(view[i:i + width], 'little')
+            for i in range(offset, offset + n * width, width))
+    elif quantity_type == 'V':
+        values = []
+        for _ in range(n):
+            value, offset = _read_zigzag(view, offset)
+            values.append(value)
+        quantities = tuple(values)
+    else:
+        raise ValueError(f'Unknown quantity column type {quantity_type!r}.')
+
+    return _KINDS[kind], outcomes, quantities
+
+
+def loads(data: 'bytes | bytearray | memoryview',
+          /) -> 'icepool.Die | icepool.Deck | Counts':
+    """Deserializes a `Die`, `Deck`, or `Counts` produced by `dumps()`.
+
+    For dice and decks with `int` or `float` outcomes, the cached float
+    outcome array used by `Population.fast` is filled directly from the data.
+    """
+    kind, outcomes, quantities = read_columns(data)
+    counts = Counts(zip(outcomes, quantities))
+    if kind == 'Counts':
+        return counts
+    result: 'icepool.Die | icepool.Deck'
+    if kind == 'Die':
+        result = icepool.Die._new_raw(counts)
+    else:
+        result = icepool.Deck._new_raw(counts)
+    if isinstance(outcomes, memoryview):
+        result._set_float_outcomes(outcomes)
+    return result
@@ -0,0 +1,642 @@
+"""Bounded and persistent caches for long-running processes."""
+
+__docformat__ = 'google'
+
+from collections import OrderedDict
+import contextvars
+import enum
+import functools
+from functools import cached_property
+import hashlib
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import types
+import weakref
+
+from typing import Any, Callable, Collection, Hashable, Iterator, Mapping, MutableMapping, NamedTuple
+
+
+class CacheStats(NamedTuple):
+    """Statistics reported by `LRUCache.stats()`."""
+    hits: int
+    """The number of successful lookups."""
+    misses: int
+    """The number of unsuccessful lookups."""
+    evictions: int
+    """The number of entries removed to stay within the limits."""
+    entries: int
+    """The current number of entries."""
+    size: int
+    """The current total estimated size of the entries in bytes."""
+
+
+def estimate_size(key: Any, value: Any) -> int:
+    """A rough estimate of the memory used by a cache entry in bytes.
+
+    Mappings such as weight distributions over states are counted one level
+    deep. Everything else, including the contents of the key, is counted
+    shallowly, since keys mostly reference objects shared with other entries.
+    """
+    result = sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        result += sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    return result
+
+
+class LRUCache(MutableMapping[Hashable, Any]):
+    """A thread-safe mapping that evicts the least recently used entries.
+
+    This can be used anywhere a cache accepts a `MutableMapping`, e.g.
+    `MultisetEvaluator(cache=...)` or `MultisetEvaluator.set_default_cache()`.
+    """
+
+    _data: 'OrderedDict[Hashable, tuple[Any, int]]'
+
+    def __init__(self,
+                 max_entries: int | None = None,
+                 *,
+                 max_size: int | None = None,
+                 estimate_size: Callable[[Any, Any], int] = estimate_size):
+        """Constructor.
+
+        Args:
+            max_entries: The maximum number of entries. If `None`, the number
+                of entries is not limited.
+            max_size: The maximum total estimated size of the entries in bytes.
+                If `None`, the size is not limited.
+            estimate_size: A function taking a key and value and returning the
+                estimated size of the entry in bytes. This is only called if
+                `max_size` is set.
+        """
+        if max_entries is not None and max_entries < 0:
+            raise ValueError('max_entries cannot be negative.')
+        if max_size is not None and max_size < 0:
+            raise ValueError('max_size cannot be negative.')
+        self._max_entries = max_entries
+        self._max_size = max_size
+        self._estimate_size = estimate_size
+        self._data = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.RLock()
+
+    def __reduce__(self):
+        # Contents, statistics, and the lock are not copied.
+        return _new_lru_cache, (self._max_entries, self._max_size,
+                                self._estimate_size)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        with self._lock:
+            try:
+                value, _ = self._data[key]
+            except KeyError:
+                self._misses += 1
+                raise
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+            self._data.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if self._max_size is None:
+                size = 0
+            else:
+                size = self._estimate_size(key, value)
+            if key in self._data:
+                _, old_size = self._data.pop(key)
+                self._size -= old_size
+            self._data[key] = value, size
+            self._size += size
+            self._evict()
+
+    def __delitem__(self, key: Hashable) -> None:
+        with self._lock:
+            _, size = self._data.pop(key)
+            self._size -= size
+
+    def __contains__(self, key: object) -> bool:
+        """Does not count as a hit or miss or affect the eviction order."""
+        return key in self._data
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _evict(self) -> None:
+        """Removes the least recently used entries until within limits."""
+        while self._data and (
+            (self._max_entries is not None
+             and len(self._data) > self._max_entries) or
+            (self._max_size is not None and self._size > self._max_size)):
+            _, (_, size) = self._data.popitem(last=False)
+            self._size -= size
+            self._evictions += 1
+
+    def set_limits(self,
+                   max_entries: int | None = None,
+                   *,
+                   max_size: int | None = None) -> None:
+        """Changes the limits, evicting entries if necessary.
+
+        Entries added before the size limit was set count as zero bytes.
+        """
+        with self._lock:
+            self._max_entries = max_entries
+            self._max_size = max_size
+            self._evict()
+
+    def clear(self) -> None:
+        """Removes all entries and resets the statistics."""
+        with self._lock:
+            self._data.clear()
+            self._size = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        """Hit, miss, and eviction counts along with the current usage."""
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              len(self._data), self._size)
+
+    def __repr__(self) -> str:
+        return (f'{type(self).__qualname__}(max_entries={self._max_entries}, '
+                f'max_size={self._max_size})')
+
+
+def _new_lru_cache(max_entries, max_size, estimate_size) -> LRUCache:
+    return LRUCache(max_entries,
+                    max_size=max_size,
+                    estimate_size=estimate_size)
+
+
+class CachePartition(MutableMapping[Hashable, Any]):
+    """A view of the entries of a shared cache belonging to a single owner.
+
+    Keys are prefixed with the owner in the underlying cache.
+    """
+
+    def __init__(self, cache: MutableMapping[Hashable, Any],
+                 owner: Hashable):
+        self._cache = cache
+        self._owner = owner
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._cache[self._owner, key]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self._cache.get((self._owner, key), default)
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._cache[self._owner, key] = value
+
+    def __delitem__(self, key: Hashable) -> None:
+        del self._cache[self._owner, key]
+
+    def __contains__(self, key: object) -> bool:
+        return (self._owner, key) in self._cache
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for k in list(self._cache):
+            if isinstance(k, tuple) and len(k) == 2 and k[0] == self._owner:
+                yield k[1]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class PersistentCache(MutableMapping[str, Any]):
+    """A thread-safe mapping from string keys to values stored in a SQLite file.
+
+    Values are pickled. Entries persist across processes, so this can be used
+    to avoid recomputing expensive results after a restart. See
+    `set_persistent_cache()`.
+    """
+
+    version: Hashable
+    """Included in every key, so that changing it invalidates all entries."""
+
+    def __init__(self, path: 'str | os.PathLike', *, version: Hashable = None):
+        """Constructor.
+
+        Args:
+            path: The path to the SQLite database file. It will be created if it
+                does not exist.
+            version: Included in every key computed for this cache. Change
+                this when code used by the cached computations changes in a
+                way that the keys cannot detect. See `set_persistent_cache()`.
+        """
+        self._path = os.fspath(path)
+        self.version = version
+        self._connection = sqlite3.connect(self._path,
+                                           check_same_thread=False)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB)'
+        )
+        self._connection.commit()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.RLock()
+
+    def __reduce__(self):
+        return functools.partial(PersistentCache,
+                                 version=self.version), (self._path, )
+
+    def _load(self, key: str) -> tuple[Any, bool]:
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT value FROM cache WHERE key = ?', (key, )).fetchone()
+            if row is None:
+                self._misses += 1
+                return None, False
+            self._hits += 1
+            return pickle.loads(row[0]), True
+
+    def __getitem__(self, key: str) -> Any:
+        value, found = self._load(key)
+        if not found:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value, found = self._load(key)
+        return value if found else default
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)',
+                (key, data))
+            self._connection.commit()
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            cursor = self._connection.execute('DELETE FROM cache WHERE key = ?',
+                                              (key, ))
+            self._connection.commit()
+            if cursor.rowcount == 0:
+                raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Does not count as a hit or miss."""
+        with self._lock:
+            return self._connection.execute(
+                'SELECT 1 FROM cache WHERE key = ?',
+                (key, )).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = [
+                row[0] for row in self._connection.execute(
+                    'SELECT key FROM cache')
+            ]
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                'SELECT COUNT(*) FROM cache').fetchone()[0]
+
+    def clear(self) -> None:
+        """Removes all entries and resets the statistics."""
+        with self._lock:
+            self._connection.execute('DELETE FROM cache')
+            self._connection.commit()
+            self._hits = 0
+            self._misses = 0
+
+    def close(self) -> None:
+        """Closes the underlying database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def stats(self) -> CacheStats:
+        """Hit and miss counts along with the current usage.
+
+        Entries are never evicted, and the size is that of the database file.
+        """
+        with self._lock:
+            entries = len(self)
+        try:
+            size = os.path.getsize(self._path)
+        except OSError:
+            size = 0
+        return CacheStats(self._hits, self._misses, 0, entries, size)
+
+    def __repr__(self) -> str:
+        if self.version is None:
+            return f'{type(self).__qualname__}({self._path!r})'
+        return f'{type(self).__qualname__}({self._path!r}, version={self.version!r})'
+
+
+_persistent_cache: PersistentCache | None = None
+
+
+def set_persistent_cache(
+        cache: 'PersistentCache | str | os.PathLike | None', /) -> None:
+    """Sets the global persistent cache.
+
+    If set, the results of `MultisetEvaluator.evaluate()` and of
+    `map(..., repeat=None)` are stored in this cache and reused across
+    processes. Only results whose inputs can be identified structurally are
+    cached; in particular, anything involving a lambda or a nested function is
+    recomputed each time.
+
+    Functions and classes are identified by their code, along with the values
+    of the module globals they reference, recursively. Code inside `icepool`
+    and the standard library is identified by the `icepool` version instead.
+    Changes that cannot be detected this way are **not** noticed, and stale
+    results will be served. These include changes to attributes of other
+    modules, e.g. a constant read as `module.CONSTANT`, to code reached only
+    through instance attributes, and to code that is not Python. In such
+    cases, use a new `PersistentCache.version` or clear the cache.
+
+    The cache previously set, if any, is closed.
+
+    Args:
+        cache: A `PersistentCache`, a path to create one at, or `None` to
+            disable persistent caching. This is the default.
+    """
+    global _persistent_cache
+    if cache is not None and not isinstance(cache, PersistentCache):
+        cache = PersistentCache(cache)
+    previous = _persistent_cache
+    _persistent_cache = cache
+    if previous is not None and previous is not cache:
+        previous.close()
+
+
+def get_persistent_cache() -> PersistentCache | None:
+    """The global persistent cache, or `None` if not set."""
+    return _persistent_cache
+
+
+def _cached_property_names(cls: type) -> set[str]:
+    return {
+        name
+        for klass in cls.__mro__ for name, value in vars(klass).items()
+        if isinstance(value, cached_property)
+    }
+
+
+def _structural_value(value: Any) -> Hashable:
+    """Replaces expressions and evaluators with their structural keys.
+
+    Raises:
+        _Uncacheable: If the value has no structural key or is unhashable.
+    """
+    import icepool
+    if isinstance(value, tuple) and type(value) is tuple:
+        return tuple(_structural_value(x) for x in value)
+    if isinstance(value, (icepool.MultisetEvaluator, icepool.MultisetExpression)
+                  ) and not isinstance(value, icepool.MultisetGenerator):
+        key = value._hash_key
+        if key is None:
+            raise _Uncacheable(value)
+        return key
+    try:
+        hash(value)
+    except TypeError:
+        raise _Uncacheable(value)
+    return value
+
+
+def structural_key(obj: Any,
+                   exclude: Collection[str] = ()) -> Hashable | None:
+    """A key identifying an object by its type and instance attributes.
+
+    Used to give evaluators and unbound expressions structural identity.
+    Attributes that are themselves evaluators or non-generator expressions,
+    including inside tuples, are replaced by their `_hash_key`. Cached
+    properties and attributes starting with `_cache` are skipped.
+
+    Args:
+        obj: An object with a `__dict__`.
+        exclude: Names of further attributes to skip.
+
+    Returns:
+        A hashable key, or `None` if some attribute is unhashable or has no
+        structural key.
+    """
+    skip = _cached_property_names(type(obj))
+    try:
+        return (type(obj),
+                tuple((name, _structural_value(value))
+                      for name, value in sorted(vars(obj).items())
+                      if name not in skip and name not in exclude
+                      and not name.startswith('_cache')))
+    except _Uncacheable:
+        return None
+
+
+class _Uncacheable(Exception):
+    """Raised if an object cannot be identified structurally."""
+
+
+def _code_digest(code: types.CodeType) -> str:
+    """A digest of a code object, so that changed code gets a new key."""
+    consts = tuple(
+        _code_digest(const) if isinstance(const, types.CodeType) else
+        repr(const) for const in code.co_consts)
+    data = repr((code.co_code, consts, code.co_names, code.co_varnames))
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _code_names(code: types.CodeType) -> set[str]:
+    """The names referenced by a code object, including nested code."""
+    result = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            result |= _code_names(const)
+    return result
+
+
+def _is_versioned(module_name: str) -> bool:
+    """Whether code in a module is identified by the `icepool` and Python versions."""
+    top = module_name.partition('.')[0]
+    return top in ('icepool', 'builtins') or top in sys.stdlib_module_names
+
+
+def _referenced_globals(code: types.CodeType,
+                        namespace: Mapping[str, Any]) -> tuple:
+    """The canonical values of the module globals referenced by code.
+
+    Raises:
+        _Uncacheable: If some referenced global cannot be identified.
+    """
+    return tuple((name, _canonical(namespace[name]))
+                 for name in sorted(_code_names(code)) if name in namespace)
+
+
+def _class_functions(cls: type) -> Iterator[tuple[str, str, Any]]:
+    """Yields the qualname of the defining class, the name, and the function of each method."""
+    for klass in cls.__mro__:
+        if klass.__module__ == 'builtins':
+            continue
+        for name, value in sorted(vars(klass).items()):
+            if isinstance(value, (staticmethod, classmethod)):
+                value = value.__func__
+            elif isinstance(value, cached_property):
+                value = value.func
+            elif isinstance(value, property):
+                value = value.fget
+            if isinstance(getattr(value, '__code__', None), types.CodeType):
+                yield klass.__qualname__, name, value
+
+
+_class_digests: 'weakref.WeakKeyDictionary[type, str]' = (
+    weakref.WeakKeyDictionary())
+
+
+def _class_digest(cls: type) -> str:
+    """A digest of the code of a class and its bases, so that changed code gets a new key."""
+    result = _class_digests.get(cls)
+    if result is not None:
+        return result
+    parts = [(qualname, name, _code_digest(function.__code__))
+             for qualname, name, function in _class_functions(cls)]
+    result = hashlib.sha256(repr(parts).encode()).hexdigest()
+    _class_digests[cls] = result
+    return result
+
+
+def _class_globals(cls: type) -> tuple:
+    """The module globals referenced by the methods of a class and its bases.
+
+    Unlike the code, these are not cached, since they may be rebound.
+    """
+    return tuple((qualname, name,
+                  _referenced_globals(function.__code__,
+                                      getattr(function, '__globals__', {})))
+                 for qualname, name, function in _class_functions(cls)
+                 if not _is_versioned(function.__module__ or ''))
+
+
+_canonical_in_progress: 'contextvars.ContextVar[frozenset[int]]' = (
+    contextvars.ContextVar('_canonical_in_progress', default=frozenset()))
+"""The ids of the functions and classes currently being canonicalized.
+
+Used to cut recursion through functions and classes that reference
+themselves or each other.
+"""
+
+
+def _canonical_code_owner(obj: 'type | types.FunctionType') -> Any:
+    """Canonicalizes a function or class by its code and referenced globals."""
+    qualname = obj.__qualname__
+    in_progress = _canonical_in_progress.get()
+    if id(obj) in in_progress:
+        return ('recursive', obj.__module__, qualname)
+    token = _canonical_in_progress.set(in_progress | {id(obj)})
+    try:
+        if isinstance(obj, type):
+            if obj.__module__ == 'builtins':
+                return ('type', obj.__module__, qualname)
+            return ('type', obj.__module__, qualname, _class_digest(obj),
+                    _class_globals(obj))
+        if _is_versioned(obj.__module__ or ''):
+            referenced = ()
+        else:
+            referenced = _referenced_globals(obj.__code__, obj.__globals__)
+        return ('function', obj.__module__, qualname,
+                _code_digest(obj.__code__), _canonical(obj.__defaults__),
+                _canonical(obj.__kwdefaults__),
+                tuple(
+                    _canonical(_cell_contents(cell))
+                    for cell in obj.__closure__ or ()), referenced)
+    finally:
+        _canonical_in_progress.reset(token)
+
+
+def _cell_contents(cell: types.CellType) -> Any:
+    try:
+        return cell.cell_contents
+    except ValueError:
+        # Empty cell.
+        raise _Uncacheable(cell)
+
+
+def _canonical(obj: Any) -> Any:
+    """Converts an object to a structure whose `repr` identifies it across processes."""
+    import icepool
+    if obj is None or isinstance(obj, (bool, int, float, complex, str, bytes,
+                                       enum.Enum)):
+        return obj
+    if isinstance(obj, tuple) and type(obj) is not tuple:
+        # Named tuples, vectors, etc.
+        return (_canonical(type(obj)), tuple(_canonical(x) for x in obj))
+    if isinstance(obj, (tuple, list)):
+        return (type(obj).__name__, tuple(_canonical(x) for x in obj))
+    if isinstance(obj, (icepool.Population, icepool.MultisetGenerator)):
+        return (_canonical(type(obj)), _canonical(obj._hash_key))
+    if isinstance(obj, Mapping):
+        return ('mapping',
+                tuple(
+                    sorted(((_canonical(k), _canonical(v))
+                            for k, v in obj.items()),
+                           key=repr)))
+    if isinstance(obj, (set, frozenset)):
+        return ('set', tuple(sorted((_canonical(x) for x in obj), key=repr)))
+    if isinstance(obj, types.BuiltinFunctionType):
+        owner = obj.__self__
+        if owner is None or isinstance(owner, types.ModuleType):
+            return ('builtin', obj.__module__, obj.__qualname__)
+        # Bound builtin methods such as `dict.__getitem__` depend on their
+        # owner.
+        return ('builtin_method', _canonical(owner), obj.__qualname__)
+    if isinstance(obj, types.ModuleType):
+        return ('module', obj.__name__)
+    if isinstance(obj, (type, types.FunctionType)):
+        qualname = getattr(obj, '__qualname__', '')
+        if '<lambda>' in qualname or '<locals>' in qualname:
+            raise _Uncacheable(obj)
+        return _canonical_code_owner(obj)
+    if isinstance(obj, types.MethodType):
+        return ('method', _canonical(obj.__self__), _canonical(obj.__func__))
+    if type(obj).__repr__ is object.__repr__ and hasattr(obj, '__dict__'):
+        # Plain objects such as evaluators and expressions are identified by
+        # their type and attributes, excluding caches.
+        cached = _cached_property_names(type(obj))
+        return (_canonical(type(obj)),
+                tuple((name, _canonical(value))
+                      for name, value in sorted(vars(obj).items())
+                      if name not in cached and not name.startswith('_cache')))
+    result = repr(obj)
+    if ' at 0x' in result:
+        raise _Uncacheable(obj)
+    return (_canonical(type(obj)), result)
+
+
+def persistent_key(*parts: Any) -> str | None:
+    """A key identifying the given parts across processes.
+
+    Returns:
+        A hex digest, or `None` if some part cannot be identified structurally.
+    """
+    import icepool
+    try:
+        canonical = _canonical(
+            (icepool.__version__, sys.version_info[:2], parts))
+    except (_Uncacheable, RecursionError):
+        return None
+    return hashlib.sha256(repr(canonical).encode()).hexdigest()
@@ -2,29 +2,112 @@ __docformat__ = 'google'
 
 import icepool
 
-from functools import cached_property
+import bisect
+import fractions
+import itertools
 import math
 
 from icepool.typing import T
 from typing import Collection, ItemsView, Iterable, Iterator, KeysView, Mapping, MutableMapping, Sequence, ValuesView
 
 
+_HASH_MODULUS = (1 << 61) - 1
+_HASH_BASE = 1000003
+
+
+_TOTALLY_ORDERED_TYPES = (int, str, bytes, fractions.Fraction)
+
+
+def _is_totally_ordered(key) -> bool:
+    if type(key) is float:
+        return not math.isnan(key)
+    if type(key) is tuple:
+        return all(_is_totally_ordered(x) for x in key)
+    return type(key) in _TOTALLY_ORDERED_TYPES or type(key) is bool
+
+
+class _CountsStore():
+    """Sorted keys and values shared between a `Counts` and its sub-ranges."""
+
+    __slots__ = ('keys', 'values', 'prefix_hashes', 'totally_ordered',
+                 'hash_index')
+
+    def __init__(self, keys: Sequence, values: Sequence[int]):
+        self.keys = keys
+        self.values = values
+        self.prefix_hashes: list[int] | None = None
+        self.totally_ordered: bool | None = None
+        self.hash_index: dict | None = None
+
+    def is_totally_ordered(self) -> bool:
+        """Whether binary search is guaranteed to find any key.
+
+        This holds for keys such as numbers, strings, and tuples thereof, but
+        not e.g. for sets, which are only partially ordered.
+        """
+        if self.totally_ordered is None:
+            self.totally_ordered = all(
+                _is_totally_ordered(key) for key in self.keys)
+        return self.totally_ordered
+
+    def hash_lookup(self, key) -> int | None:
+        """The index of the key found by hashing, or `None` if not present.
+
+        Used for keys that binary search may miss. The index is built on first
+        use.
+        """
+        if self.hash_index is None:
+            self.hash_index = {key: i for i, key in enumerate(self.keys)}
+        try:
+            return self.hash_index.get(key)
+        except TypeError:
+            # Unhashable.
+            return None
+
+    def range_hash(self, start: int, stop: int) -> int:
+        """A polynomial hash of the items in `[start, stop)`.
+
+        This depends only on the items, not on the store, so equal ranges of
+        different stores have equal hashes. The prefix hashes are computed
+        once per store, after which each range takes constant time.
+        """
+        if self.prefix_hashes is None:
+            prefix_hashes = [0]
+            h = 0
+            for item in zip(self.keys, self.values):
+                h = (h * _HASH_BASE + hash(item)) % _HASH_MODULUS
+                prefix_hashes.append(h)
+            self.prefix_hashes = prefix_hashes
+        return (self.prefix_hashes[stop] - self.prefix_hashes[start] *
+                pow(_HASH_BASE, stop - start, _HASH_MODULUS)) % _HASH_MODULUS
+
+
 class Counts(Mapping[T, int]):
     """Immutable dictionary with sorted keys and `int` values.
 
     The values of keys(), values(), and items() are also Sequences, which means
     they can be indexed.
+
+    Keys and values are stored as two parallel tuples, and lookup is by binary
+    search. If the keys are not known to be totally ordered, a miss falls back
+    to a hash index that is built once per storage. There is no per-instance
+    `__dict__`. `remove_min()` and
+    `remove_max()` share the storage of the original, so removing elements one
+    at a time takes constant time and memory per element.
     """
 
-    _mapping: Mapping[T, int]
+    __slots__ = ('_store', '_start', '_stop', '_hash_cache',
+                 '_remove_min_cache', '_remove_max_cache')
+
+    _store: _CountsStore
+    _start: int
+    _stop: int
 
     def __init__(self, items: Iterable[tuple[T, int]]):
         """
         Args:
             items: A Collection of key, value pairs.
                 These will be sorted by key.
-            sort_key: If provided, keys will be sorted using the result of this
-                function.
         """
 
         try:
@@ -53,91 +136,181 @@ class Counts(Mapping[T, int]):
                 mapping[key] = value
             else:
                 mapping[key] += value
-        self._mapping = mapping
-
-    @cached_property
-    def _has_zero_values(self) -> bool:
-        return 0 in self.values()
+        self._init_range(
+            _CountsStore(tuple(mapping.keys()), tuple(mapping.values())), 0,
+            len(mapping))
+
+    def _init_range(self, store: _CountsStore, start: int, stop: int) -> None:
+        self._store = store
+        self._start = start
+        self._stop = stop
+        self._hash_cache: int | None = None
+        self._remove_min_cache: Counts[T] | None = None
+        self._remove_max_cache: Counts[T] | None = None
+
+    @classmethod
+    def _new_sorted(cls, keys: Sequence[T],
+                    values: Sequence[int]) -> 'Counts[T]':
+        """Creates a `Counts` from keys that are already sorted and unique."""
+        self = cls.__new__(cls)
+        self._init_range(_CountsStore(tuple(keys), tuple(values)), 0,
+                         len(keys))
+        return self
+
+    def _new_range(self, start: int, stop: int) -> 'Counts[T]':
+        """A `Counts` sharing this one's storage."""
+        result = Counts.__new__(Counts)
+        result._init_range(self._store, start, stop)
+        return result
+
+    def __reduce__(self):
+        store = self._store
+        if 2 * len(self) >= len(store.keys):
+            # Pickle memoizes the shared tuples, so ranges of the same store
+            # pickled together are written once.
+            return Counts._new_store_range, (store.keys, store.values,
+                                             self._start, self._stop)
+        return Counts._new_sorted, (tuple(self), tuple(self.values()))
+
+    @classmethod
+    def _new_store_range(cls, keys: Sequence[T], values: Sequence[int],
+                         start: int, stop: int) -> 'Counts[T]':
+        """Creates a `Counts` over a range of sorted and unique keys."""
+        self = cls.__new__(cls)
+        self._init_range(_CountsStore(keys, values), start, stop)
+        return self
+
+    @property
+    def _is_full(self) -> bool:
+        return self._start == 0 and self._stop == len(self._store.keys)
+
+    def _get_range(self, sequence: Sequence, index):
+        """Indexes into one of the stored sequences relative to this range."""
+        if self._is_full:
+            return sequence[index]
+        positions = range(self._start, self._stop)[index]
+        if isinstance(positions, int):
+            return sequence[positions]
+        if positions.step > 0:
+            return sequence[positions.start:positions.stop:positions.step]
+        return tuple(sequence[i] for i in positions)
+
+    def _iter_range(self, sequence: Sequence) -> Iterator:
+        if self._is_full:
+            return iter(sequence)
+        return itertools.islice(sequence, self._start, self._stop)
 
     def has_zero_values(self) -> bool:
         """`True` iff `self` contains at least one zero value. """
-        return self._has_zero_values
+        return 0 in self._iter_range(self._store.values)
+
+    def _index(self, key) -> int:
+        """The index of the given key in the store.
+
+        Raises:
+            KeyError: If the key is not present.
+        """
+        store = self._store
+        keys = store.keys
+        try:
+            index = bisect.bisect_left(keys, key, self._start, self._stop)
+            if index < self._stop and _same_key(keys[index], key):
+                return index
+        except TypeError:
+            # Not comparable with some of the keys.
+            pass
+        if not store.is_totally_ordered():
+            # Binary search may miss keys that are only partially ordered, or
+            # whose types were not recognized as totally ordered.
+            found = store.hash_lookup(key)
+            if found is not None and self._start <= found < self._stop:
+                return found
+        raise KeyError(key)
 
     def __len__(self) -> int:
-        return len(self._mapping)
+        return self._stop - self._start
 
     def __contains__(self, key) -> bool:
-        return key in self._mapping
+        try:
+            self._index(key)
+            return True
+        except KeyError:
+            return False
 
     def __getitem__(self, key) -> int:
-        return self._mapping[key]
+        return self._store.values[self._index(key)]
 
-    def __iter__(self) -> Iterator[T]:
-        return iter(self._mapping)
+    def get(self, key, default=None):
+        try:
+            return self._store.values[self._index(key)]
+        except KeyError:
+            return default
 
-    @cached_property
-    def _keys(self) -> Sequence[T]:
-        return tuple(self._mapping.keys())
+    def __iter__(self) -> Iterator[T]:
+        return self._iter_range(self._store.keys)
 
     def keys(self) -> 'CountsKeysView':
         return CountsKeysView(self)
 
-    @cached_property
-    def _values(self) -> Sequence[int]:
-        return tuple(self._mapping.values())
-
     def values(self) -> 'CountsValuesView':
         return CountsValuesView(self)
 
-    @cached_property
-    def _items(self) -> Sequence[tuple[T, int]]:
-        return tuple(self._mapping.items())
-
     def items(self) -> 'CountsItemsView[T]':
         return CountsItemsView(self)
 
     def __str__(self) -> str:
-        return str(self._mapping)
+        return str(dict(self.items()))
 
     def __repr__(self) -> str:
-        return type(self).__qualname__ + f'({repr(self._mapping)})'
+        return type(self).__qualname__ + f'({self})'
 
     def __eq__(self, other) -> bool:
         if isinstance(other, Counts):
-            return self._items == other._items
+            if len(self) != len(other):
+                return False
+            if (self._store is other._store and self._start == other._start):
+                return True
+            if hash(self) != hash(other):
+                return False
+            return (_sequence_eq(self, other)
+                    and _sequence_eq(self.values(), other.values()))
         else:
             return super().__eq__(other)
 
-    @cached_property
-    def _hash(self) -> int:
-        return hash(self._items)
-
     def __hash__(self) -> int:
-        return self._hash
-
-    @cached_property
-    def _remove_min(self) -> 'Counts[T]':
-        return Counts(self.items()[1:])
+        if self._hash_cache is None:
+            self._hash_cache = self._store.range_hash(self._start, self._stop)
+        return self._hash_cache
 
     def remove_min(self) -> 'Counts[T]':
-        """A `Counts` with the min element removed."""
-        return self._remove_min
+        """A `Counts` with the min element removed.
 
-    @cached_property
-    def _remove_max(self) -> 'Counts[T]':
-        return Counts(self.items()[:-1])
+        This shares storage with `self`.
+        """
+        if self._remove_min_cache is None:
+            self._remove_min_cache = self._new_range(self._start + 1,
+                                                     self._stop)
+        return self._remove_min_cache
 
     def remove_max(self) -> 'Counts[T]':
-        """A `Counts` with the max element removed."""
-        return self._remove_max
+        """A `Counts` with the max element removed.
+
+        This shares storage with `self`.
+        """
+        if self._remove_max_cache is None:
+            self._remove_max_cache = self._new_range(self._start,
+                                                     self._stop - 1)
+        return self._remove_max_cache
 
     def simplify(self) -> 'Counts[T]':
         """Divides all counts by their greatest common denominator."""
-        gcd = math.gcd(*self.values())
+        gcd = math.gcd(*self._iter_range(self._store.values))
         if gcd <= 1:
             return self
-        data = [(outcome, value // gcd) for outcome, value in self.items()]
-        return Counts(data)
+        return Counts._new_sorted(
+            tuple(self),
+            tuple(value // gcd
+                  for value in self._iter_range(self._store.values)))
 
 
 class CountsKeysView(KeysView[T], Sequence[T]):
@@ -147,13 +320,16 @@ class CountsKeysView(KeysView[T], Sequence[T]):
         self._mapping = counts
 
     def __getitem__(self, index):
-        return self._mapping._keys[index]
+        return self._mapping._get_range(self._mapping._store.keys, index)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._mapping)
 
     def __len__(self) -> int:
         return len(self._mapping)
 
     def __eq__(self, other):
-        return self._mapping._keys == other
+        return _sequence_eq(self, other)
 
 
 class CountsValuesView(ValuesView[int], Sequence[int]):
@@ -163,13 +339,19 @@ class CountsValuesView(ValuesView[int], Sequence[int]):
         self._mapping = counts
 
     def __getitem__(self, index):
-        return self._mapping._values[index]
+        return self._mapping._get_range(self._mapping._store.values, index)
+
+    def __iter__(self) -> Iterator[int]:
+        return self._mapping._iter_range(self._mapping._store.values)
+
+    def __contains__(self, value) -> bool:
+        return value in iter(self)
 
     def __len__(self) -> int:
         return len(self._mapping)
 
     def __eq__(self, other):
-        return self._mapping._values == other
+        return _sequence_eq(self, other)
 
 
 class CountsItemsView(ItemsView[T, int], Sequence[tuple[T, int]]):
@@ -179,10 +361,19 @@ class CountsItemsView(ItemsView[T, int], Sequence[tuple[T, int]]):
         self._mapping = counts
 
     def __getitem__(self, index):
-        return self._mapping._items[index]
+        counts = self._mapping
+        keys = counts._get_range(counts._store.keys, index)
+        values = counts._get_range(counts._store.values, index)
+        if isinstance(index, slice):
+            return tuple(zip(keys, values))
+        return keys, values
+
+    def __iter__(self) -> Iterator[tuple[T, int]]:
+        return zip(self._mapping._iter_range(self._mapping._store.keys),
+                   self._mapping._iter_range(self._mapping._store.values))
 
     def __eq__(self, other):
-        return self._mapping._items == other
+        return _sequence_eq(self, other)
 
 
 def sorted_union(*args: Iterable[T]) -> Sequence[T]:
@@ -190,3 +381,21 @@ def sorted_union(*args: Iterable[T]) -> Sequence[T]:
     if not args:
         return ()
     return tuple(sorted(set.union(*(set(arg) for arg in args))))
+
+
+def _same_key(a, b) -> bool:
+    """Key equality as used by `dict`."""
+    return a is b or bool(a == b)
+
+
+def _sequence_eq(a: 'Iterable', b) -> bool:
+    """Compares a `Counts` or one of its views with another like tuples do.
+
+    This avoids copying sub-ranges of the shared storage.
+    """
+    if not isinstance(b, (tuple, Counts, CountsKeysView, CountsValuesView,
+                          CountsItemsView)):
+        return NotImplemented  # type: ignore
+    if len(a) != len(b):  # type: ignore
+        return False
+    return all(map(_same_key, a, b))
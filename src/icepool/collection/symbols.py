@@ -107,6 +107,9 @@ class Symbols(Mapping[str, int]):
         self._data = data
         return self
 
+    def __reduce__(self):
+        return Symbols._new_raw, (self._data, )
+
     # Mapping interface.
 
     def __getitem__(self, key: str) -> 'int | Symbols':  # type: ignore
@@ -8,7 +8,7 @@ from icepool.typing import Outcome, Order
 
 import operator
 
-from typing import Any, Callable, Final, Literal, Mapping
+from typing import Any, Callable, Final, Literal, Mapping, MutableMapping
 
 
 class ExpandEvaluator(MultisetEvaluator[Any, tuple]):
@@ -19,7 +19,11 @@ class ExpandEvaluator(MultisetEvaluator[Any, tuple]):
     Outcomes with negative count will be treated as 0 count.
     """
 
-    def __init__(self, order: Order = Order.Ascending):
+    def __init__(self,
+                 order: Order = Order.Ascending,
+                 *,
+                 cache: MutableMapping[Any, Mapping[Any, int]] | None = None):
+        super().__init__(cache=cache)
         self._order = order
 
     def next_state(self, state, outcome, count):
@@ -38,30 +42,34 @@ class ExpandEvaluator(MultisetEvaluator[Any, tuple]):
         return tuple(sorted(final_state, reverse=reverse))
 
 
+def _identity(outcome):
+    return outcome
+
+
 class SumEvaluator(MultisetEvaluator[Any, Any]):
     """Sums all outcomes."""
 
-    def __init__(self, map: Callable | Mapping | None = None) -> None:
+    def __init__(
+            self,
+            map: Callable | Mapping | None = None,
+            *,
+            cache: MutableMapping[Any, Mapping[Any, int]] | None = None
+    ) -> None:
         """Constructor.
 
         map: If provided, outcomes will be mapped according to this just
             before summing.
+        cache: See `MultisetEvaluator.__init__()`.
         """
+        super().__init__(cache=cache)
+        # Module-level functions and bound methods keep this picklable.
         if map is None:
-
-            def map_func(outcome):
-                return outcome
-
-            self._map = map_func
+            self._map = _identity
         elif callable(map):
             self._map = map
         else:
             map_dict = {k: v for k, v in map.items()}
-
-            def map_func(outcome):
-                return map_dict[outcome]
-
-            self._map = map_func
+            self._map = map_dict.__getitem__
 
     def next_state(self, state, outcome, count):
         """Implementation."""
@@ -75,6 +83,14 @@ class SumEvaluator(MultisetEvaluator[Any, Any]):
         else:
             return state + outcome * count
 
+    def outcome_key(self, outcome):
+        """Outcomes with the same mapped value are summed alike."""
+        return self._map(outcome)
+
+    def fold_operator(self):
+        """Sums of disjoint multisets add."""
+        return operator.add
+
     def order(self) -> Literal[Order.Any]:
         """Allows any order."""
         return Order.Any
@@ -99,6 +115,14 @@ class CountEvaluator(MultisetEvaluator[Any, int]):
         """Implementation."""
         return final_state or 0
 
+    def outcome_key(self, outcome) -> None:
+        """All outcomes are counted alike."""
+        return None
+
+    def fold_operator(self):
+        """Counts of disjoint multisets add."""
+        return operator.add
+
     def order(self) -> Literal[Order.Any]:
         """Allows any order."""
         return Order.Any
@@ -119,6 +143,18 @@ class AnyEvaluator(MultisetEvaluator[Any, bool]):
         """Implementation."""
         return final_state or False
 
+    def is_absorbing(self, state) -> bool:
+        """Once a positive count has been seen, the result is `True`."""
+        return bool(state)
+
+    def outcome_key(self, outcome) -> None:
+        """All outcomes are treated alike."""
+        return None
+
+    def fold_operator(self):
+        """Either multiset having a positive count suffices."""
+        return operator.or_
+
     def order(self) -> Literal[Order.Any]:
         """Allows any order."""
         return Order.Any
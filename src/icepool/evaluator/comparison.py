@@ -42,6 +42,11 @@ class ComparisonEvaluator(MultisetEvaluator[Any, bool]):
         has_any, has_all = final_state
         return has_any and has_all
 
+    def is_absorbing(self, state) -> bool:
+        """Once the all-condition fails, the result is `False`."""
+        _, has_all = state
+        return not has_all
+
     def order(self) -> Literal[Order.Any]:
         """Allows any order."""
         return Order.Any
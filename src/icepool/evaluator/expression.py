@@ -37,6 +37,13 @@ class ExpressionEvaluator(MultisetEvaluator[T_contra, U_co]):
         self._expressions = tuple(unbound_expressions)
         self._truth_value = truth_value
 
+    @cached_property
+    def _hash_key(self):
+        # Cache keys include the bound generators, so evaluators of the same
+        # unbound expressions can share a cache regardless of what is bound.
+        return icepool.cache.structural_key(
+            self, exclude=('_bound_generators', '_truth_value'))
+
     def next_state(self, state, outcome, *counts):
         """Adjusts the counts, then forwards to inner."""
         if state is None:
@@ -66,6 +73,29 @@ class ExpressionEvaluator(MultisetEvaluator[T_contra, U_co]):
             _, evaluator_state = final_state
         return self._evaluator.final_outcome(evaluator_state)
 
+    def is_absorbing(self, state) -> bool:
+        """Forwards to inner.
+
+        The expressions do not affect the final outcome, so their states are
+        irrelevant.
+        """
+        _, evaluator_state = state
+        return evaluator_state is not None and self._evaluator.is_absorbing(
+            evaluator_state)
+
+    def _can_absorb(self) -> bool:
+        return self._evaluator._can_absorb()
+
+    def outcome_key(self, outcome):
+        """Combines the keys of the expressions and the inner evaluator."""
+        return (tuple(expression._outcome_key(outcome)
+                      for expression in self._expressions),
+                self._evaluator.outcome_key(outcome))
+
+    def _can_bucket(self) -> bool:
+        return self._evaluator._can_bucket() and all(
+            expression._can_bucket() for expression in self._expressions)
+
     def order(self) -> Order:
         """Forwards to inner."""
         expression_order = Order.merge(*(expression._order()
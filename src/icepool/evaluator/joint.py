@@ -70,6 +70,21 @@ class JointEvaluator(MultisetEvaluator[T_contra, tuple]):
         else:
             return result
 
+    def is_absorbing(self, state) -> bool:
+        """Absorbing iff all sub-states are absorbing."""
+        return all(substate is not None and inner.is_absorbing(substate)
+                   for inner, substate in zip(self._inners, state))
+
+    def _can_absorb(self) -> bool:
+        return all(inner._can_absorb() for inner in self._inners)
+
+    def outcome_key(self, outcome):
+        """Outcomes are alike if they are alike for all sub-evaluators."""
+        return tuple(inner.outcome_key(outcome) for inner in self._inners)
+
+    def _can_bucket(self) -> bool:
+        return all(inner._can_bucket() for inner in self._inners)
+
     def order(self) -> Order:
         """Determines the common order of the sub-evaluators.
 
@@ -1,6 +1,9 @@
 __docformat__ = 'google'
 
-from typing import Any
+import icepool
+from icepool.population.keep import _order_statistic
+
+from typing import Any, Callable, Mapping
 from icepool.evaluator.multiset_evaluator import MultisetEvaluator
 from icepool.typing import Outcome, Order
 
@@ -61,3 +64,61 @@ class KeepEvaluator(MultisetEvaluator[Any, Any]):
     def order(self) -> Order:
         """The required order is determined by whether the index is negative."""
         return self._order
+
+    def _select_direct_algorithm(
+        self, generators: 'tuple[icepool.MultisetGenerator, ...]'
+    ) -> 'Callable[[tuple[icepool.MultisetGenerator, ...]], Mapping[Any, int]] | None':
+        """Uses `_eval_order_statistic()` for a single `Pool`.
+
+        Pools with zero-quantity outcomes are evaluated as usual, so that the
+        same zero-quantity outcomes are kept.
+        """
+        if self._sorted_index(generators) is None:
+            return None
+        pool: 'icepool.Pool' = generators[0]  # type: ignore
+        if any(die.has_zero_quantities() for die in pool.unique_dice()):
+            return None
+        return self._eval_order_statistic
+
+    def _sorted_index(
+            self,
+            generators: 'tuple[icepool.MultisetGenerator, ...]') -> int | None:
+        """The ascending sorted index of the die kept from a single `Pool`.
+
+        `None` if the generators are not a single `Pool`, or if the evaluation
+        would raise `IndexError`.
+        """
+        if len(generators) != 1 or not isinstance(generators[0],
+                                                  icepool.Pool):
+            return None
+        keep_tuple = generators[0].keep_tuple()
+        if any(x < 0 for x in keep_tuple):
+            return None
+        if self._order == Order.Any:
+            positions = [i for i, x in enumerate(keep_tuple) if x > 0]
+            if len(positions) != 1:
+                return None
+            return positions[0]
+        remaining = self._skip
+        if self._order == Order.Ascending:
+            for i, x in enumerate(keep_tuple):
+                remaining -= x
+                if remaining <= 0:
+                    return i
+        else:
+            for i, x in reversed(list(enumerate(keep_tuple))):
+                remaining -= x
+                if remaining <= 0:
+                    return i
+        return None
+
+    def _eval_order_statistic(
+        self, generators: 'tuple[icepool.MultisetGenerator, ...]'
+    ) -> Mapping[Any, int]:
+        """Computes the kept die directly from the cumulative quantities."""
+        pool: 'icepool.Pool' = generators[0]  # type: ignore
+        index = self._sorted_index(generators)
+        assert index is not None
+        die = _order_statistic(pool._dice, index)
+        # Final states as produced by `next_state()`.
+        return {(outcome, 0): quantity for outcome, quantity in die.items()}
@@ -0,0 +1,277 @@
+"""Evaluating several evaluators in a single pass over the same generators."""
+
+__docformat__ = 'google'
+
+import icepool
+from icepool.collection.counts import sorted_union
+from icepool.evaluator.joint import JointEvaluator
+from icepool.evaluator.multiset_evaluator import MultisetEvaluator, _fixed_point_multiply
+from icepool.typing import Order
+
+from collections import defaultdict
+
+from typing import TYPE_CHECKING, Any, Mapping, MutableMapping, Sequence, cast
+
+if TYPE_CHECKING:
+    from icepool.expression.multiset_expression import MultisetExpression
+    from icepool.generator.alignment import Alignment
+
+
+def evaluate_many(
+    *args:
+    'MultisetExpression | Mapping[Any, int] | Sequence',
+    evaluators: 'Sequence[MultisetEvaluator]',
+) -> 'tuple[icepool.Die, ...]':
+    """Evaluates several evaluators on the same generators in a single pass.
+
+    This produces the same results as
+    `tuple(evaluator.evaluate(*args) for evaluator in evaluators)`, but the
+    generators are only traversed once. Unlike `JointEvaluator`, which
+    produces a single joint distribution, a separate distribution over states
+    is kept for each evaluator, so the state space does not grow as the
+    product of the evaluators' state spaces.
+
+    Evaluators whose orders conflict or whose `prefix_generators()` differ are
+    put into separate traversals.
+
+    Args:
+        *args: As `MultisetEvaluator.evaluate()`. These may not contain free
+            variables.
+        evaluators: The evaluators to evaluate.
+
+    Returns:
+        A tuple containing a `Die` for each evaluator, in the same order as
+        `evaluators`.
+    """
+    from icepool.evaluator.expression import ExpressionEvaluator
+
+    evaluators = tuple(evaluators)
+    expressions = tuple(
+        icepool.implicit_convert_to_expression(arg) for arg in args)
+
+    if any(expression._free_arity() > 0 for expression in expressions):
+        raise ValueError('evaluate_many() does not accept free variables.')
+
+    if not all(
+            isinstance(expression, icepool.MultisetGenerator)
+            for expression in expressions):
+        evaluators = tuple(
+            ExpressionEvaluator(*expressions, evaluator=evaluator)
+            for evaluator in evaluators)
+        generators: 'tuple[icepool.MultisetGenerator, ...]' = ()
+    else:
+        generators = cast('tuple[icepool.MultisetGenerator, ...]',
+                          expressions)
+
+    arity = sum(generator.output_arity() for generator in generators)
+    for evaluator in evaluators:
+        evaluator.validate_arity(arity)
+
+    # Group evaluators that can share a traversal.
+    # (prefix generators, order) -> indexes into evaluators
+    groups: dict[tuple, list[int]] = defaultdict(list)
+    any_order: list[int] = []
+    for i, evaluator in enumerate(evaluators):
+        if evaluator.order() == Order.Any:
+            any_order.append(i)
+        else:
+            groups[evaluator.prefix_generators(), evaluator.order()].append(i)
+    for i in any_order:
+        prefix = evaluators[i].prefix_generators()
+        for order in (Order.Ascending, Order.Descending):
+            if (prefix, order) in groups:
+                groups[prefix, order].append(i)
+                break
+        else:
+            groups[prefix, Order.Any].append(i)
+
+    results: list['icepool.Die'] = [icepool.Die([])] * len(evaluators)
+    for (prefix, _), indexes in groups.items():
+        group_results = _evaluate_group(
+            tuple(evaluators[i] for i in indexes), prefix + generators)
+        for i, result in zip(indexes, group_results):
+            results[i] = result
+    return tuple(results)
+
+
+def _evaluate_group(
+    evaluators: 'tuple[MultisetEvaluator, ...]',
+    generators: 'tuple[icepool.MultisetGenerator, ...]'
+) -> 'tuple[icepool.Die, ...]':
+    """Evaluates evaluators with compatible orders in a single traversal.
+
+    Args:
+        evaluators: The evaluators to evaluate.
+        generators: The generators to traverse, including the common prefix
+            generators.
+    """
+    from icepool.generator.alignment import Alignment
+
+    if not all(generator._is_resolvable() for generator in generators):
+        return tuple(icepool.Die([]) for _ in evaluators)
+
+    # The joint evaluator is only used to merge orders and alignments and to
+    # select the algorithm.
+    joint = JointEvaluator(*evaluators)
+    algorithm, order = joint._select_algorithm(*generators)
+    outcomes = sorted_union(*(generator.outcomes()
+                              for generator in generators))
+    alignment = Alignment(joint.alignment(outcomes))
+    # Each evaluator skips the outcomes that only appear in the alignments of
+    # the other evaluators, so that it sees the same outcomes as it would if
+    # evaluated by itself.
+    skips = tuple(
+        frozenset(alignment.outcomes()) - frozenset(outcomes) -
+        frozenset(evaluator.alignment(outcomes)) for evaluator in evaluators)
+
+    bits = icepool.precision.get_precision()
+    dists: list[MutableMapping[Any, int]] = [
+        defaultdict(int) for _ in evaluators
+    ]
+    iterators = MultisetEvaluator._initialize_generators(generators)
+    # Initial generators yield no counts.
+    iterators = tuple(((generator, (), weight)
+                       for generator, weight in iterator)
+                      for iterator in iterators)
+    for sub_generators, _, prod_weight in MultisetEvaluator._iter_transitions(
+            iterators, bits):
+        if algorithm == joint._eval_internal:
+            sub_results = _eval_fused(evaluators, skips, order, alignment,
+                                      sub_generators, bits)
+        else:
+            sub_results = _eval_fused_iterative(evaluators, skips, order,
+                                                alignment, sub_generators,
+                                                bits)
+        for dist, sub_result in zip(dists, sub_results):
+            for sub_state, sub_weight in sub_result.items():
+                if bits is None:
+                    dist[sub_state] += sub_weight * prod_weight
+                else:
+                    dist[sub_state] += _fixed_point_multiply(
+                        sub_weight, prod_weight, bits)
+
+    results = []
+    for evaluator, dist in zip(evaluators, dists):
+        final_outcomes = []
+        final_weights = []
+        for state, weight in dist.items():
+            outcome = evaluator.final_outcome(state)
+            if outcome is None:
+                raise TypeError(
+                    "None is not a valid final outcome.\n"
+                    "This may have been a result of not supplying any generator with an outcome."
+                )
+            if outcome is not icepool.Reroll:
+                final_outcomes.append(outcome)
+                final_weights.append(weight)
+        results.append(icepool.Die(final_outcomes, final_weights))
+    return tuple(results)
+
+
+def _transition(evaluators: 'tuple[MultisetEvaluator, ...]',
+                skips: 'tuple[frozenset, ...]',
+                prev_dists: 'Sequence[Mapping[Any, int]]',
+                results: 'Sequence[MutableMapping[Any, int]]', outcome,
+                counts: tuple[int, ...], prod_weight: int,
+                bits: int | None) -> None:
+    """Adds a single transition of each evaluator's distribution to `results`."""
+    for evaluator, skip, prev, result in zip(evaluators, skips, prev_dists,
+                                             results):
+        for prev_state, prev_weight in prev.items():
+            if outcome in skip:
+                state = prev_state
+            else:
+                state = evaluator.next_state(prev_state, outcome, *counts)
+            if state is not icepool.Reroll:
+                if bits is None:
+                    result[state] += prev_weight * prod_weight
+                else:
+                    result[state] += _fixed_point_multiply(
+                        prev_weight, prod_weight, bits)
+
+
+def _eval_fused(evaluators: 'tuple[MultisetEvaluator, ...]',
+                skips: 'tuple[frozenset, ...]', order: Order,
+                alignment: 'Alignment',
+                generators: 'tuple[icepool.MultisetGenerator, ...]',
+                bits: int | None) -> 'tuple[Mapping[Any, int], ...]':
+    """As `MultisetEvaluator._eval_internal()`, with one distribution per evaluator.
+
+    Results are only memoized for the duration of this call.
+    """
+    one = 1 if bits is None else 1 << bits
+    local: dict[Any, tuple[Mapping[Any, int], ...]] = {}
+    root_key = (alignment, generators)
+    stack: list[list] = [[root_key, None]]
+    while stack:
+        frame = stack[-1]
+        key, expansion = frame
+        alignment, generators = key
+        if expansion is None:
+            if key in local:
+                stack.pop()
+                continue
+            if all(not generator.outcomes()
+                   for generator in generators) and not alignment.outcomes():
+                local[key] = tuple({None: one} for _ in evaluators)
+                stack.pop()
+                continue
+            outcome, prev_alignment, iterators = MultisetEvaluator._pop_generators(
+                order, alignment, generators)
+            transitions = list(
+                MultisetEvaluator._iter_transitions(iterators, bits))
+            frame[1] = outcome, prev_alignment, transitions
+            for prev_generators, _, _ in transitions:
+                prev_key = (prev_alignment, prev_generators)
+                if prev_key not in local:
+                    stack.append([prev_key, None])
+            continue
+
+        stack.pop()
+        outcome, prev_alignment, transitions = expansion
+        results: tuple[MutableMapping[Any, int], ...] = tuple(
+            defaultdict(int) for _ in evaluators)
+        for prev_generators, counts, prod_weight in transitions:
+            _transition(evaluators, skips,
+                        local[prev_alignment, prev_generators], results,
+                        outcome, counts, prod_weight, bits)
+        local[key] = results
+
+    return local[root_key]
+
+
+def _eval_fused_iterative(
+        evaluators: 'tuple[MultisetEvaluator, ...]',
+        skips: 'tuple[frozenset, ...]', order: Order, alignment: 'Alignment',
+        generators: 'tuple[icepool.MultisetGenerator, ...]',
+        bits: int | None) -> 'tuple[Mapping[Any, int], ...]':
+    """As `MultisetEvaluator._eval_internal_iterative()`, with one distribution per evaluator."""
+    one = 1 if bits is None else 1 << bits
+    if all(not generator.outcomes()
+           for generator in generators) and not alignment.outcomes():
+        return tuple({None: one} for _ in evaluators)
+    # (alignment, generators) -> distribution for each evaluator
+    dist: dict[Any, tuple[MutableMapping[Any, int], ...]] = {
+        (alignment, generators): tuple({None: one} for _ in evaluators)
+    }
+    final_dists: tuple[MutableMapping[Any, int], ...] = tuple(
+        defaultdict(int) for _ in evaluators)
+    while dist:
+        next_dist: dict[Any, tuple[MutableMapping[Any, int], ...]] = {}
+        for (prev_alignment, prev_generators), prev_dists in dist.items():
+            outcome, alignment, iterators = MultisetEvaluator._pop_generators(
+                -order, prev_alignment, prev_generators)
+            for generators, counts, prod_weight in MultisetEvaluator._iter_transitions(
+                    iterators, bits):
+                if all(not generator.outcomes() for generator in generators):
+                    results = final_dists
+                else:
+                    key = (alignment, generators)
+                    if key not in next_dist:
+                        next_dist[key] = tuple(
+                            defaultdict(int) for _ in evaluators)
+                    results = next_dist[key]
+                _transition(evaluators, skips, prev_dists, results, outcome,
+                            counts, prod_weight, bits)
+        dist = next_dist
+    return final_dists
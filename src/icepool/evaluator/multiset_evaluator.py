@@ -1,18 +1,26 @@
 __docformat__ = 'google'
 
 import icepool
+import icepool.cache
+import icepool.instrumentation
+import icepool.precision
 from icepool.collection.counts import sorted_union
 
 from icepool.typing import Order, T_contra, U_co
 
 from abc import ABC, abstractmethod
 from collections import defaultdict
+import concurrent.futures
 import enum
 from functools import cached_property
 import itertools
 import math
+import numbers
+import operator
+import random
+from types import ModuleType
 
-from typing import Any, Callable, Collection, Generic, Hashable, Mapping, MutableMapping, Sequence, cast, TYPE_CHECKING, overload
+from typing import Any, Callable, Collection, Final, Generic, Hashable, Iterator, Mapping, MutableMapping, Sequence, cast, TYPE_CHECKING, overload
 
 if TYPE_CHECKING:
     from icepool.generator.alignment import Alignment
@@ -47,7 +55,8 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
     and often even only generators with a particular type of `Die`.
 
     Instances cache all intermediate state distributions.
-    You should therefore reuse instances when possible.
+    You should therefore reuse instances when possible. To bound the memory
+    used by the cache, see `__init__()` and `set_default_cache()`.
 
     Instances should not be modified after construction
     in any way that affects the return values of these methods.
@@ -125,6 +134,207 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
         # If not overriden, the final_state should have type U_co.
         return cast(U_co, final_state)
 
+    def is_absorbing(self, state: Hashable) -> bool:
+        """Optional function to declare that a state can no longer change.
+
+        If this returns `True`, `next_state()` must return `state` itself for
+        every remaining outcome and count. The evaluation may then stop
+        processing that state early, crediting it with the total weight of the
+        remaining generators. This is especially effective for evaluations
+        that usually terminate early, such as subset checks.
+
+        Absorbing states are only used by the algorithm that sees outcomes in
+        the less-preferred order, i.e. when `order()` is opposed to the cheaper
+        popping direction. Otherwise the evaluation keeps its usual algorithm,
+        which memoizes its intermediate results across calls.
+
+        Subclasses that override `next_state()` do not inherit this; they
+        must also override `is_absorbing()` to use it.
+
+        The default implementation returns `False`, i.e. no state is
+        absorbing. This is never called with `state=None`.
+
+        Args:
+            state: A state returned by `next_state()`.
+        """
+        return False
+
+    def _can_absorb(self) -> bool:
+        """Whether `is_absorbing()` is implemented for this `next_state()`."""
+        return self._overrides_with_next_state('is_absorbing')
+
+    def outcome_key(self, outcome: T_contra) -> Hashable:
+        """Optional function to declare outcomes that this evaluator treats alike.
+
+        Outcomes with equal keys are merged into a single bucket before
+        evaluation, so that `next_state()` is called once for each bucket
+        rather than once for each outcome. The bucket is represented by its
+        lowest outcome, and the counts are the total counts of the outcomes in
+        the bucket. For example, an evaluator counting outcomes that are at
+        least a target number can return `outcome >= target`, so that a pool
+        of d100s produces only two outcomes.
+
+        This is only valid if processing the outcomes of a bucket one at a
+        time, in order, always produces the same state as processing the
+        representative once with the total counts.
+
+        Buckets are only formed if every generator supports them, e.g. pools
+        that keep all their dice, and deals. Otherwise all outcomes are
+        processed separately.
+
+        Subclasses that override `next_state()` do not inherit this; they
+        must also override `outcome_key()` to use it.
+
+        The default implementation does not declare any buckets.
+
+        Args:
+            outcome: An outcome of the generators.
+
+        Returns:
+            A hashable key. Outcomes with equal keys are treated alike.
+        """
+        return outcome
+
+    def _can_bucket(self) -> bool:
+        """Whether `outcome_key()` is implemented for this `next_state()`."""
+        return self._overrides_with_next_state('outcome_key')
+
+    def _overrides_with_next_state(self, name: str) -> bool:
+        """Whether the method `name` is overridden alongside `next_state()`.
+
+        Optional methods such as `outcome_key()` make claims about
+        `next_state()`. A subclass that overrides `next_state()` without also
+        overriding such a method does not inherit it, since the claim may no
+        longer hold.
+        """
+        cls = type(self)
+        if getattr(cls, name) is getattr(MultisetEvaluator, name):
+            return False
+        owner = next(klass for klass in cls.__mro__ if name in vars(klass))
+        return cls.next_state is owner.next_state
+
+    def _bucket_generators(
+        self, generators: 'tuple[icepool.MultisetGenerator, ...]'
+    ) -> 'tuple[icepool.MultisetGenerator, ...]':
+        """Merges the outcomes of the generators according to `outcome_key()`.
+
+        Returns:
+            The bucketed generators, or the original generators if no outcomes
+            would be merged or some generator does not support bucketing.
+        """
+        outcomes = sorted_union(*(generator.outcomes()
+                                  for generator in generators))
+        # key -> lowest outcome with that key
+        buckets: dict[Hashable, Any] = {}
+        representatives = {}
+        for outcome in outcomes:
+            representatives[outcome] = buckets.setdefault(
+                self.outcome_key(outcome), outcome)
+        if len(buckets) == len(outcomes):
+            return generators
+        result = []
+        for generator in generators:
+            bucketed = generator._bucket(representatives)
+            if bucketed is None:
+                return generators
+            result.append(bucketed)
+        return tuple(result)
+
+    def fold_operator(self) -> Callable[[Any, Any], Any] | None:
+        """Optional function to declare that states combine by a binary operator.
+
+        If this returns an operator `op`, the state after processing a
+        multiset that is the sum of two multisets must be `op(a, b)`, where `a`
+        and `b` are the states after processing each multiset separately.
+        The state of a single element `outcome` is
+        `next_state(None, outcome, 1)`. Thus `op` must be associative and
+        commutative on the states that can occur.
+
+        This allows generators made of independent elements, such as pools
+        that keep all their dice, to be evaluated one die at a time without
+        sorting their outcomes, e.g. as a repeated convolution for sums.
+        `operator.add` is only used if every state is a number or a `Vector`
+        of numbers, since e.g. adding strings or tuples is not commutative;
+        numeric states use `Die._sum_all()`.
+
+        Subclasses that override `next_state()` do not inherit this; they
+        must also override `fold_operator()` to use it.
+
+        The default implementation returns `None`, i.e. states are not
+        combined this way.
+        """
+        return None
+
+    def _can_fold(self) -> bool:
+        """Whether `fold_operator()` is implemented for this `next_state()`."""
+        return self._overrides_with_next_state('fold_operator')
+
+    def _select_direct_algorithm(
+        self, generators: 'tuple[icepool.MultisetGenerator, ...]'
+    ) -> 'Callable[[tuple[icepool.MultisetGenerator, ...]], Mapping[Any, int]] | None':
+        """Selects an algorithm that evaluates the generators without popping outcomes.
+
+        The default uses `_eval_fold()` if `fold_operator()` is implemented and
+        the generators are a single generator of independent dice.
+
+        Returns:
+            A function taking the generators and returning a mapping from
+            final states to weights, or `None` if no such algorithm applies.
+        """
+        if not self._can_fold() or len(generators) != 1:
+            return None
+        dice = generators[0]._fold_dice()
+        if not dice:
+            return None
+        op = self.fold_operator()
+        if op is None:
+            return None
+        if op is operator.add and not all(
+                _is_commutative_sum(self.next_state(None, outcome, 1))
+                for die, _ in dice for outcome in die):
+            return None
+        return self._eval_fold
+
+    def _eval_fold(
+        self, generators: 'tuple[icepool.MultisetGenerator, ...]'
+    ) -> Mapping[Any, int]:
+        """Evaluates a single generator one die at a time using `fold_operator()`."""
+        op = cast(Callable[[Any, Any], Any], self.fold_operator())
+        dice = cast(Sequence[tuple['icepool.Die', int]],
+                    generators[0]._fold_dice())
+        result: Mapping[Any, int] | None = None
+        for die, count in dice:
+            data: MutableMapping[Any, int] = defaultdict(int)
+            for outcome, quantity in die.items():
+                if op is operator.add:
+                    # Go through a zero count first, as evaluating by popping
+                    # outcomes would. E.g. this turns `bool` states into
+                    # `int`s even if there is only a single element.
+                    state = self.next_state(
+                        self.next_state(None, outcome, 0), outcome, 1)
+                else:
+                    state = self.next_state(None, outcome, 1)
+                data[state] += quantity
+            sub_result: Mapping[Any, int]
+            if op is operator.add and all(
+                    isinstance(state, numbers.Number) for state in data):
+                # Reuse the die itself if possible, along with its cache.
+                if data == dict(die.items()):
+                    state_die = die
+                else:
+                    state_die = icepool.Die(data)
+                sub_result = state_die._sum_all(count)
+            else:
+                sub_result = _fold_power(data, count, op)
+            if result is None:
+                result = sub_result
+            elif isinstance(result, icepool.Die) and isinstance(
+                    sub_result, icepool.Die):
+                result = result + sub_result
+            else:
+                result = _fold_convolve(result, sub_result, op)
+        return cast(Mapping[Any, int], result)
+
     def order(self) -> Order:
         """Optional function to determine the order in which `next_state()` will see outcomes.
 
@@ -207,33 +417,145 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
             `ValueError` if the total input arity is not valid.
         """
 
+    _default_cache: 'MutableMapping[Any, Mapping[Any, int]] | None' = None
+
+    def __init__(
+            self,
+            *,
+            cache: 'MutableMapping[Any, Mapping[Any, int]] | None' = None
+    ) -> None:
+        """Constructor.
+
+        Subclasses that define their own `__init__` may call this with a
+        `cache` argument to allow it to be configured.
+
+        Args:
+            cache: A `MutableMapping` that will hold the intermediate state
+                distributions of this evaluator, e.g. an `icepool.LRUCache`
+                to bound memory use. If not provided, the default cache from
+                `set_default_cache()` is used.
+        """
+        self._cache_arg = cache
+
+    @staticmethod
+    def set_default_cache(
+            cache: 'MutableMapping[Any, Mapping[Any, int]] | None') -> None:
+        """Sets a cache to be shared by evaluators not given a cache of their own.
+
+        Entries are keyed by evaluator as well, so evaluators sharing the cache
+        do not see each other's entries.
+
+        This only affects evaluators that have not already started caching.
+
+        Args:
+            cache: A `MutableMapping`, e.g. an `icepool.LRUCache`. If `None`,
+                which is the initial behavior, structurally equal evaluators
+                share a bounded cache (see `set_interned_cache_limit()`), and
+                other evaluators each get their own `dict`.
+        """
+        MultisetEvaluator._default_cache = cache
+
+    _interned_caches: Final = icepool.cache.LRUCache(1024)
+    """Caches shared between structurally equal evaluators, keyed by `_hash_key`."""
+
+    _interned_cache_max_entries: int | None = 65536
+    """The maximum number of entries in each of the `_interned_caches`."""
+
+    @staticmethod
+    def set_interned_cache_limit(max_entries: int | None) -> None:
+        """Sets the maximum number of entries in each cache shared between structurally equal evaluators.
+
+        Evaluators that are not given a cache and are created while no default
+        cache is set share a cache with structurally equal evaluators. Each
+        such cache is an `icepool.LRUCache`, and at most 1024 of them are kept.
+
+        Args:
+            max_entries: The maximum number of entries per cache, or `None`
+                for no limit. The default is 65536. This also applies to
+                existing caches.
+        """
+        MultisetEvaluator._interned_cache_max_entries = max_entries
+        for cache in list(MultisetEvaluator._interned_caches.values()):
+            cache.set_limits(max_entries)
+
+    @staticmethod
+    def clear_interned_caches() -> None:
+        """Clears the caches shared between structurally equal evaluators.
+
+        Evaluators that have already started caching keep their caches.
+        """
+        MultisetEvaluator._interned_caches.clear()
+
+    @cached_property
+    def _hash_key(self) -> Hashable | None:
+        """A key that is equal for evaluators that always produce the same results.
+
+        Evaluators with equal keys share a cache, so repeating a query with a
+        freshly constructed but identical evaluator does not start from an
+        empty cache. The default is the type of the evaluator together with its
+        instance attributes, or `None` if any attribute is unhashable, in which
+        case the evaluator gets a cache of its own. Subclasses whose results
+        depend on anything else should override this.
+        """
+        return icepool.cache.structural_key(self)
+
     @cached_property
     def _cache(self) -> MutableMapping[Any, Mapping[Any, int]]:
         """A cache of (order, generators) -> weight distribution over states. """
-        return {}
+        cache = getattr(self, '_cache_arg', None)
+        if cache is not None:
+            return cache
+        key = self._hash_key
+        if MultisetEvaluator._default_cache is not None:
+            return icepool.cache.CachePartition(
+                MultisetEvaluator._default_cache,
+                self if key is None else key)
+        if key is None:
+            return {}
+        cache = MultisetEvaluator._interned_caches.get(key)
+        if cache is None:
+            cache = icepool.cache.LRUCache(
+                MultisetEvaluator._interned_cache_max_entries)
+            MultisetEvaluator._interned_caches[key] = cache
+        return cache
+
+    def __getstate__(self) -> dict[str, Any]:
+        """The cache is not copied when pickling, e.g. to send to a worker process."""
+        state = self.__dict__.copy()
+        state.pop('_cache', None)
+        state.pop('_hash_key', None)
+        return state
 
     @overload
     def evaluate(
-        self, *args: 'Mapping[T_contra, int] | Sequence[T_contra]'
+        self,
+        *args: 'Mapping[T_contra, int] | Sequence[T_contra]',
+        executor: 'concurrent.futures.Executor | None' = None
     ) -> 'icepool.Die[U_co]':
         ...
 
     @overload
     def evaluate(
-        self, *args: 'MultisetExpression[T_contra]'
+        self,
+        *args: 'MultisetExpression[T_contra]',
+        executor: 'concurrent.futures.Executor | None' = None
     ) -> 'MultisetEvaluator[T_contra, U_co]':
         ...
 
     @overload
     def evaluate(
-        self, *args:
-        'MultisetExpression[T_contra] | Mapping[T_contra, int] | Sequence[T_contra]'
+        self,
+        *args:
+        'MultisetExpression[T_contra] | Mapping[T_contra, int] | Sequence[T_contra]',
+        executor: 'concurrent.futures.Executor | None' = None
     ) -> 'icepool.Die[U_co] | MultisetEvaluator[T_contra, U_co]':
         ...
 
     def evaluate(
-        self, *args:
-        'MultisetExpression[T_contra] | Mapping[T_contra, int] | Sequence[T_contra]'
+        self,
+        *args:
+        'MultisetExpression[T_contra] | Mapping[T_contra, int] | Sequence[T_contra]',
+        executor: 'concurrent.futures.Executor | None' = None
     ) -> 'icepool.Die[U_co] | MultisetEvaluator[T_contra, U_co]':
         """Evaluates generator(s).
 
@@ -248,13 +570,17 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
                 * A `MultisetExpression`.
                 * A mappable mapping outcomes to the number of those outcomes.
                 * A sequence of outcomes.
+            executor: If provided, the independent sub-evaluations produced by
+                expanding the generators (e.g. the pools of a mixture) are
+                submitted to this `concurrent.futures.Executor` and their
+                results merged. With a `ProcessPoolExecutor`, the evaluator,
+                generators, and states must be picklable; each worker process
+                keeps its own cache.
 
         Returns:
             A `Die` representing the distribution of the final outcome if no
             arg contains a free variable. Otherwise, returns a new evaluator.
         """
-        from icepool.generator.alignment import Alignment
-
         # Convert arguments to expressions.
         expressions = tuple(
             icepool.implicit_convert_to_expression(arg) for arg in args)
@@ -267,7 +593,8 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
                 isinstance(expression, icepool.MultisetGenerator)
                 for expression in expressions):
             from icepool.evaluator.expression import ExpressionEvaluator
-            return ExpressionEvaluator(*expressions, evaluator=self).evaluate()
+            return ExpressionEvaluator(
+                *expressions, evaluator=self).evaluate(executor=executor)
 
         generators = cast(tuple[icepool.MultisetGenerator, ...], expressions)
 
@@ -279,7 +606,57 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
         if not all(generator._is_resolvable() for generator in generators):
             return icepool.Die([])
 
+        with icepool.instrumentation.evaluation(self, generators) as metrics:
+            return self._evaluate_generators(generators, executor, metrics)
+
+    def _evaluate_generators(
+        self, generators: 'tuple[icepool.MultisetGenerator, ...]',
+        executor: 'concurrent.futures.Executor | None',
+        metrics: 'icepool.instrumentation.EvaluationMetrics | None'
+    ) -> 'icepool.Die[U_co]':
+        """Evaluates resolvable generators, including the prefix generators."""
+        from icepool.generator.alignment import Alignment
+
+        bits = icepool.precision.get_precision()
+        persistent_cache = icepool.cache.get_persistent_cache()
+        persistent_key = None
+        if persistent_cache is not None:
+            persistent_key = icepool.cache.persistent_key(
+                persistent_cache.version, 'evaluate', self, generators, bits)
+            if persistent_key is not None:
+                cached_result = persistent_cache.get(persistent_key)
+                if cached_result is not None:
+                    if metrics is not None:
+                        metrics.persistent_cache_hit = True
+                    return cached_result
+
+        direct_algorithm = self._select_direct_algorithm(generators)
+        if direct_algorithm is not None:
+            if metrics is not None:
+                metrics.algorithm = direct_algorithm.__name__
+                # Report the order that evaluating by popping would have used.
+                if self._can_bucket():
+                    generators_by_popping = self._bucket_generators(
+                        generators)
+                else:
+                    generators_by_popping = generators
+                _, metrics.order = self._select_algorithm(
+                    *generators_by_popping)
+                metrics.mark('select')
+            dist = direct_algorithm(generators)
+            if metrics is not None:
+                metrics.mark('evaluate')
+            return self._finalize(dist, persistent_cache, persistent_key,
+                                  metrics)
+
+        if self._can_bucket():
+            generators = self._bucket_generators(generators)
+
         algorithm, order = self._select_algorithm(*generators)
+        if metrics is not None:
+            metrics.algorithm = algorithm.__name__
+            metrics.order = order
+            metrics.mark('select')
 
         # We use a separate class to guarantee all outcomes are visited.
         outcomes = sorted_union(*(generator.outcomes()
@@ -288,13 +665,47 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
 
         dist: MutableMapping[Any, int] = defaultdict(int)
         iterators = MultisetEvaluator._initialize_generators(generators)
-        for p in itertools.product(*iterators):
-            sub_generators, sub_weights = zip(*p)
-            prod_weight = math.prod(sub_weights)
-            sub_result = algorithm(order, alignment, sub_generators)
-            for sub_state, sub_weight in sub_result.items():
-                dist[sub_state] += sub_weight * prod_weight
-
+        # Initial generators yield no counts.
+        iterators = tuple(((generator, (), weight)
+                           for generator, weight in iterator)
+                          for iterator in iterators)
+        if executor is None:
+            for sub_generators, _, prod_weight in MultisetEvaluator._iter_transitions(
+                    iterators, bits):
+                sub_result = algorithm(order, alignment, sub_generators)
+                for sub_state, sub_weight in sub_result.items():
+                    if bits is None:
+                        dist[sub_state] += sub_weight * prod_weight
+                    else:
+                        dist[sub_state] += _fixed_point_multiply(
+                            sub_weight, prod_weight, bits)
+        else:
+            futures = []
+            for sub_generators, _, prod_weight in MultisetEvaluator._iter_transitions(
+                    iterators, bits):
+                futures.append((executor.submit(_call_with_precision, bits,
+                                                algorithm, order, alignment,
+                                                sub_generators), prod_weight))
+            # Merge in submission order so the result is deterministic.
+            for future, prod_weight in futures:
+                for sub_state, sub_weight in future.result().items():
+                    if bits is None:
+                        dist[sub_state] += sub_weight * prod_weight
+                    else:
+                        dist[sub_state] += _fixed_point_multiply(
+                            sub_weight, prod_weight, bits)
+        if metrics is not None:
+            metrics.mark('evaluate')
+        return self._finalize(dist, persistent_cache, persistent_key,
+                              metrics)
+
+    def _finalize(
+        self, dist: Mapping[Any, int],
+        persistent_cache: 'icepool.cache.PersistentCache | None',
+        persistent_key: Hashable | None,
+        metrics: 'icepool.instrumentation.EvaluationMetrics | None'
+    ) -> 'icepool.Die[U_co]':
+        """Converts a distribution of final states to a `Die`."""
         final_outcomes = []
         final_weights = []
         for state, weight in dist.items():
@@ -308,7 +719,12 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
                 final_outcomes.append(outcome)
                 final_weights.append(weight)
 
-        return icepool.Die(final_outcomes, final_weights)
+        result = icepool.Die(final_outcomes, final_weights)
+        if persistent_cache is not None and persistent_key is not None:
+            persistent_cache[persistent_key] = result
+        if metrics is not None:
+            metrics.mark('finalize')
+        return result
 
     __call__ = evaluate
 
@@ -336,6 +752,11 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
         pop_min_cost = math.prod(pop_min_costs)
         pop_max_cost = math.prod(pop_max_costs)
 
+        metrics = icepool.instrumentation.current()
+        if metrics is not None:
+            metrics.pop_min_cost = pop_min_cost
+            metrics.pop_max_cost = pop_max_cost
+
         # No preferred order case: go directly with cost.
         if eval_order == Order.Any:
             if pop_max_cost <= pop_min_cost:
@@ -373,7 +794,7 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
         Arguments:
             order: The order in which to send outcomes to `next_state()`.
             alignment: As `alignment()`. Elements will be popped off this
-                during recursion.
+                during evaluation.
             generators: One or more `MultisetGenerators`s to evaluate. Elements
                 will be popped off this during recursion.
 
@@ -381,31 +802,126 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
             A dict `{ state : weight }` describing the probability distribution
                 over states.
         """
-        cache_key = (order, alignment, generators)
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-
-        result: MutableMapping[Any, int] = defaultdict(int)
-
-        if all(not generator.outcomes()
-               for generator in generators) and not alignment.outcomes():
-            result = {None: 1}
-        else:
-            outcome, prev_alignment, iterators = MultisetEvaluator._pop_generators(
-                order, alignment, generators)
-            for p in itertools.product(*iterators):
-                prev_generators, counts, weights = zip(*p)
-                counts = tuple(itertools.chain.from_iterable(counts))
-                prod_weight = math.prod(weights)
-                prev = self._eval_internal(order, prev_alignment,
-                                           prev_generators)
+        bits = icepool.precision.get_precision()
+        one = 1 if bits is None else 1 << bits
+        root_key = (order, alignment, generators, bits)
+        metrics = icepool.instrumentation.current()
+        cached = self._cache.get(root_key)
+        if metrics is not None:
+            if cached is not None:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+        if cached is not None:
+            return cached
+
+        # Subproblems found during this call are numbered. For each, in order:
+        # Its index by cache key.
+        indices: dict[Any, int] = {}
+        # Its result, if known. Results are kept here in case the cache
+        # evicts them before they are used, but only until their last parent
+        # has used them.
+        results: list[Mapping[Any, int] | None] = []
+        # The number of parents yet to use its result.
+        uses: list[int] = []
+        # If it is to be computed: its cache key, outcome, popped alignment,
+        # transitions, and the index of the subproblem after each transition.
+        expansions: list[tuple[Any, Any, Any, list, list[int]] | None] = []
+        # The length of the longest path to a known result. Children are
+        # lower than their parents.
+        heights: list[int] = []
+        # Each frame is the index of a subproblem and an iterator over its
+        # remaining transitions. Explicit frames are used rather than
+        # recursion so that the depth is not limited by the number of
+        # outcomes.
+        stack: list[tuple[int, Iterator]] = []
+
+        def add_subproblem(cache_key, alignment, generators,
+                           result: Mapping[Any, int] | None) -> int:
+            index = len(results)
+            indices[cache_key] = index
+            uses.append(0)
+            heights.append(0)
+            if result is None and all(
+                    not generator.outcomes()
+                    for generator in generators) and not alignment.outcomes():
+                result = {None: one}
+                self._cache[cache_key] = result
+            results.append(result)
+            if result is None:
+                outcome, prev_alignment, iterators = MultisetEvaluator._pop_generators(
+                    order, alignment, generators)
+                transitions = list(
+                    MultisetEvaluator._iter_transitions(iterators, bits))
+                expansions.append(
+                    (cache_key, outcome, prev_alignment, transitions, []))
+                stack.append((index, iter(transitions)))
+            else:
+                expansions.append(None)
+            return index
+
+        # First find the subproblems depth-first, and how often each result
+        # is used, so that results can be released once no longer needed.
+        add_subproblem(root_key, alignment, generators, None)
+        while stack:
+            index, remaining = stack[-1]
+            _, _, prev_alignment, _, children = cast(tuple, expansions[index])
+            for prev_generators, _, _ in remaining:
+                prev_key = (order, prev_alignment, prev_generators, bits)
+                child = indices.get(prev_key)
+                if child is None:
+                    cached = self._cache.get(prev_key)
+                    if metrics is not None:
+                        if cached is not None:
+                            metrics.cache_hits += 1
+                        else:
+                            metrics.cache_misses += 1
+                    child = add_subproblem(prev_key, prev_alignment,
+                                           prev_generators, cached)
+                    children.append(child)
+                    uses[child] += 1
+                    if cached is None and expansions[child] is not None:
+                        # Find the child's subproblems first.
+                        break
+                else:
+                    # Since the search is depth-first, this subproblem has
+                    # already been fully explored.
+                    children.append(child)
+                    uses[child] += 1
+            else:
+                stack.pop()
+                heights[index] = 1 + max(heights[child] for child in children)
+
+        # Then compute the subproblems, children first. Going by height
+        # rather than in the order found means that a result is usually
+        # released soon after the subproblems one level above it.
+        for index in sorted(
+            (index
+             for index, expansion in enumerate(expansions) if expansion),
+                key=heights.__getitem__):
+            cache_key, outcome, _, transitions, children = cast(
+                tuple, expansions[index])
+            expansions[index] = None
+            result: MutableMapping[Any, int] = defaultdict(int)
+            for child, (_, counts, prod_weight) in zip(children, transitions):
+                prev = cast(Mapping[Any, int], results[child])
+                uses[child] -= 1
+                if not uses[child]:
+                    results[child] = None
                 for prev_state, prev_weight in prev.items():
                     state = self.next_state(prev_state, outcome, *counts)
                     if state is not icepool.Reroll:
-                        result[state] += prev_weight * prod_weight
+                        if bits is None:
+                            result[state] += prev_weight * prod_weight
+                        else:
+                            result[state] += _fixed_point_multiply(
+                                prev_weight, prod_weight, bits)
+            results[index] = result
+            self._cache[cache_key] = result
+            if metrics is not None:
+                metrics.record_step(outcome, len(result), len(transitions))
 
-        self._cache[cache_key] = result
-        return result
+        return cast(Mapping[Any, int], results[0])
 
     def _eval_internal_iterative(
         self, order: int, alignment: 'Alignment[T_contra]',
@@ -414,36 +930,99 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
         """Internal algorithm for iterating in the less-preferred order,
         i.e. giving outcomes to `next_state()` from narrow to wide.
 
-        This algorithm does not perform persistent memoization.
+        This algorithm does not perform persistent memoization. Unlike
+        `_eval_internal()`, it stops processing states that are absorbing
+        according to `is_absorbing()`.
         """
+        bits = icepool.precision.get_precision()
+        one = 1 if bits is None else 1 << bits
         if all(not generator.outcomes()
                for generator in generators) and not alignment.outcomes():
-            return {None: 1}
+            return {None: one}
         dist: MutableMapping[Any, int] = defaultdict(int)
-        dist[None, alignment, generators] = 1
+        dist[None, alignment, generators] = one
         final_dist: MutableMapping[Any, int] = defaultdict(int)
+        metrics = icepool.instrumentation.current()
+        can_absorb = self._can_absorb()
         while dist:
             next_dist: MutableMapping[Any, int] = defaultdict(int)
+            transition_count = 0
             for (prev_state, prev_alignment,
                  prev_generators), weight in dist.items():
                 # The order flip here is the only purpose of this algorithm.
                 outcome, alignment, iterators = MultisetEvaluator._pop_generators(
                     -order, prev_alignment, prev_generators)
-                for p in itertools.product(*iterators):
-                    generators, counts, weights = zip(*p)
-                    counts = tuple(itertools.chain.from_iterable(counts))
-                    prod_weight = math.prod(weights)
+                for generators, counts, prod_weight in MultisetEvaluator._iter_transitions(
+                        iterators, bits):
+                    transition_count += 1
                     state = self.next_state(prev_state, outcome, *counts)
                     if state is not icepool.Reroll:
+                        if bits is None:
+                            next_weight = weight * prod_weight
+                        else:
+                            next_weight = _fixed_point_multiply(
+                                weight, prod_weight, bits)
                         if all(not generator.outcomes()
                                for generator in generators):
-                            final_dist[state] += weight * prod_weight
+                            final_dist[state] += next_weight
+                        elif can_absorb and self.is_absorbing(state):
+                            # Credit the state with every way of producing
+                            # the remaining outcomes. With limited precision,
+                            # the weights are already probabilities.
+                            if bits is None:
+                                next_weight *= math.prod(
+                                    generator.denominator()
+                                    for generator in generators)
+                            final_dist[state] += next_weight
                         else:
                             next_dist[state, alignment,
-                                      generators] += weight * prod_weight
+                                      generators] += next_weight
+            if metrics is not None:
+                # On the last step, the states are in the final distribution.
+                metrics.record_step(outcome, len(next_dist) or len(final_dist),
+                                    transition_count)
             dist = next_dist
         return final_dist
 
+    @staticmethod
+    def _iter_transitions(
+        iterators: 'tuple[icepool.NextMultisetGenerator, ...]',
+        bits: int | None
+    ) -> 'Iterator[tuple[tuple[icepool.MultisetGenerator, ...], tuple[int, ...], int]]':
+        """Iterates over the product of popped generators.
+
+        Args:
+            iterators: As the last return value of `_pop_generators()`.
+            bits: The precision. If not `None`, weights are converted to
+                fixed-point probabilities with this many bits.
+
+        Yields:
+            * The remaining generators.
+            * The flattened counts.
+            * The weight.
+        """
+        if bits is None:
+            for p in itertools.product(*iterators):
+                generators, counts, weights = zip(*p)
+                yield generators, tuple(itertools.chain.from_iterable(
+                    counts)), math.prod(weights)
+        else:
+            transitions = []
+            total_weights = []
+            for p in itertools.product(*iterators):
+                generators, counts, weights = zip(*p)
+                transitions.append(
+                    (generators, tuple(itertools.chain.from_iterable(counts))))
+                total_weights.append(
+                    math.prod(weights) *
+                    math.prod(generator.denominator()
+                              for generator in generators))
+            for (generators, counts), weight in zip(
+                    transitions,
+                    icepool.precision.normalize_weights(total_weights,
+                                                        bits)):
+                yield generators, counts, weight
+
     @staticmethod
     def _initialize_generators(
         generators: 'tuple[icepool.MultisetGenerator[T_contra, Any], ...]'
@@ -482,27 +1061,168 @@ class MultisetEvaluator(ABC, Generic[T_contra, U_co]):
             return outcome, next_alignment, tuple(
                 generator._generate_min(outcome) for generator in generators)
 
+    @overload
     def sample(
-        self, *generators:
-        'icepool.MultisetGenerator[T_contra, Any] | Mapping[T_contra, int] | Sequence[T_contra]'
-    ):
-        """EXPERIMENTAL: Samples one result from the generator(s) and evaluates the result."""
-        # Convert non-`Pool` arguments to `Pool`.
-        converted_generators = tuple(
-            generator if isinstance(generator, icepool.MultisetGenerator
-                                    ) else icepool.Pool(generator)
-            for generator in generators)
-
-        result = self.evaluate(*itertools.chain.from_iterable(
-            generator.sample() for generator in converted_generators))
-
-        if not result.is_empty():
-            return result.outcomes()[0]
-        else:
-            return result
+        self,
+        *args:
+        'MultisetExpression[T_contra] | Mapping[T_contra, int] | Sequence[T_contra]',
+        n: None = None,
+        rng: random.Random | None = None) -> U_co:
+        ...
+
+    @overload
+    def sample(
+        self,
+        *args:
+        'MultisetExpression[T_contra] | Mapping[T_contra, int] | Sequence[T_contra]',
+        n: int,
+        rng: random.Random | None = None) -> tuple[U_co, ...]:
+        ...
+
+    def sample(
+        self,
+        *args:
+        'MultisetExpression[T_contra] | Mapping[T_contra, int] | Sequence[T_contra]',
+        n: int | None = None,
+        rng: random.Random | None = None) -> U_co | tuple[U_co, ...]:
+        """EXPERIMENTAL: Samples final outcomes by Monte Carlo simulation.
+
+        Rather than evaluating exactly, each generator is rolled directly and
+        `next_state()` is applied to the sampled counts. This can be used for
+        generators that are too large to evaluate exactly.
+
+        `next_state()` sees every outcome of the generators and `alignment()`,
+        with zero counts for outcomes that were not rolled. If a state or
+        final outcome is `icepool.Reroll`, the whole sample is redrawn, so an
+        evaluation that always rerolls will never finish.
+
+        Args:
+            *args: As `evaluate()`. There must be no free variables.
+            n: If provided, a tuple of this many independent samples will be
+                returned. Otherwise, a single final outcome will be returned.
+            rng: A `random.Random` instance to draw from, e.g. for seeding.
+                If not provided, the global `random` functions are used.
+        """
+        expressions = tuple(
+            icepool.implicit_convert_to_expression(arg) for arg in args)
+
+        if any(expression._free_arity() > 0 for expression in expressions):
+            raise ValueError(
+                'Cannot sample expressions with free variables.')
+
+        if not all(
+                isinstance(expression, icepool.MultisetGenerator)
+                for expression in expressions):
+            from icepool.evaluator.expression import ExpressionEvaluator
+            return ExpressionEvaluator(*expressions,
+                                       evaluator=self).sample(n=n, rng=rng)
+
+        generators = cast(tuple[icepool.MultisetGenerator, ...], expressions)
+
+        self.validate_arity(
+            sum(generator.output_arity() for generator in generators))
+
+        generators = self.prefix_generators() + generators
+
+        if not all(generator._is_resolvable() for generator in generators):
+            raise ValueError('Cannot sample from unresolvable generators.')
+
+        outcomes = sorted_union(*(generator.outcomes()
+                                  for generator in generators))
+        outcomes = sorted_union(outcomes, self.alignment(outcomes))
+        if self.order() == Order.Descending:
+            outcomes = outcomes[::-1]
+
+        if n is None:
+            return self._sample_one(generators, outcomes, rng or random)
+        return tuple(
+            self._sample_one(generators, outcomes, rng or random)
+            for _ in range(n))
+
+    def _sample_one(self,
+                    generators: 'tuple[icepool.MultisetGenerator, ...]',
+                    outcomes: Sequence, rng: 'random.Random | ModuleType'):
+        """Samples a single final outcome, redrawing on rerolls."""
+        while True:
+            sampled_counts = tuple(
+                itertools.chain.from_iterable(
+                    generator._sample_counts(rng)
+                    for generator in generators))
+            state = None
+            for outcome in outcomes:
+                state = self.next_state(
+                    state, outcome,
+                    *(counts.get(outcome, 0) for counts in sampled_counts))
+                if state is icepool.Reroll:
+                    break
+            else:
+                final_outcome = self.final_outcome(state)
+                if final_outcome is None:
+                    raise TypeError(
+                        "None is not a valid final outcome.\n"
+                        "This may have been a result of not supplying any generator with an outcome."
+                    )
+                if isinstance(final_outcome, icepool.Die):
+                    if final_outcome.is_empty():
+                        continue
+                    return final_outcome.sample(rng=rng)
+                if final_outcome is not icepool.Reroll:
+                    return final_outcome
 
     def __bool__(self) -> bool:
         raise TypeError('MultisetEvaluator does not have a truth value.')
 
     def __str__(self) -> str:
         return type(self).__name__
+
+
+def _fixed_point_multiply(a: int, b: int, bits: int) -> int:
+    """Multiplies two fixed-point numbers, rounding nonzero results to at least 1."""
+    if a == 0 or b == 0:
+        return 0
+    return max((a * b + (1 << (bits - 1))) >> bits, 1)
+
+
+def _call_with_precision(bits: int | None, function: Callable, *args):
+    """Calls the function at the given precision.
+
+    This is used to carry the precision over to executor workers. Only the
+    current context is affected, so concurrent tasks in other threads are not.
+    """
+    token = icepool.precision._local_bits.set(bits)
+    try:
+        return function(*args)
+    finally:
+        icepool.precision._local_bits.reset(token)
+
+
+def _fold_convolve(a: Mapping[Any, int], b: Mapping[Any, int],
+                   op: Callable[[Any, Any], Any]) -> Mapping[Any, int]:
+    """Combines two distributions of states using a fold operator."""
+    result: MutableMapping[Any, int] = defaultdict(int)
+    for state_a, weight_a in a.items():
+        for state_b, weight_b in b.items():
+            result[op(state_a, state_b)] += weight_a * weight_b
+    return icepool.precision.round_quantities(result)
+
+
+def _fold_power(data: Mapping[Any, int], count: int,
+                op: Callable[[Any, Any], Any]) -> Mapping[Any, int]:
+    """Combines `count` independent copies of a distribution of states."""
+    result: Mapping[Any, int] | None = None
+    power = data
+    while True:
+        if count % 2:
+            result = power if result is None else _fold_convolve(
+                result, power, op)
+        count //= 2
+        if not count:
+            return cast(Mapping[Any, int], result)
+        power = _fold_convolve(power, power, op)
+
+
+def _is_commutative_sum(state) -> bool:
+    """Whether adding states of this kind is commutative."""
+    if isinstance(state, icepool.Vector):
+        return all(isinstance(x, numbers.Number) for x in state)
+    return isinstance(state, numbers.Number)
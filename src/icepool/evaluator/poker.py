@@ -9,7 +9,7 @@ from icepool.population.die import Die
 import operator
 
 from icepool.typing import Outcome, Order, RerollType
-from typing import Any, Callable, Collection, Hashable, Literal, Sequence
+from typing import Any, Callable, Collection, Hashable, Literal, Mapping, MutableMapping, Sequence
 
 
 class HighestOutcomeAndCountEvaluator(MultisetEvaluator[Any, tuple[Any, int]]):
@@ -48,13 +48,20 @@ class AllCountsEvaluator(MultisetEvaluator[Any, tuple[int, ...]]):
     In other words, this produces tuples of the sizes of all matching sets.
     """
 
-    def __init__(self, *, filter: int | None = 1) -> None:
+    def __init__(
+            self,
+            *,
+            filter: int | None = 1,
+            cache: MutableMapping[Any, Mapping[Any, int]] | None = None
+    ) -> None:
         """
         Args:
             filter: Any counts below this value will not be in the output.
                 For example, `filter=2` will only produce pairs and better.
                 If `None`, no filtering will be done.
+            cache: See `MultisetEvaluator.__init__()`.
         """
+        super().__init__(cache=cache)
         self._filter = filter
 
     def next_state(self, state, outcome, count):
@@ -109,13 +116,19 @@ class LargestCountAndOutcomeEvaluator(MultisetEvaluator[Any, tuple[int, Any]]):
 class CountSubsetEvaluator(MultisetEvaluator[Any, int]):
     """The number of times the right side is contained in the left side."""
 
-    def __init__(self, *, empty_divisor: int | None = None):
+    def __init__(
+            self,
+            *,
+            empty_divisor: int | None = None,
+            cache: MutableMapping[Any, Mapping[Any, int]] | None = None):
         """
         Args:
             empty_divisor: If the divisor is empty, the outcome will be this.
                 If not set, `ZeroDivisionError` will be raised for an empty
                 right side.
+            cache: See `MultisetEvaluator.__init__()`.
         """
+        super().__init__(cache=cache)
         self._empty_divisor = empty_divisor
 
     def next_state(self, state, _, left, right):
@@ -231,14 +244,20 @@ class AllStraightsReduceCountsEvaluator(MultisetEvaluator[int,
 
     The result is a tuple of `(run_length, run_score)`s."""
 
-    def __init__(self, reducer: Callable[[int, int], int] = operator.mul):
+    def __init__(
+            self,
+            reducer: Callable[[int, int], int] = operator.mul,
+            *,
+            cache: MutableMapping[Any, Mapping[Any, int]] | None = None):
         """Constructor.
 
         Args:
             reducer: How to reduce the counts within each straight. The default
                 is `operator.mul`, which counts the number of ways to pick
                 elements for each straight, e.g. cribbage.
+            cache: See `MultisetEvaluator.__init__()`.
         """
+        super().__init__(cache=cache)
         self._reducer = reducer
 
     def next_state(self, state, _, count):
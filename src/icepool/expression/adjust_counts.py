@@ -115,6 +115,12 @@ class MultiplyCountsExpression(AdjustCountsExpression):
     def adjust_count(self, count: int, constant: int) -> int:
         return count * constant
 
+    def _can_bucket(self) -> bool:
+        return self._inner._can_bucket()
+
+    def _outcome_key(self, outcome: T_contra) -> Hashable:
+        return self._inner._outcome_key(outcome)
+
     def __str__(self) -> str:
         return f'({self._inner} * {self._constant})'
 
@@ -128,6 +128,12 @@ class AdditiveUnionExpression(BinaryOperatorExpression):
     def symbol() -> str:
         return '+'
 
+    def _can_bucket(self) -> bool:
+        return all(inner._can_bucket() for inner in self._inners)
+
+    def _outcome_key(self, outcome: T_contra) -> Hashable:
+        return tuple(inner._outcome_key(outcome) for inner in self._inners)
+
 
 class SymmetricDifferenceExpression(BinaryOperatorExpression):
 
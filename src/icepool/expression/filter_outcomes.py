@@ -55,6 +55,13 @@ class FilterOutcomesExpression(MultisetExpression[T_contra]):
     def _order(self) -> Order:
         return self._inner._order()
 
+    def _can_bucket(self) -> bool:
+        return self._inner._can_bucket()
+
+    def _outcome_key(self, outcome: T_contra) -> Hashable:
+        return (bool(self._func(outcome)) != self._invert,
+                self._inner._outcome_key(outcome))
+
     def _bound_generators(self) -> 'tuple[icepool.MultisetGenerator, ...]':
         return self._inner._bound_generators()
 
@@ -112,6 +112,10 @@ class KeepExpression(MultisetExpression[T_contra]):
         self._drop = drop
         return self
 
+    def __reduce__(self):
+        return KeepExpression._new_raw, (self._inner, self._keep_order,
+                                         self._keep_tuple, self._drop)
+
     def _next_state(self, state, outcome: T_contra, *counts:
                     int) -> tuple[Hashable, int]:
         if self._drop is None:
@@ -4,6 +4,7 @@ from types import EllipsisType
 import icepool
 import icepool.evaluator
 
+from functools import cached_property
 import operator
 
 from abc import ABC, abstractmethod
@@ -150,6 +151,36 @@ class MultisetExpression(ABC, Generic[T_contra]):
             The transformed expression and the new prefix_start.
         """
 
+    def _can_bucket(self) -> bool:
+        """Whether outcomes with equal `_outcome_key()` may be merged.
+
+        This requires that the count produced for a merged outcome is the sum
+        of the counts that would have been produced for the individual
+        outcomes. See `MultisetEvaluator.outcome_key()`.
+
+        The default is `False`.
+        """
+        return False
+
+    def _outcome_key(self, outcome: T_contra) -> Hashable:
+        """A key such that outcomes with equal keys are treated alike.
+
+        This is only called if `_can_bucket()` is `True`.
+        """
+        return outcome
+
+    @cached_property
+    def _hash_key(self) -> Hashable | None:
+        """A key that is equal for structurally identical expressions.
+
+        This is used to share caches between evaluators of unbound expressions.
+        The default is the type of the expression together with its instance
+        attributes, or `None` if any attribute is unhashable.
+
+        This is not used for `==`, which is a multiset comparison.
+        """
+        return icepool.cache.structural_key(self)
+
     @staticmethod
     def _validate_output_arity(inner: 'MultisetExpression') -> None:
         """Validates that if the given expression is a generator, its output arity is 1."""
@@ -30,6 +30,12 @@ class MultisetVariable(MultisetExpression[Any]):
     def _order(self):
         return Order.Any
 
+    def _can_bucket(self) -> bool:
+        return True
+
+    def _outcome_key(self, outcome: Outcome) -> None:
+        return None
+
     def _free_arity(self) -> int:
         return self._index + 1
 
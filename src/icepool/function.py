@@ -3,6 +3,7 @@
 __docformat__ = 'google'
 
 import icepool
+import icepool.cache
 import icepool.population.markov_chain
 from icepool.typing import Outcome, T, U, guess_star
 
@@ -509,6 +510,17 @@ def map(
             return result
     else:
         # Infinite repeat.
+        persistent_cache = icepool.cache.get_persistent_cache()
+        persistent_key = None
+        if persistent_cache is not None:
+            persistent_key = icepool.cache.persistent_key(
+                persistent_cache.version, 'map', repl, args, star, again_count, again_depth, again_end,
+                icepool.precision.get_precision())
+            if persistent_key is not None:
+                cached_result = persistent_cache.get(persistent_key)
+                if cached_result is not None:
+                    return cached_result
+
         # T_co and U should be the same in this case.
         def unary_transition_function(state):
             return map(transition_function,
@@ -519,8 +531,11 @@ def map(
                        again_depth=again_depth,
                        again_end=again_end)
 
-        return icepool.population.markov_chain.absorbing_markov_chain(
+        result = icepool.population.markov_chain.absorbing_markov_chain(
             icepool.Die([args[0]]), unary_transition_function)
+        if persistent_key is not None:
+            persistent_cache[persistent_key] = result
+        return result
 
 
 @overload
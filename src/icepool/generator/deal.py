@@ -2,9 +2,9 @@ __docformat__ = 'google'
 
 from icepool.typing import Outcome, Qs, T
 
-from typing import Any, Hashable, cast
+from typing import Any, Hashable, Mapping, cast
 import icepool
-from icepool.collection.counts import CountsKeysView
+from icepool.collection.counts import Counts, CountsKeysView
 from icepool.generator.multiset_generator import InitialMultisetGenerator, NextMultisetGenerator, MultisetGenerator
 from icepool.math import iter_hypergeom
 
@@ -94,6 +94,13 @@ class Deal(MultisetGenerator[T, Qs]):
     def _generate_initial(self) -> InitialMultisetGenerator:
         yield self, 1
 
+    def _bucket(self, representatives: Mapping[Any, Any],
+                /) -> 'Deal[T, Qs]':
+        deck = icepool.Deck._new_raw(
+            Counts((representatives[outcome], quantity)
+                   for outcome, quantity in self.deck().items()))
+        return Deal._new_raw(deck, self.hand_sizes())
+
     def _generate_common(self, popped_deck: 'icepool.Deck[T]',
                          deck_count: int) -> NextMultisetGenerator:
         """Common implementation for _generate_min and _generate_max."""
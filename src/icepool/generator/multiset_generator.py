@@ -14,9 +14,11 @@ import itertools
 import random
 
 from abc import ABC, abstractmethod
+from collections import defaultdict
 from functools import cached_property
+from types import ModuleType
 
-from typing import Any, Callable, Collection, Generic, Hashable, Iterator, Mapping, Sequence, TypeAlias, cast
+from typing import Any, Callable, Collection, Generic, Hashable, Iterator, Mapping, MutableMapping, Sequence, TypeAlias, cast
 
 InitialMultisetGenerator: TypeAlias = Iterator[tuple[
     'icepool.MultisetGenerator', int]]
@@ -120,6 +122,35 @@ class MultisetGenerator(Generic[T, Qs], MultisetExpression[T]):
     def denominator(self) -> int:
         """The total weight of all paths through this generator."""
 
+    def _bucket(self, representatives: Mapping[Any, Any],
+                /) -> 'MultisetGenerator | None':
+        """Merges outcomes into buckets, e.g. for `MultisetEvaluator.outcome_key()`.
+
+        Args:
+            representatives: Maps each outcome of this generator to the
+                outcome representing its bucket.
+
+        Returns:
+            A generator that produces, for each representative, the total
+            count of the outcomes in its bucket, with the same denominator.
+            `None` if this generator does not support bucketing, which is the
+            default.
+        """
+        return None
+
+    def _fold_dice(self) -> 'Sequence[tuple[icepool.Die, int]] | None':
+        """The independent dice making up this generator, if any.
+
+        Used by `MultisetEvaluator.fold_operator()`.
+
+        Returns:
+            A sequence of `(die, count)` pairs, such that this generator
+            produces exactly one element from each of `count` rolls of each
+            `die`. `None` if this generator is not of this form, which is the
+            default.
+        """
+        return None
+
     @property
     @abstractmethod
     def _hash_key(self) -> Hashable:
@@ -208,37 +239,71 @@ class MultisetGenerator(Generic[T, Qs], MultisetExpression[T]):
 
     # Sampling.
 
-    def sample(self) -> tuple[tuple, ...]:
+    def sample(self,
+               *,
+               rng: random.Random | None = None) -> tuple[tuple, ...]:
         """EXPERIMENTAL: A single random sample from this generator.
 
         This uses the standard `random` package and is not cryptographically
         secure.
 
+        Args:
+            rng: A `random.Random` instance to draw from, e.g. for seeding.
+                If not provided, the global `random` functions are used.
+
         Returns:
             A sorted tuple of outcomes for each output of this generator.
         """
         if not self.outcomes():
             raise ValueError('Cannot sample from an empty set of outcomes.')
+        return tuple(
+            tuple(
+                itertools.chain.from_iterable((outcome, ) * count
+                                              for outcome, count in sorted(
+                                                  counts.items())))
+            for counts in self._sample_counts(rng or random))
 
-        min_cost, max_cost = self._estimate_order_costs()
+    def _sample_counts(
+        self, rng: 'random.Random | ModuleType'
+    ) -> tuple[MutableMapping[Any, int], ...]:
+        """Samples the counts of each outcome directly.
 
-        if min_cost < max_cost:
-            outcome = self.min_outcome()
-            generated = tuple(self._generate_min(outcome))
-        else:
-            outcome = self.max_outcome()
-            generated = tuple(self._generate_max(outcome))
+        Subclasses may override this with a faster method.
 
-        cumulative_weights = tuple(
-            itertools.accumulate(g.denominator() * w for g, _, w in generated))
-        denominator = cumulative_weights[-1]
+        Args:
+            rng: A `random.Random` instance or the `random` module itself.
+
+        Returns:
+            For each output, a mapping from outcomes to counts. Outcomes with
+            zero count may be omitted.
+        """
         # We don't use random.choices since that is based on floats rather than ints.
-        r = random.randrange(denominator)
-        index = bisect.bisect_right(cumulative_weights, r)
-        popped_generator, counts, _ = generated[index]
-        head = tuple((outcome, ) * count for count in counts)
-        if popped_generator.outcomes():
-            tail = popped_generator.sample()
-            return tuple(tuple(sorted(h + t)) for h, t, in zip(head, tail))
-        else:
-            return head
+        initial = tuple(self._generate_initial())
+        if len(initial) != 1 or initial[0][0] is not self:
+            cumulative_weights = tuple(
+                itertools.accumulate(g.denominator() * w for g, w in initial))
+            index = bisect.bisect_right(cumulative_weights,
+                                        rng.randrange(cumulative_weights[-1]))
+            return initial[index][0]._sample_counts(rng)
+
+        result: tuple[MutableMapping[Any, int], ...] = tuple(
+            defaultdict(int) for _ in range(self.output_arity()))
+        generator: MultisetGenerator = self
+        while generator.outcomes():
+            min_cost, max_cost = generator._estimate_order_costs()
+            if min_cost < max_cost:
+                outcome = generator.min_outcome()
+                generated = tuple(generator._generate_min(outcome))
+            else:
+                outcome = generator.max_outcome()
+                generated = tuple(generator._generate_max(outcome))
+
+            cumulative_weights = tuple(
+                itertools.accumulate(g.denominator() * w
+                                     for g, _, w in generated))
+            index = bisect.bisect_right(cumulative_weights,
+                                        rng.randrange(cumulative_weights[-1]))
+            generator, counts, _ = generated[index]
+            for output, count in zip(result, counts):
+                output[outcome] += count
+        return result
@@ -1,21 +1,25 @@
 __docformat__ = 'google'
 
 import icepool
+import icepool.cache
 import icepool.expression
 import icepool.math
 import icepool.generator.pool_cost
 import icepool.creation_args
+from icepool.collection.counts import Counts
 from icepool.generator.keep import KeepGenerator, pop_max_from_keep_tuple, pop_min_from_keep_tuple
 from icepool.generator.multiset_generator import InitialMultisetGenerator, NextMultisetGenerator
 
 import itertools
 import math
 import operator
+import random
 from collections import defaultdict
-from functools import cache, cached_property, reduce
+from functools import cached_property, reduce
+from types import ModuleType
 
 from icepool.typing import T
-from typing import TYPE_CHECKING, Any, Collection, Iterator, Mapping, MutableMapping, Sequence, cast
+from typing import TYPE_CHECKING, Any, Callable, Collection, Final, Iterator, Mapping, MutableMapping, Sequence, cast
 
 if TYPE_CHECKING:
     from icepool.expression import MultisetExpression
@@ -90,8 +94,10 @@ class Pool(KeepGenerator[T]):
         keep_tuple = (1, ) * sum(times)
         return cls._new_from_mapping(dice_counts, keep_tuple)
 
+    _new_raw_cache: Final = icepool.cache.LRUCache(65536)
+    """Interning table for `_new_raw()`, bounded so that intermediate pools do not accumulate."""
+
     @classmethod
-    @cache
     def _new_raw(cls, dice: tuple[tuple['icepool.Die[T]', int]],
                  keep_tuple: tuple[int, ...]) -> 'Pool[T]':
         """All pool creation ends up here. This method is cached.
@@ -100,19 +106,80 @@ class Pool(KeepGenerator[T]):
             dice: A tuple of (die, count) pairs.
             keep_tuple: A tuple of how many times to count each die.
         """
-        self = super(Pool, cls).__new__(cls)
-        self._dice = dice
-        self._keep_tuple = keep_tuple
+        key = (cls, dice, keep_tuple)
+        self = Pool._new_raw_cache.get(key)
+        if self is None:
+            self = super(Pool, cls).__new__(cls)
+            self._dice = dice
+            self._keep_tuple = keep_tuple
+            Pool._new_raw_cache[key] = self
         return self
 
+    def __reduce__(self):
+        # Unpickled pools go through the same cache as other pools.
+        return Pool._new_raw, (self._dice, self._keep_tuple)
+
     @classmethod
     def _new_empty(cls) -> 'Pool':
         return cls._new_raw((), ())
 
+    _transition_cache: Final = icepool.cache.LRUCache(65536)
+    """Transitions of `_generate_min()` and `_generate_max()`, keyed by `(pool, side, outcome)`."""
+
     @classmethod
     def clear_cache(cls):
-        """Clears the global pool cache."""
-        Pool._new_raw.cache_clear()
+        """Clears the global pool cache and the pool transition cache."""
+        Pool._new_raw_cache.clear()
+        Pool._transition_cache.clear()
+
+    @classmethod
+    def cache_stats(cls) -> 'icepool.CacheStats':
+        """Statistics for the global pool cache."""
+        return Pool._new_raw_cache.stats()
+
+    @classmethod
+    def set_cache_limit(cls,
+                        max_entries: int | None,
+                        *,
+                        max_size: int | None = None) -> None:
+        """Sets the limits of the global pool cache.
+
+        Least recently used pools are evicted beyond these limits. Evicted
+        pools remain valid; a pool with the same dice will simply be a separate
+        object.
+
+        Args:
+            max_entries: The maximum number of pools, or `None` for no limit.
+                The default is 65536.
+            max_size: The maximum total estimated size in bytes, or `None` for
+                no limit. This only counts pools created after it is set.
+        """
+        Pool._new_raw_cache.set_limits(max_entries, max_size=max_size)
+
+    @classmethod
+    def transition_cache_stats(cls) -> 'icepool.CacheStats':
+        """Statistics for the global pool transition cache."""
+        return Pool._transition_cache.stats()
+
+    @classmethod
+    def set_transition_cache_limit(cls,
+                                   max_entries: int | None,
+                                   *,
+                                   max_size: int | None = None) -> None:
+        """Sets the limits of the global pool transition cache.
+
+        Each entry holds the popped pools, counts, and weights resulting from
+        popping a single outcome from a single pool. These are shared between
+        all evaluators, so evaluating several evaluators over the same pool
+        only computes them once.
+
+        Args:
+            max_entries: The maximum number of entries, or `None` for no
+                limit. The default is 65536.
+            max_size: The maximum total estimated size in bytes, or `None` for
+                no limit. This only counts entries created after it is set.
+        """
+        Pool._transition_cache.set_limits(max_entries, max_size=max_size)
 
     @classmethod
     def _new_from_mapping(cls, dice_counts: Mapping['icepool.Die[T]', int],
@@ -123,8 +190,13 @@ class Pool(KeepGenerator[T]):
             dice_counts: A map from dice to rolls.
             keep_tuple: A tuple with length equal to the number of dice.
         """
-        dice = tuple(
-            sorted(dice_counts.items(), key=lambda kv: kv[0]._hash_key))
+        # The order must not depend on `hash()`, which varies between
+        # processes for e.g. `str` outcomes.
+        if len(dice_counts) == 1:
+            dice = tuple(dice_counts.items())
+        else:
+            dice = tuple(
+                sorted(dice_counts.items(), key=lambda kv: kv[0]._hash_key))
         return Pool._new_raw(dice, keep_tuple)
 
     @cached_property
@@ -199,33 +271,102 @@ class Pool(KeepGenerator[T]):
     def _generate_initial(self) -> InitialMultisetGenerator:
         yield self, 1
 
-    def _generate_min(self, min_outcome) -> NextMultisetGenerator:
-        """Pops the given outcome from this pool, if it is the min outcome.
-
-        Yields:
-            popped_pool: The pool after the min outcome is popped.
-            count: The number of dice that rolled the min outcome, after
-                accounting for keep_tuple.
-            weight: The weight of this incremental result.
+    def _bucket(self, representatives: Mapping[Any, Any],
+                /) -> 'Pool[T] | None':
+        # Dropping elements depends on the order within each bucket.
+        if any(keep != self._keep_tuple[0] for keep in self._keep_tuple):
+            return None
+        dice_counts: MutableMapping['icepool.Die[T]', int] = defaultdict(int)
+        for die, count in self._dice:
+            bucketed = icepool.Die._new_raw(
+                Counts((representatives[outcome], quantity)
+                       for outcome, quantity in die.items()))
+            dice_counts[bucketed] += count
+        return Pool._new_from_mapping(dice_counts, self._keep_tuple)
+
+    def _fold_dice(self) -> 'Sequence[tuple[icepool.Die[T], int]] | None':
+        if any(keep != 1 for keep in self._keep_tuple):
+            return None
+        return self._dice
+
+    def _sample_counts(
+            self, rng: 'random.Random | ModuleType'
+    ) -> tuple[MutableMapping[Any, int], ...]:
+        """Rolls the dice directly."""
+        rolls = sorted(
+            itertools.chain.from_iterable(
+                die.sample(count, rng=rng) for die, count in self._dice))
+        result: MutableMapping[Any, int] = defaultdict(int)
+        for outcome, keep in zip(rolls, self._keep_tuple):
+            result[outcome] += keep
+        return (result, )
+
+    def _generate_common(self, outcome, iter_die_pop: Callable[
+        ['icepool.Die[T]', int, Any], Iterator[tuple['icepool.Die[T]', int,
+                                                     int, int]]],
+                         pop_from_keep_tuple: Callable[
+                             [tuple[int, ...], int], tuple[tuple[int, ...],
+                                                           int]]
+                         ) -> NextMultisetGenerator:
+        """Common implementation for _generate_min and _generate_max.
+
+        Dice that are identical after popping are grouped together, and the
+        hit distribution of each group is computed by multiplying the hit
+        polynomials of its members. So the product is taken over the distinct
+        popped dice rather than over every die in the pool, and results are
+        merged by `(popped_pool, count)` before being yielded.
+
+        This only helps if some dice become identical after popping. A mix of
+        distinct dice that all can roll the outcome, e.g. d4 through d12 when
+        popping 1, still takes the full product of their hit counts. Each
+        element of that product leaves a different popped pool, so it cannot
+        be merged away here.
         """
         if not self.outcomes():
             yield self, (0, ), 1
             return
-        generators = [
-            iter_die_pop_min(die, die_count, min_outcome)
-            for die, die_count in self._dice
-        ]
+
+        # popped_die -> [rolls, coefficients of the hit polynomial,
+        #                min hits, max hits]
+        # Zero-weight hit counts within the range are kept so that zero-weight
+        # outcomes are preserved.
+        groups: dict['icepool.Die[T]', list] = {}
+        for die, die_count in self._dice:
+            poly = [0] * (die_count + 1)
+            hit_range = []
+            for popped_die, _, hits, weight in iter_die_pop(
+                    die, die_count, outcome):
+                poly[hits] = weight
+                hit_range.append(hits)
+            min_hits = min(hit_range)
+            max_hits = max(hit_range)
+            if popped_die in groups:
+                group = groups[popped_die]
+                group[0] += die_count
+                group[1] = icepool.math.convolve(group[1], poly)
+                group[2] += min_hits
+                group[3] += max_hits
+            else:
+                groups[popped_die] = [die_count, poly, min_hits, max_hits]
+
+        # For each group: (popped_die, misses, hits, weight)
+        group_pops = [[(popped_die, rolls - hits, hits, poly[hits])
+                       for hits in range(min_hits, max_hits + 1)]
+                      for popped_die, (rolls, poly, min_hits,
+                                       max_hits) in groups.items()]
+
+        results: MutableMapping[tuple['Pool[T]', int], int] = defaultdict(int)
         skip_weight = None
-        for pop in itertools.product(*generators):
+        for pop in itertools.product(*group_pops):
             total_hits = 0
             result_weight = 1
-            next_dice_counts: MutableMapping[Any, int] = defaultdict(int)
+            next_dice_counts: MutableMapping[Any, int] = {}
             for popped_die, misses, hits, weight in pop:
-                if not popped_die.is_empty():
-                    next_dice_counts[popped_die] += misses
+                if misses and not popped_die.is_empty():
+                    next_dice_counts[popped_die] = misses
                 total_hits += hits
                 result_weight *= weight
-            popped_keep_tuple, result_count = pop_min_from_keep_tuple(
+            popped_keep_tuple, result_count = pop_from_keep_tuple(
                 self.keep_tuple(), total_hits)
             popped_pool = Pool._new_from_mapping(next_dice_counts,
                                                  popped_keep_tuple)
@@ -234,12 +375,32 @@ class Pool(KeepGenerator[T]):
                 skip_weight = (skip_weight or
                                0) + result_weight * popped_pool.denominator()
                 continue
+            results[popped_pool, result_count] += result_weight
 
-            yield popped_pool, (result_count, ), result_weight
+        for (popped_pool, result_count), weight in results.items():
+            yield popped_pool, (result_count, ), weight
 
         if skip_weight is not None:
             yield Pool._new_empty(), (sum(self.keep_tuple()), ), skip_weight
 
+    def _generate_min(self, min_outcome) -> NextMultisetGenerator:
+        """Pops the given outcome from this pool, if it is the min outcome.
+
+        Yields:
+            popped_pool: The pool after the min outcome is popped.
+            count: The number of dice that rolled the min outcome, after
+                accounting for keep_tuple.
+            weight: The weight of this incremental result.
+        """
+        key = (self, -1, min_outcome)
+        transitions = Pool._transition_cache.get(key)
+        if transitions is None:
+            transitions = tuple(
+                self._generate_common(min_outcome, iter_die_pop_min,
+                                      pop_min_from_keep_tuple))
+            Pool._transition_cache[key] = transitions
+        return iter(transitions)
+
     def _generate_max(self, max_outcome) -> NextMultisetGenerator:
         """Pops the given outcome from this pool, if it is the max outcome.
 
@@ -249,37 +410,14 @@ class Pool(KeepGenerator[T]):
                 accounting for keep_tuple.
             weight: The weight of this incremental result.
         """
-        if not self.outcomes():
-            yield self, (0, ), 1
-            return
-        generators = [
-            iter_die_pop_max(die, die_count, max_outcome)
-            for die, die_count in self._dice
-        ]
-        skip_weight = None
-        for pop in itertools.product(*generators):
-            total_hits = 0
-            result_weight = 1
-            next_dice_counts: MutableMapping[Any, int] = defaultdict(int)
-            for popped_die, misses, hits, weight in pop:
-                if not popped_die.is_empty():
-                    next_dice_counts[popped_die] += misses
-                total_hits += hits
-                result_weight *= weight
-            popped_keep_tuple, result_count = pop_max_from_keep_tuple(
-                self.keep_tuple(), total_hits)
-            popped_pool = Pool._new_from_mapping(next_dice_counts,
-                                                 popped_keep_tuple)
-            if not any(popped_keep_tuple):
-                # Dump all dice in exchange for the denominator.
-                skip_weight = (skip_weight or
-                               0) + result_weight * popped_pool.denominator()
-                continue
-
-            yield popped_pool, (result_count, ), result_weight
-
-        if skip_weight is not None:
-            yield Pool._new_empty(), (sum(self.keep_tuple()), ), skip_weight
+        key = (self, 1, max_outcome)
+        transitions = Pool._transition_cache.get(key)
+        if transitions is None:
+            transitions = tuple(
+                self._generate_common(max_outcome, iter_die_pop_max,
+                                      pop_max_from_keep_tuple))
+            Pool._transition_cache[key] = transitions
+        return iter(transitions)
 
     def _set_keep_tuple(self, keep_tuple: tuple[int,
                                                 ...]) -> 'KeepGenerator[T]':
@@ -0,0 +1,265 @@
+"""Optional metrics about `MultisetEvaluator` evaluations.
+
+Instrumentation is off by default and costs almost nothing when off. While at
+least one callback is registered, each call to `MultisetEvaluator.evaluate()`
+that reaches the evaluation engine produces an `EvaluationMetrics`, which is
+passed to every callback once the evaluation finishes successfully.
+
+Example:
+
+```python
+with icepool.instrument() as recorder:
+    icepool.d6.pool(10).highest(3).sum()
+for metrics in recorder.metrics:
+    print(metrics.to_dict())
+```
+
+Evaluations nested inside other evaluations produce their own metrics. Work
+submitted to an `executor` is not instrumented apart from the wall time of the
+phase that submitted it.
+"""
+
+__docformat__ = 'google'
+
+import threading
+import time
+
+from collections import defaultdict
+
+from typing import Any, Callable, Hashable, MutableMapping, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import icepool
+    from icepool.typing import Order
+
+PHASES = ('select', 'evaluate', 'finalize')
+"""The phases timed by `EvaluationMetrics.phase_times`.
+
+* `'select'`: Estimating order costs and selecting the algorithm.
+* `'evaluate'`: Running the algorithm.
+* `'finalize'`: Computing final outcomes and constructing the `Die`.
+"""
+
+_callbacks: list[Callable[['EvaluationMetrics'], Any]] = []
+_callbacks_lock = threading.Lock()
+
+
+class _CurrentMetrics(threading.local):
+    stack: list['EvaluationMetrics']
+
+    def __init__(self):
+        self.stack = []
+
+
+_current = _CurrentMetrics()
+
+
+class EvaluationMetrics():
+    """Metrics recorded for a single evaluation.
+
+    The counters are totals over all sub-evaluations, e.g. one for each pool
+    in a mixture of pools.
+    """
+
+    evaluator: 'icepool.MultisetEvaluator'
+    """The evaluator."""
+    generators: 'tuple[icepool.MultisetGenerator, ...]'
+    """The generators evaluated, including `prefix_generators()`."""
+    order: 'Order | None'
+    """The order in which `next_state()` saw outcomes."""
+    algorithm: str | None
+    """The name of the algorithm chosen by the evaluator, e.g.
+    `'_eval_internal'` or `'_eval_internal_iterative'`."""
+    pop_min_cost: int | None
+    """The estimated cost of popping from the min side."""
+    pop_max_cost: int | None
+    """The estimated cost of popping from the max side."""
+    states_per_outcome: MutableMapping[Hashable, int]
+    """For each outcome step, the total number of distinct states produced."""
+    transitions: int
+    """The number of generator transitions processed."""
+    cache_hits: int
+    """The number of subproblems found in the evaluator's cache."""
+    cache_misses: int
+    """The number of subproblems not found in the evaluator's cache."""
+    persistent_cache_hit: bool
+    """Whether the result was found in the persistent cache."""
+    phase_times: MutableMapping[str, float]
+    """The wall time in seconds spent in each phase. See `PHASES`."""
+    wall_time: float
+    """The total wall time in seconds."""
+
+    def __init__(self, evaluator: 'icepool.MultisetEvaluator',
+                 generators: 'tuple[icepool.MultisetGenerator, ...]'):
+        self.evaluator = evaluator
+        self.generators = generators
+        self.order = None
+        self.algorithm = None
+        self.pop_min_cost = None
+        self.pop_max_cost = None
+        self.states_per_outcome = defaultdict(int)
+        self.transitions = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.persistent_cache_hit = False
+        self.phase_times = defaultdict(float)
+        self.wall_time = 0.0
+        self._start = time.perf_counter()
+        self._last = self._start
+
+    def mark(self, phase: str) -> None:
+        """Attributes the time since the previous mark to `phase`."""
+        now = time.perf_counter()
+        self.phase_times[phase] += now - self._last
+        self._last = now
+
+    def record_step(self, outcome: Hashable, states: int,
+                    transitions: int) -> None:
+        """Records an outcome step producing `states` states."""
+        self.states_per_outcome[outcome] += states
+        self.transitions += transitions
+
+    @property
+    def cache_hit_rate(self) -> float | None:
+        """The fraction of cache lookups that hit, or `None` if there were none."""
+        lookups = self.cache_hits + self.cache_misses
+        if lookups == 0:
+            return None
+        return self.cache_hits / lookups
+
+    def to_dict(self) -> dict[str, Any]:
+        """The metrics as a dict of plain values, e.g. for logging as JSON.
+
+        The evaluator and generators are represented by their type names, and
+        outcomes by their `repr`.
+        """
+        return {
+            'evaluator': type(self.evaluator).__name__,
+            'generators':
+            [type(generator).__name__ for generator in self.generators],
+            'order': None if self.order is None else self.order.name,
+            'algorithm': self.algorithm,
+            'pop_min_cost': self.pop_min_cost,
+            'pop_max_cost': self.pop_max_cost,
+            'states_per_outcome': {
+                repr(outcome): states
+                for outcome, states in self.states_per_outcome.items()
+            },
+            'transitions': self.transitions,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'persistent_cache_hit': self.persistent_cache_hit,
+            'phase_times': dict(self.phase_times),
+            'wall_time': self.wall_time,
+        }
+
+    def __repr__(self) -> str:
+        return (f'EvaluationMetrics({type(self.evaluator).__name__}, '
+                f'order={self.order}, algorithm={self.algorithm}, '
+                f'transitions={self.transitions}, '
+                f'cache_hits={self.cache_hits}, '
+                f'cache_misses={self.cache_misses}, '
+                f'wall_time={self.wall_time:.6f})')
+
+
+def add_evaluation_callback(
+        callback: Callable[[EvaluationMetrics], Any], /) -> None:
+    """Registers a function to be called with the metrics of each evaluation.
+
+    Callbacks are called in the thread that ran the evaluation, after it
+    finishes successfully.
+    """
+    with _callbacks_lock:
+        _callbacks.append(callback)
+
+
+def remove_evaluation_callback(
+        callback: Callable[[EvaluationMetrics], Any], /) -> None:
+    """Unregisters a function registered by `add_evaluation_callback()`.
+
+    Raises:
+        ValueError: If the callback is not registered.
+    """
+    with _callbacks_lock:
+        _callbacks.remove(callback)
+
+
+class Recorder():
+    """Context manager returned by `instrument()`."""
+
+    metrics: list[EvaluationMetrics]
+    """The metrics recorded so far, in order of completion."""
+
+    def __init__(self,
+                 callback: Callable[[EvaluationMetrics], Any] | None = None):
+        self.metrics = []
+        self._callback = callback
+
+    def _record(self, metrics: EvaluationMetrics) -> None:
+        self.metrics.append(metrics)
+        if self._callback is not None:
+            self._callback(metrics)
+
+    def __enter__(self) -> 'Recorder':
+        add_evaluation_callback(self._record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        remove_evaluation_callback(self._record)
+
+
+def instrument(
+    callback: Callable[[EvaluationMetrics], Any] | None = None
+) -> Recorder:
+    """Records metrics of evaluations within a `with` block.
+
+    Args:
+        callback: If provided, this is also called with each
+            `EvaluationMetrics` as it is recorded.
+
+    Returns:
+        A context manager whose `metrics` attribute is a list of the
+        `EvaluationMetrics` recorded within the block.
+    """
+    return Recorder(callback)
+
+
+def current() -> EvaluationMetrics | None:
+    """The metrics of the innermost evaluation in progress in this thread.
+
+    This is `None` if instrumentation is off.
+    """
+    stack = _current.stack
+    return stack[-1] if stack else None
+
+
+class evaluation():
+    """Context manager used by the engine around a single evaluation.
+
+    `__enter__()` returns the new `EvaluationMetrics`, or `None` if
+    instrumentation is off.
+    """
+
+    def __init__(self, evaluator: 'icepool.MultisetEvaluator',
+                 generators: 'tuple[icepool.MultisetGenerator, ...]'):
+        self._metrics: EvaluationMetrics | None = None
+        if _callbacks:
+            self._metrics = EvaluationMetrics(evaluator, generators)
+
+    def __enter__(self) -> EvaluationMetrics | None:
+        if self._metrics is not None:
+            _current.stack.append(self._metrics)
+        return self._metrics
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        metrics = self._metrics
+        if metrics is None:
+            return
+        _current.stack.pop()
+        if exc_type is not None:
+            return
+        metrics.wall_time = time.perf_counter() - metrics._start
+        with _callbacks_lock:
+            callbacks = list(_callbacks)
+        for callback in callbacks:
+            callback(metrics)
@@ -2,7 +2,7 @@ __docformat__ = 'google'
 
 from fractions import Fraction
 import numbers
-from typing import Iterator, MutableMapping
+from typing import Iterator, MutableMapping, Sequence
 
 # b -> list of rows
 comb_row_cache: MutableMapping[int, list[tuple[int, ...]]] = {}
@@ -66,3 +66,33 @@ def try_fraction(numerator, denominator) -> Fraction | float:
         return Fraction(numerator, denominator)
     except TypeError:
         return numerator / denominator
+
+
+def convolve(a: Sequence[int], b: Sequence[int]) -> tuple[int, ...]:
+    """The exact linear convolution of two sequences of non-negative `int`s.
+
+    This uses Kronecker substitution: each sequence is packed into a single
+    big integer with enough bits per element that no carries can cross
+    between elements, the two integers are multiplied, and the product is
+    unpacked. Python's big integer multiplication is subquadratic, so this is
+    much faster than the direct double loop for long sequences.
+
+    Returns:
+        A tuple of length `len(a) + len(b) - 1`, or `()` if either argument is
+        empty.
+    """
+    if not a or not b:
+        return ()
+    # Each element must fit on its own as well as each product sum, since
+    # the product is zero if either side is all zeros.
+    bound = max(max(a), max(b), min(len(a), len(b)) * max(a) * max(b))
+    width = max(1, (bound.bit_length() + 7) // 8)
+    packed_a = int.from_bytes(b''.join(x.to_bytes(width, 'little') for x in a),
+                              'little')
+    packed_b = int.from_bytes(b''.join(x.to_bytes(width, 'little') for x in b),
+                              'little')
+    size = len(a) + len(b) - 1
+    packed = (packed_a * packed_b).to_bytes(size * width, 'little')
+    return tuple(
+        int.from_bytes(packed[i:i + width], 'little')
+        for i in range(0, size * width, width))
@@ -1,12 +1,14 @@
 __docformat__ = 'google'
 
 import icepool
-from icepool.collection.counts import CountsKeysView, CountsValuesView, CountsItemsView
+import icepool.binary
+from icepool.collection.counts import CountsKeysView, CountsValuesView, CountsItemsView, sorted_union
 from icepool.collection.vector import Vector
 from icepool.math import try_fraction
 from icepool.typing import U, Outcome, T_co, count_positional_parameters
 
 from abc import ABC, abstractmethod
+from array import array
 import bisect
 from collections import defaultdict
 from fractions import Fraction
@@ -787,6 +789,158 @@ class Population(ABC, Generic[T_co], Mapping[Any, int]):
         return -sum(p * math.log(p, base)
                     for p in self.probabilities() if p > 0.0)
 
+    # Fast floating-point statistics.
+
+    @cached_property
+    def _float_outcomes(self) -> array:
+        return array('d', (float(outcome)
+                           for outcome in self.outcomes()))  # type: ignore
+
+    def _set_float_outcomes(self, outcomes: Sequence[float]) -> None:
+        """Fills the cache of `fast.outcomes()`, e.g. from serialized data."""
+        self.__dict__['_float_outcomes'] = array('d', outcomes)
+
+    @cached_property
+    def _float_probabilities(self) -> array:
+        denominator = self.denominator()
+        return array('d',
+                     (quantity / denominator for quantity in self.quantities()))
+
+    @cached_property
+    def _float_probabilities_le(self) -> array:
+        denominator = self.denominator()
+        return array('d', (quantity / denominator
+                           for quantity in self.quantities_le()))
+
+    @cached_property
+    def _float_probabilities_ge(self) -> array:
+        # Dividing the exact quantities keeps small tail probabilities
+        # accurate, unlike subtracting from 1.
+        denominator = self.denominator()
+        return array('d', (quantity / denominator
+                           for quantity in self.quantities_ge()))
+
+    @cached_property
+    def _float_moments(self) -> tuple[float, float]:
+        """The mean and variance."""
+        outcomes = self._float_outcomes
+        probabilities = self._float_probabilities
+        mean = math.fsum(map(operator.mul, outcomes, probabilities))
+        variance = math.fsum(p * (x - mean)**2
+                             for x, p in zip(outcomes, probabilities))
+        return mean, variance
+
+    class _Fast():
+        """Helper class for implementing `fast`."""
+
+        def __init__(self, population, /):
+            self._population = population
+
+        def outcomes(self) -> array:
+            """The outcomes as an `array` of floats.
+
+            This is a new copy of a cached array, so it may be modified freely.
+            """
+            return array('d', self._population._float_outcomes)
+
+        def probabilities(self) -> array:
+            """The probabilities as an `array` of floats.
+
+            This is a new copy of a cached array, so it may be modified freely.
+            """
+            return array('d', self._population._float_probabilities)
+
+        def probabilities_le(self) -> array:
+            """The cumulative probabilities as an `array` of floats.
+
+            This is a new copy of a cached array, so it may be modified freely.
+            """
+            return array('d', self._population._float_probabilities_le)
+
+        def probabilities_ge(self) -> array:
+            """The survival probabilities as an `array` of floats.
+
+            This is a new copy of a cached array, so it may be modified freely.
+            """
+            return array('d', self._population._float_probabilities_ge)
+
+        def mean(self) -> float:
+            return self._population._float_moments[0]
+
+        def variance(self) -> float:
+            """This is the population variance, not the sample variance."""
+            return self._population._float_moments[1]
+
+        def standard_deviation(self) -> float:
+            return math.sqrt(self.variance())
+
+        sd = standard_deviation
+
+        def standardized_moment(self, k: int) -> float:
+            mean, variance = self._population._float_moments
+            ev = math.fsum(p * (x - mean)**k
+                           for x, p in zip(self._population._float_outcomes,
+                                           self._population._float_probabilities))
+            return ev / variance**(k / 2)
+
+        def skewness(self) -> float:
+            return self.standardized_moment(3)
+
+        def excess_kurtosis(self) -> float:
+            return self.standardized_moment(4) - 3.0
+
+        def entropy(self, base: float = 2.0) -> float:
+            """The entropy of a random sample from this population.
+
+            Args:
+                base: The logarithm base to use. Default is 2.0, which gives
+                    the entropy in bits.
+            """
+            return -math.fsum(p * math.log(p)
+                              for p in self._population._float_probabilities
+                              if p > 0.0) / math.log(base)
+
+        def _cdf_differences(self, other) -> Iterator[float]:
+            """Differences between the CDFs over the union of outcomes."""
+            if not isinstance(other, Population):
+                other = icepool.implicit_convert_to_die(other)
+            outcomes = sorted_union(self._population.outcomes(),
+                                    other.outcomes())
+            a_outcomes = self._population.outcomes()
+            b_outcomes = other.outcomes()
+            a_cdf = self._population._float_probabilities_le
+            b_cdf = other._float_probabilities_le
+            i = j = 0
+            a = b = 0.0
+            for outcome in outcomes:
+                if i < len(a_outcomes) and a_outcomes[i] == outcome:
+                    a = a_cdf[i]
+                    i += 1
+                if j < len(b_outcomes) and b_outcomes[j] == outcome:
+                    b = b_cdf[j]
+                    j += 1
+                yield a - b
+
+        def kolmogorov_smirnov(self, other) -> float:
+            """Kolmogorov–Smirnov statistic. The maximum absolute difference between CDFs. """
+            return max(abs(x) for x in self._cdf_differences(other))
+
+        def cramer_von_mises(self, other) -> float:
+            """Cramér-von Mises statistic. The sum-of-squares difference between CDFs. """
+            return math.fsum(x * x for x in self._cdf_differences(other))
+
+    @property
+    def fast(self) -> _Fast:
+        """A property providing floating-point versions of statistics.
+
+        These are computed from cached `array`s of floats rather than exact
+        `Fraction`s, which is much faster for large populations. Outcomes must
+        be convertible to `float` for the moments.
+
+        For example, `die.fast.mean()` is the mean as a `float`.
+        """
+        return Population._Fast(self)
+
     # Joint statistics.
 
     class _Marginals(Generic[C]):
@@ -878,19 +1032,71 @@ class Population(ABC, Generic[T_co], Mapping[Any, int]):
             data[Vector(value)] += quantity
         return self._new_type(data)
 
-    def sample(self) -> T_co:
-        """A single random sample from this population.
+    @overload
+    def sample(self, n: None = None, *,
+               rng: random.Random | None = None) -> T_co:
+        ...
+
+    @overload
+    def sample(self, n: int, *,
+               rng: random.Random | None = None) -> tuple[T_co, ...]:
+        ...
+
+    def sample(self,
+               n: int | None = None,
+               *,
+               rng: random.Random | None = None) -> T_co | tuple[T_co, ...]:
+        """Random sample(s) from this population.
 
         Note that this is always "with replacement" even for `Deck` since
         instances are immutable.
 
         This uses the standard `random` package and is not cryptographically
         secure.
+
+        Args:
+            n: If provided, a tuple of this many independent samples will be
+                returned. Otherwise, a single outcome will be returned.
+            rng: A `random.Random` instance to draw from, e.g. for seeding.
+                If not provided, the global `random` functions are used.
         """
         # We don't use random.choices since that is based on floats rather than ints.
-        r = random.randrange(self.denominator())
-        index = bisect.bisect_right(self.quantities_le(), r)
-        return self.outcomes()[index]
+        randrange = (rng or random).randrange
+        denominator = self.denominator()
+        quantities_le = self._quantities_le
+        outcomes = self.outcomes()
+        if n is None:
+            return outcomes[bisect.bisect_right(quantities_le,
+                                                randrange(denominator))]
+        bisect_right = bisect.bisect_right
+        return tuple(
+            outcomes[bisect_right(quantities_le, randrange(denominator))]
+            for _ in range(n))
+
+    def to_bytes(self) -> bytes:
+        """Serializes this population to a compact binary format.
+
+        Outcomes that are all `int`s or all `float`s and quantities that fit
+        in 64 bits are stored as packed arrays. See `icepool.binary` for
+        details.
+        """
+        return icepool.binary.dumps(self)
+
+    @classmethod
+    def from_bytes(cls: type[C], data: 'bytes | bytearray | memoryview',
+                   /) -> C:
+        """Deserializes a population produced by `to_bytes()`.
+
+        Raises:
+            TypeError: If the data does not represent an instance of this
+                class.
+        """
+        result = icepool.binary.loads(data)
+        if not isinstance(result, cls):
+            raise TypeError(
+                f'Data represents a {type(result).__name__}, not a {cls.__name__}.'
+            )
+        return result
 
     def format(self, format_spec: str, /, **kwargs) -> str:
         """Formats this mapping as a string.
@@ -77,6 +77,9 @@ class Deck(Population[T_co]):
         self._data = data
         return self
 
+    def __reduce__(self):
+        return Deck._new_raw, (self._data, )
+
     def keys(self) -> CountsKeysView[T_co]:
         return self._data.keys()
 
@@ -5,6 +5,7 @@ import icepool.population.again
 import icepool.population.format
 import icepool.creation_args
 import icepool.population.markov_chain
+import icepool.precision
 from icepool.collection.counts import Counts, CountsKeysView, CountsValuesView, CountsItemsView
 from icepool.population.base import Population
 from icepool.population.keep import lowest_slice, highest_slice, canonical_slice
@@ -191,6 +192,9 @@ class Die(Population[T_co]):
         self._data = data
         return self
 
+    def __reduce__(self):
+        return Die._new_raw, (self._data, )
+
     # Defined separately from the superclass to help typing.
     def unary_operator(self: 'icepool.Die[T_co]', op: Callable[..., U], *args,
                        **kwargs) -> 'icepool.Die[U]':
@@ -249,6 +253,10 @@ class Die(Population[T_co]):
             ValueError: If tuples are of mismatched length within one of the
                 dice or between the dice.
         """
+        if (op is operator.add or op is operator.sub) and not args and not kwargs:
+            result = self._convolve_int(other, op is operator.sub)
+            if result is not None:
+                return result
         data: MutableMapping[Any, int] = defaultdict(int)
         for (outcome_self,
              quantity_self), (outcome_other,
@@ -256,7 +264,80 @@ class Die(Population[T_co]):
                                   self.items(), other.items()):
             new_outcome = op(outcome_self, outcome_other, *args, **kwargs)
             data[new_outcome] += quantity_self * quantity_other
-        return self._new_type(data)
+        return self._new_type(icepool.precision.round_quantities(data))
+
+    CONVOLVE_MIN_SIZE = 16
+    """Minimum product of outcome counts for which `+` and `-` use convolution."""
+
+    @cached_property
+    def _dense_int(self) -> tuple[int, tuple[int, ...], bool] | None:
+        """If this die has dense `int` outcomes, its min outcome, quantities over the full range, and whether there are gaps.
+
+        `None` if any outcome is not an `int`, or if outcomes are too sparse
+        for convolution to be worthwhile.
+        """
+        if not self._data or any(type(outcome) is not int
+                                 for outcome in self.keys()):
+            return None
+        min_outcome = self.keys()[0]
+        span = self.keys()[-1] - min_outcome + 1
+        if span > 2 * len(self) + 16:
+            return None
+        if span == len(self):
+            return min_outcome, tuple(self.values()), False
+        quantities = [0] * span
+        for outcome, quantity in self.items():
+            quantities[outcome - min_outcome] = quantity
+        return min_outcome, tuple(quantities), True
+
+    def _convolve_int(self, other: 'Die', negate_other: bool) -> 'Die | None':
+        """Computes `self + other` or `self - other` by convolution.
+
+        Returns:
+            The result, or `None` if either die is not suited to convolution,
+            in which case the caller should use the general algorithm.
+        """
+        if len(self) * len(other) < Die.CONVOLVE_MIN_SIZE:
+            return None
+        dense_self = self._dense_int
+        if dense_self is None:
+            return None
+        dense_other = other._dense_int
+        if dense_other is None:
+            return None
+        min_self, quantities_self, gaps_self = dense_self
+        min_other, quantities_other, gaps_other = dense_other
+        if negate_other:
+            min_other = -(min_other + len(quantities_other) - 1)
+            quantities_other = quantities_other[::-1]
+        quantities = icepool.math.convolve(quantities_self, quantities_other)
+        min_outcome = min_self + min_other
+        if gaps_self or gaps_other:
+            # Outcomes are present iff some pair of present outcomes reaches
+            # them, regardless of quantity.
+            present_self = tuple(int(outcome in self._data)
+                                 for outcome in range(
+                                     min_self, min_self +
+                                     len(quantities_self)))
+            present_other = tuple(int(outcome in other._data)
+                                  for outcome in range(
+                                      dense_other[0], dense_other[0] +
+                                      len(dense_other[1])))
+            if negate_other:
+                present_other = present_other[::-1]
+            present = icepool.math.convolve(present_self, present_other)
+            data = {
+                min_outcome + i: quantity
+                for i, (quantity, p) in enumerate(zip(quantities, present))
+                if p
+            }
+        else:
+            data = {
+                min_outcome + i: quantity
+                for i, quantity in enumerate(quantities)
+            }
+        data = icepool.precision.round_quantities(data)
+        return Die._new_raw(Counts(data.items()))
 
     # Basic access.
 
@@ -724,7 +805,7 @@ class Die(Population[T_co]):
     # Pools and sums.
 
     @cached_property
-    def _sum_cache(self) -> MutableMapping[int, 'Die']:
+    def _sum_cache(self) -> MutableMapping[Any, 'Die']:
         return {}
 
     def _sum_all(self, rolls: int, /) -> 'Die':
@@ -736,8 +817,11 @@ class Die(Population[T_co]):
         If you instead want to replace tuple (or other sequence) outcomes with
         their sum, use `die.map(sum)`.
         """
-        if rolls in self._sum_cache:
-            return self._sum_cache[rolls]
+        # Results at different precisions are cached separately.
+        bits = icepool.precision.get_precision()
+        cache_key = rolls if bits is None else (rolls, bits)
+        if cache_key in self._sum_cache:
+            return self._sum_cache[cache_key]
 
         if rolls < 0:
             result = -self._sum_all(-rolls)
@@ -745,11 +829,17 @@ class Die(Population[T_co]):
             result = self.zero().simplify()
         elif rolls == 1:
             result = self
+        elif self._dense_int is not None:
+            # Convolution makes large additions cheap, so double up.
+            half = self._sum_all(rolls // 2)
+            result = half + half
+            if rolls % 2:
+                result = result + self
         else:
-            # Binary split seems to perform much worse.
+            # Without convolution, binary split performs much worse.
             result = self + self._sum_all(rolls - 1)
 
-        self._sum_cache[rolls] = result
+        self._sum_cache[cache_key] = result
         return result
 
     def __matmul__(self: 'Die[int]', other) -> 'Die':
@@ -762,14 +852,23 @@ class Die(Population[T_co]):
 
         max_abs_die_count = max(abs(self.min_outcome()),
                                 abs(self.max_outcome()))
+        if icepool.precision.get_precision() is not None:
+            # Rounded sums don't have predictable denominators.
+            denominator_lcm = math.lcm(
+                *(other._sum_all(die_count).denominator()
+                  for die_count in self.outcomes()))
         for die_count, die_count_quantity in self.items():
-            factor = other.denominator()**(max_abs_die_count - abs(die_count))
             subresult = other._sum_all(die_count)
+            if icepool.precision.get_precision() is None:
+                factor = other.denominator()**(max_abs_die_count -
+                                               abs(die_count))
+            else:
+                factor = denominator_lcm // subresult.denominator()
             for outcome, subresult_quantity in subresult.items():
                 data[
                     outcome] += subresult_quantity * die_count_quantity * factor
 
-        return icepool.Die(data)
+        return icepool.Die(icepool.precision.round_quantities(data))
 
     def __rmatmul__(self, other: 'int | Die[int]') -> 'Die':
         """Roll the left `Die`, then roll the right `Die` that many times and sum the outcomes."""
@@ -826,6 +925,8 @@ class Die(Population[T_co]):
         canonical = canonical_slice(index, rolls)
         if canonical.start == 0 and canonical.stop == 1:
             return self._lowest_single(rolls)
+        if canonical.stop - canonical.start == 1:
+            return self.pool(rolls)[canonical.start]
         # Expression evaluators are difficult to type.
         return self.pool(rolls)[index].sum()  # type: ignore
 
@@ -833,9 +934,16 @@ class Die(Population[T_co]):
         """Roll this die several times and keep the lowest."""
         if rolls == 0:
             return self.zero().simplify()
-        return icepool.from_cumulative(
-            self.outcomes(), [x**rolls for x in self.quantities_ge()],
-            reverse=True)
+        bits = icepool.precision.get_precision()
+        if bits is None:
+            quantities_ge = [x**rolls for x in self.quantities_ge()]
+        else:
+            quantities_ge = icepool.precision.cumulative_product(
+                ((x, ) for x in self.quantities_ge()), (self.denominator(), ),
+                rolls, bits)
+        return icepool.from_cumulative(self.outcomes(),
+                                       quantities_ge,
+                                       reverse=True)
 
     def highest(self,
                 rolls: int,
@@ -863,6 +971,8 @@ class Die(Population[T_co]):
         canonical = canonical_slice(index, rolls)
         if canonical.start == rolls - 1 and canonical.stop == rolls:
             return self._highest_single(rolls)
+        if canonical.stop - canonical.start == 1:
+            return self.pool(rolls)[canonical.start]
         # Expression evaluators are difficult to type.
         return self.pool(rolls)[index].sum()  # type: ignore
 
@@ -870,8 +980,14 @@ class Die(Population[T_co]):
         """Roll this die several times and keep the highest."""
         if rolls == 0:
             return self.zero().simplify()
-        return icepool.from_cumulative(
-            self.outcomes(), [x**rolls for x in self.quantities_le()])
+        bits = icepool.precision.get_precision()
+        if bits is None:
+            quantities_le = [x**rolls for x in self.quantities_le()]
+        else:
+            quantities_le = icepool.precision.cumulative_product(
+                ((x, ) for x in self.quantities_le()), (self.denominator(), ),
+                rolls, bits)
+        return icepool.from_cumulative(self.outcomes(), quantities_le)
 
     def middle(
             self,
@@ -894,8 +1010,11 @@ class Die(Population[T_co]):
                 * 'high': The higher outcome is taken.
                 * 'low': The lower outcome is taken.
         """
+        pool = self.pool(rolls).middle(keep, tie=tie)
+        if sum(pool.keep_tuple()) == 1:
+            return icepool.evaluator.KeepEvaluator().evaluate(pool)
         # Expression evaluators are difficult to type.
-        return self.pool(rolls).middle(keep, tie=tie).sum()  # type: ignore
+        return pool.sum()  # type: ignore
 
     def map_to_pool(
         self,
@@ -1391,7 +1510,8 @@ class Die(Population[T_co]):
 
     @cached_property
     def _hash(self) -> int:
-        return hash(self._hash_key)
+        # Consistent with `_hash_key`, but doesn't need to build it.
+        return hash((Die, self._data))
 
     def __hash__(self) -> int:
         return self._hash
@@ -1421,9 +1541,9 @@ class Die(Population[T_co]):
             return False
 
         if simplify:
-            return self.simplify()._hash_key == other.simplify()._hash_key
+            return self.simplify()._data == other.simplify()._data
         else:
-            return self._hash_key == other._hash_key
+            return self._data == other._data
 
     # Strings.
 
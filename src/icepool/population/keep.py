@@ -1,6 +1,8 @@
 __docformat__ = 'google'
 
 import icepool
+import icepool.precision
+from icepool.collection.counts import sorted_union
 
 import math
 
@@ -243,8 +245,11 @@ def middle(arg0,
         else:
             return icepool.Die([default])
 
+    pool = icepool.Pool(args).middle(keep, tie=tie)
+    if sum(pool.keep_tuple()) == 1:
+        return icepool.evaluator.KeepEvaluator().evaluate(pool)
     # Expression evaluators are difficult to type.
-    return icepool.Pool(args).middle(keep, tie=tie).sum()  # type: ignore
+    return pool.sum()  # type: ignore
 
 
 def _sum_slice(*args, index_slice: slice) -> 'icepool.Die':
@@ -283,6 +288,9 @@ def _sum_slice(*args, index_slice: slice) -> 'icepool.Die':
     if canonical.start == len(dice) - 1 and canonical.stop == len(dice):
         return _highest_single(*dice)
 
+    if canonical.stop - canonical.start == 1:
+        return icepool.Pool(dice)[canonical.start]
+
     # Use pool.
     # Expression evaluators are difficult to type.
     return icepool.Pool(dice)[index_slice].sum()  # type: ignore
@@ -298,8 +306,15 @@ def _lowest_single(*args: 'T | icepool.Die[T]') -> 'icepool.Die[T]':
     max_outcome = min(die.max_outcome() for die in dice)
     dice = tuple(die.clip(max_outcome=max_outcome) for die in dice)
     dice = icepool.align(*dice)
-    quantities_ge = tuple(
-        math.prod(t) for t in zip(*(die.quantities_ge() for die in dice)))
+    bits = icepool.precision.get_precision()
+    if bits is None:
+        quantities_ge = tuple(
+            math.prod(t) for t in zip(*(die.quantities_ge() for die in dice)))
+    else:
+        quantities_ge = tuple(
+            icepool.precision.cumulative_product(
+                zip(*(die.quantities_ge() for die in dice)),
+                [die.denominator() for die in dice], 1, bits))
     return icepool.from_cumulative(dice[0].outcomes(),
                                    quantities_ge,
                                    reverse=True)
@@ -315,6 +330,84 @@ def _highest_single(*args: 'T | icepool.Die[T]') -> 'icepool.Die[T]':
     min_outcome = max(die.min_outcome() for die in dice)
     dice = tuple(die.clip(min_outcome=min_outcome) for die in dice)
     dice = icepool.align(*dice)
-    quantities_le = tuple(
-        math.prod(t) for t in zip(*(die.quantities_le() for die in dice)))
+    bits = icepool.precision.get_precision()
+    if bits is None:
+        quantities_le = tuple(
+            math.prod(t) for t in zip(*(die.quantities_le() for die in dice)))
+    else:
+        quantities_le = tuple(
+            icepool.precision.cumulative_product(
+                zip(*(die.quantities_le() for die in dice)),
+                [die.denominator() for die in dice], 1, bits))
     return icepool.from_cumulative(dice[0].outcomes(), quantities_le)
+
+
+def _order_statistic(dice: 'Sequence[tuple[icepool.Die[T], int]]',
+                     index: int) -> 'icepool.Die[T]':
+    """Roll all the dice and take the one at a single sorted index.
+
+    Rather than generating sorted rolls, this computes the cumulative
+    distribution directly: the die at sorted index `index` is <= an outcome
+    iff more than `index` dice are <= that outcome. The number of such dice
+    has a generating function that is a product of one binomial per die. Only
+    the terms on the shorter side of the index are needed, so this takes time
+    proportional to the number of outcomes times the number of unique dice
+    times `min(index + 1, size - index) ** 2`.
+
+    Args:
+        dice: `(die, count)` pairs as in `Pool`. No die may be empty or
+            have zero-quantity outcomes, since which of those evaluation
+            keeps depends on the order in which outcomes are generated.
+        index: The sorted index in ascending order, with
+            `0 <= index < size`.
+    """
+    size = sum(count for _, count in dice)
+    outcomes = sorted_union(*(die.outcomes() for die, _ in dice))
+    denominator = math.prod(die.denominator()**count for die, count in dice)
+    # Count the dice <= each outcome if the index is on the low side, and the
+    # dice > each outcome otherwise.
+    count_le = index + 1 <= size - index
+    terms = index + 1 if count_le else size - index
+    quantities_le = [die.quantities_le(outcomes) for die, _ in dice]
+
+    data = {}
+    prev = 0
+    for i, outcome in enumerate(outcomes):
+        poly = [1]
+        for (die, count), die_quantities_le in zip(dice, quantities_le):
+            le = die_quantities_le[i]
+            gt = die.denominator() - le
+            if count_le:
+                poly = _multiply_truncated(
+                    poly, _binomial_power(gt, le, count, terms), terms)
+            else:
+                poly = _multiply_truncated(
+                    poly, _binomial_power(le, gt, count, terms), terms)
+        if count_le:
+            quantity_le = denominator - sum(poly)
+        else:
+            quantity_le = sum(poly)
+        if quantity_le != prev:
+            data[outcome] = quantity_le - prev
+            prev = quantity_le
+    return icepool.Die(icepool.precision.round_quantities(data))
+
+
+def _binomial_power(a: int, b: int, count: int, terms: int) -> list[int]:
+    """The first `terms` coefficients of `(a + b * z) ** count`."""
+    return [
+        math.comb(count, j) * b**j * a**(count - j)
+        for j in range(min(count + 1, terms))
+    ]
+
+
+def _multiply_truncated(x: Sequence[int], y: Sequence[int],
+                        terms: int) -> list[int]:
+    """The first `terms` coefficients of the product of two polynomials."""
+    result = [0] * min(len(x) + len(y) - 1, terms)
+    for i, x_i in enumerate(x):
+        if x_i == 0:
+            continue
+        for j, y_j in enumerate(y[:terms - i]):
+            result[i + j] += x_i * y_j
+    return result
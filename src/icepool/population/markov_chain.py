@@ -1,82 +1,188 @@
 import icepool
-from icepool.typing import Outcome, T
+from icepool.typing import T
 
-import enum
+import heapq
 import math
 from collections import defaultdict
+from fractions import Fraction
 
-from typing import Callable, MutableMapping
+from typing import Callable, Hashable, Mapping, MutableMapping, TypeVar
 
+K = TypeVar('K', bound=Hashable)
 
-class SpecialValue(enum.Enum):
-    Visit = 'Visit'
 
+def is_absorbing(outcome, next_outcome) -> bool:
+    if outcome == next_outcome:
+        return True
+    if isinstance(next_outcome, icepool.Die) and next_outcome.quantity(
+            outcome) == next_outcome.denominator():
+        return True
+    return False
 
-Visit = SpecialValue.Visit
-"""Special value for indicating the numerator of the number of visits to a
-particular state."""
-
-
-class SparseVector(MutableMapping[T, int]):
-    """Internal helper class for representing vectors as a sparse mapping.
-
-    Unlike public objects, this class is mutable.
-    """
-
-    def __init__(self):
-        self._data = {}
-
-    def __setitem__(self, key, value: int):
-        if value == 0:
-            if key in self._data:
-                del self._data[key]
-        else:
-            self._data[key] = value
-
-    def __getitem__(self, key) -> int:
-        return self._data.get(key, 0)
-
-    def __delitem__(self, key):
-        del self._data[key]
-
-    def __len__(self) -> int:
-        return len(self._data)
-
-    def __iter__(self):
-        return iter(self._data)
 
-    def __mul__(self, n: int) -> 'SparseVector[T]':
-        result: SparseVector[T] = SparseVector()
-        result._data = {k: v * n for k, v in self.items()}
-        return result
+def solve_sparse(rows: Mapping[K, MutableMapping[K, int]],
+                 rhs: Mapping[K, int]) -> dict[K, Fraction]:
+    """Exactly solves a sparse square linear system with integer coefficients.
 
-    def __rmul__(self, n: int) -> 'SparseVector':
-        return self.__mul__(n)
+    Rows are eliminated fraction-free: only rows that have a nonzero
+    coefficient in the pivot column are updated, and each updated row is
+    divided by the gcd of its entries. Pivots are chosen to approximately
+    minimize fill-in (Markowitz ordering), so that systems arising from mostly
+    acyclic transition graphs remain sparse.
 
-    def __sub__(self, other: 'SparseVector') -> 'SparseVector[T]':
-        result: SparseVector[T] = SparseVector()
-        result._data = self._data.copy()
-        for k, v in other.items():
-            result[k] -= v
-        return result
+    Args:
+        rows: For each equation, a mapping from variable to coefficient. Each
+            equation is keyed by one of the variables. The rows are mutated.
+        rhs: The right-hand side of each equation. Missing equations are
+            treated as zero.
 
-    def simplify(self):
-        """Simplifies this vector (using mutation)."""
-        divisor = math.gcd(*self.values())
-        for k in self:
-            self[k] //= divisor
+    Returns:
+        The value of each variable.
 
-    def __str__(self) -> str:
-        return str(self._data)
+    Raises:
+        ValueError: If the system is singular.
+    """
+    # variable -> equations with a nonzero coefficient for that variable
+    col_rows: dict[K, set[K]] = {key: set() for key in rows}
+    for row_key, row in rows.items():
+        for col in row:
+            col_rows[col].add(row_key)
+    b: dict[K, int] = {key: rhs.get(key, 0) for key in rows}
+
+    heap = [(len(row_keys), i, col)
+            for i, (col, row_keys) in enumerate(col_rows.items())]
+    heapq.heapify(heap)
+    col_index = {col: i for _, i, col in heap}
+    eliminated: list[tuple[K, dict[K, int], int]] = []
+    remaining = set(rows)
+
+    while heap:
+        count, i, col = heapq.heappop(heap)
+        row_keys = col_rows.get(col)
+        if row_keys is None:
+            # Already eliminated.
+            continue
+        if count != len(row_keys):
+            # Stale entry.
+            heapq.heappush(heap, (len(row_keys), i, col))
+            continue
+        if not row_keys:
+            raise ValueError(
+                'Matrix has deficient rank. This likely indicates that the Markov process has a chance of not terminating.'
+            )
+        pivot_key = min(row_keys, key=lambda k: len(rows[k]))
+        pivot_row = rows[pivot_key]
+        pivot_rhs = b[pivot_key]
+        p = pivot_row[col]
+        del col_rows[col]
+        remaining.remove(pivot_key)
+        for other_col in pivot_row:
+            if other_col != col:
+                col_rows[other_col].discard(pivot_key)
+        for row_key in row_keys:
+            if row_key == pivot_key:
+                continue
+            row = rows[row_key]
+            a = row[col]
+            g = math.gcd(a, p)
+            scale = p // g
+            factor = a // g
+            if scale != 1:
+                for k in row:
+                    row[k] *= scale
+            new_rhs = b[row_key] * scale - pivot_rhs * factor
+            for k, v in pivot_row.items():
+                value = row.get(k, 0) - v * factor
+                if value:
+                    if k not in row:
+                        col_rows[k].add(row_key)
+                        heapq.heappush(heap,
+                                       (len(col_rows[k]), col_index[k], k))
+                    row[k] = value
+                elif k in row:
+                    del row[k]
+                    if k != col:
+                        col_rows[k].discard(row_key)
+                        heapq.heappush(heap,
+                                       (len(col_rows[k]), col_index[k], k))
+            divisor = math.gcd(new_rhs, *row.values())
+            if divisor > 1:
+                for k in row:
+                    row[k] //= divisor
+                new_rhs //= divisor
+            b[row_key] = new_rhs
+        eliminated.append((col, pivot_row, pivot_rhs))
+
+    # Back substitution. Every other variable in a pivot row was eliminated
+    # after that pivot.
+    result: dict[K, Fraction] = {}
+    for col, pivot_row, pivot_rhs in reversed(eliminated):
+        total = Fraction(pivot_rhs)
+        for k, v in pivot_row.items():
+            if k != col:
+                total -= v * result[k]
+        result[col] = total / pivot_row[col]
+    return result
+
+
+def strongly_connected_components(
+        transients: 'Mapping[T, icepool.Die[T]]') -> list[list[T]]:
+    """Tarjan's algorithm, without recursion.
 
+    Args:
+        transients: A mapping from each transient state to its transition.
+            Edges leading to states not in the mapping are ignored.
 
-def is_absorbing(outcome, next_outcome) -> bool:
-    if outcome == next_outcome:
-        return True
-    if isinstance(next_outcome, icepool.Die) and next_outcome.quantity(
-            outcome) == next_outcome.denominator():
-        return True
-    return False
+    Returns:
+        The strongly connected components in topological order, i.e. every
+        edge between different components goes from an earlier component to a
+        later one.
+    """
+    index: dict[T, int] = {}
+    lowlink: dict[T, int] = {}
+    on_stack: set[T] = set()
+    stack: list[T] = []
+    result: list[list[T]] = []
+
+    for root in transients:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(transients[root].outcomes()))]
+        while work:
+            node, successors = work[-1]
+            for successor in successors:
+                if successor not in transients:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append(
+                        (successor, iter(transients[successor].outcomes())))
+                    break
+                elif successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.remove(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    result.append(component)
+
+    # Tarjan's algorithm produces components in reverse topological order.
+    result.reverse()
+    return result
 
 
 def absorbing_markov_chain(
@@ -104,96 +210,84 @@ def absorbing_markov_chain(
     frontier = list(die.outcomes())
     while frontier:
         outcome = frontier.pop()
+        if outcome in transients:
+            continue
         next_outcome: icepool.Die[T] = icepool.Die([function(outcome)])
         if is_absorbing(outcome, next_outcome):
             continue
-        if outcome not in transients:
-            transients[outcome] = icepool.Die([next_outcome]).simplify()
-            frontier += list(next_outcome.outcomes())
+        transients[outcome] = icepool.Die([next_outcome]).simplify()
+        frontier += list(next_outcome.outcomes())
 
-    # Create the transient matrix to be solved.
-    t = len(transients)
-
-    if t == 0:
+    if not transients:
         # No transients; everything is absorbed immediately.
         return die.simplify()
 
-    outcome_to_index = {
-        outcome: i
-        for i, outcome in enumerate(transients.keys())
-    }
-
-    # [dst_index][src]
-    fundamental_solve: list[SparseVector[T]] = [
-        SparseVector() for _ in transients.keys()
-    ]
-    # [src_index][absorbing state]
-    absorption_matrix: list[SparseVector[T]] = [
-        SparseVector() for _ in transients.keys()
-    ]
-    for src_index, (src, transition) in enumerate(transients.items()):
-        fundamental_solve[src_index][src] += transition.denominator()
-        for dst, quantity in transition.items():
-            if dst in transients:
-                dst_index = outcome_to_index[dst]
-                fundamental_solve[dst_index][src] -= quantity
-            else:
-                absorption_matrix[src_index][dst] = quantity
-    for src_index, src in enumerate(transients.keys()):
-        fundamental_solve[src_index][Visit] = die.quantity(src)
-
-    # Solve the matrix using Gaussian elimination.
-
-    # Put into upper triangular form.
-
-    for pivot_index, pivot in enumerate(transients.keys()):
-        pivot_row = None
-        for i in range(pivot_index, t):
-            row = fundamental_solve[i]
-            if row[pivot] != 0:
-                pivot_row = fundamental_solve[i]
-                fundamental_solve[i] = fundamental_solve[pivot_index]
-                fundamental_solve[pivot_index] = pivot_row
-                break
+    # Solve each strongly connected component of the transient states in
+    # topological order. Let y[s] be the expected number of visits to
+    # transient state s divided by the denominator of its transition.
+    # Then for each transient state dst:
+    # denominator(dst) * y[dst] - sum_src quantity(src -> dst) * y[src]
+    #     = initial(dst)
+    # Acyclic parts and self-loops are solved by forward propagation; other
+    # components are solved as a linear system.
+
+    # Incoming mass to each transient state.
+    mass: MutableMapping[T, Fraction] = defaultdict(Fraction)
+    results: MutableMapping[T, Fraction] = defaultdict(Fraction)
+    for outcome, quantity in die.items():
+        if outcome in transients:
+            mass[outcome] += quantity
         else:
-            raise ValueError(
-                'Matrix has deficient rank. This likely indicates that the Markov process has a chance of not terminating.'
-            )
+            results[outcome] += quantity
 
-        for i in range(pivot_index + 1, t):
-            fundamental_solve[i] = fundamental_solve[i] * pivot_row[
-                pivot] - pivot_row * fundamental_solve[i][pivot]
-            fundamental_solve[i].simplify()
-
-    # Solve for the exit variables.
-    for pivot_index, pivot in reversed(list(enumerate(transients.keys()))):
-        pivot_row = fundamental_solve[pivot_index]
-        for i in range(pivot_index):
-            fundamental_solve[i] = fundamental_solve[i] * pivot_row[
-                pivot] - pivot_row * fundamental_solve[i][pivot]
-            fundamental_solve[i].simplify()
-
-    mean_absorption_time = 0.0
-
-    results = {}
-    for pivot_index, (pivot, absorption_row) in enumerate(
-            zip(transients.keys(), absorption_matrix)):
-        n = fundamental_solve[pivot_index][Visit]
-        if n == 0:
+    for component in strongly_connected_components(transients):
+        if not any(mass.get(s) for s in component):
             continue
-        d = fundamental_solve[pivot_index][pivot]
-
-        # TODO: Is this right?
-        mean_absorption_time += n / d * transients[pivot].denominator()
-
-        if len(absorption_row) > 0:
-            results[pivot] = (n * absorption_row, d)
-
-    results_denominator = math.lcm(*(d for _, d in results.values()))
-    normalized_results: MutableMapping[T, int] = defaultdict(int)
-    for row, d in results.values():
-        for outcome, quantity in row.items():
-            normalized_results[outcome] += quantity * results_denominator // d
-
+        visits: Mapping[T, Fraction]
+        if len(component) == 1:
+            s = component[0]
+            transition = transients[s]
+            visits = {
+                s:
+                mass[s] / (transition.denominator() - transition.quantity(s))
+            }
+        else:
+            members = set(component)
+            # rows[dst][src] is the coefficient of y[src] in the equation for
+            # dst.
+            rows: dict[T, dict[T, int]] = {src: {} for src in component}
+            for src in component:
+                transition = transients[src]
+                rows[src][src] = transition.denominator()
+                for dst, quantity in transition.items():
+                    if dst in members:
+                        row = rows[dst]
+                        value = row.get(src, 0) - quantity
+                        if value:
+                            row[src] = value
+                        else:
+                            del row[src]
+            scale = math.lcm(*(mass[s].denominator for s in component))
+            rhs = {s: int(mass[s] * scale) for s in component}
+            visits = {
+                s: y / scale
+                for s, y in solve_sparse(rows, rhs).items()
+            }
+        for src, y in visits.items():
+            if y == 0:
+                continue
+            for dst, quantity in transients[src].items():
+                if dst in visits:
+                    continue
+                if dst in transients:
+                    mass[dst] += y * quantity
+                else:
+                    results[dst] += y * quantity
+
+    denominator = math.lcm(*(x.denominator for x in results.values()))
+    normalized_results = {
+        outcome: int(x * denominator)
+        for outcome, x in results.items()
+    }
     # Inference to Die[T] seems to fail here.
     return icepool.Die(normalized_results).simplify()  # type: ignore
@@ -0,0 +1,138 @@
+"""Optional approximate arithmetic for quantities.
+
+By default all quantities are exact `int`s, which can grow very large. If a
+precision is set using `set_precision()`, the results of die arithmetic, keep
+operations, and `MultisetEvaluator`s are instead rounded to fixed-point
+probabilities with that many bits, which keeps the quantities small.
+
+Quantities remain `int`s throughout. Nonzero quantities are never rounded to
+zero, so the set of outcomes is the same as with exact arithmetic.
+"""
+
+__docformat__ = 'google'
+
+import contextvars
+
+from typing import Iterable, Literal, Mapping, Sequence, TypeVar
+
+K = TypeVar('K')
+
+_bits: int | None = None
+
+_local_bits: 'contextvars.ContextVar[int | None]' = contextvars.ContextVar(
+    '_local_bits')
+"""Overrides the global precision within a context, if set.
+
+Used to carry the precision over to executor workers without changing the
+global precision, which concurrent tasks would race on.
+"""
+
+FLOAT64_BITS = 53
+"""The number of bits used for `set_precision('float64')`."""
+
+
+def set_precision(precision: int | Literal['float64'] | None, /) -> None:
+    """Sets the global precision of quantities.
+
+    Results computed with different precisions are cached separately.
+
+    Args:
+        precision: One of the following:
+            * `None`: Exact arithmetic. This is the default.
+            * An `int`: Probabilities are rounded to this many bits.
+            * `'float64'`: Probabilities are rounded to the number of bits in
+                the significand of a 64-bit float, i.e. 53.
+    """
+    global _bits
+    if precision == 'float64':
+        precision = FLOAT64_BITS
+    if precision is not None and (not isinstance(precision, int)
+                                  or precision < 1):
+        raise ValueError(
+            "precision must be a positive int, 'float64', or None.")
+    _bits = precision
+
+
+def get_precision() -> int | None:
+    """The current global precision in bits, or `None` if arithmetic is exact."""
+    return _local_bits.get(_bits)
+
+
+def round_quantities(data: Mapping[K, int]) -> Mapping[K, int]:
+    """Rounds the quantities to the current precision.
+
+    If the precision is `None` or the denominator is already small enough,
+    the argument is returned as-is. Otherwise the quantities are scaled down by
+    a power of two so that the denominator has at most `precision + 1` bits.
+    """
+    bits = get_precision()
+    if bits is None:
+        return data
+    shift = sum(data.values()).bit_length() - bits - 1
+    if shift <= 0:
+        return data
+    half = 1 << (shift - 1)
+    return {
+        key: max((quantity + half) >> shift, 1) if quantity else 0
+        for key, quantity in data.items()
+    }
+
+
+def fixed_point(numerator: int, denominator: int, bits: int) -> int:
+    """The fraction `numerator / denominator` with `bits` fractional bits.
+
+    Nonzero fractions are rounded to at least 1.
+    """
+    if numerator == 0 or denominator == 0:
+        return 0
+    return max(((numerator << (bits + 1)) // denominator + 1) >> 1, 1)
+
+
+def normalize_weights(weights: Sequence[int], bits: int) -> list[int]:
+    """Converts weights to fixed-point probabilities with `bits` fractional bits."""
+    total = sum(weights)
+    return [fixed_point(weight, total, bits) for weight in weights]
+
+
+def cumulative_product(rows: Iterable[Sequence[int]],
+                       denominators: Sequence[int], rolls: int,
+                       bits: int) -> list[int]:
+    """Fixed-point cumulative probabilities of the lowest or highest of several dice.
+
+    Args:
+        rows: For each outcome, the cumulative quantity of each die.
+        denominators: The denominator of each die.
+        rolls: Each die is rolled this many times.
+        bits: The number of fractional bits in the result.
+
+    Returns:
+        For each row, the product of `(c / denominator) ** rolls`. Rows with
+        distinct exact products have distinct results, so that outcomes with
+        nonzero exact quantity also have nonzero quantity after differencing.
+    """
+    half = 1 << (bits - 1)
+    one = 1 << bits
+    result: list[int] = []
+    prev_row: Sequence[int] = ()
+    for row in rows:
+        y = one
+        for c, denominator in zip(row, denominators):
+            # Exponentiation by squaring in fixed point.
+            base = fixed_point(c, denominator, bits)
+            n = rolls
+            while n:
+                if n & 1:
+                    y = (y * base + half) >> bits
+                base = (base * base + half) >> bits
+                n >>= 1
+        if all(row):
+            y = max(y, 1)
+        if result and row != prev_row and (all(row) or all(prev_row)):
+            prev = result[-1]
+            if sum(row) > sum(prev_row):
+                y = max(y, prev + 1)
+            else:
+                y = max(min(y, prev - 1), 0)
+        result.append(y)
+        prev_row = row
+    return result
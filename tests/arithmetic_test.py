@@ -1,4 +1,5 @@
 import icepool
+import operator
 import pytest
 
 from icepool import d6
@@ -175,3 +176,95 @@ def test_d():
 def test_d_negative():
     result = (icepool.d7 - 4) @ icepool.d(3)
     assert result.equals(-result)
+
+
+convolve_dice = [
+    icepool.d12,
+    icepool.d20 - 10,
+    icepool.d10.explode(depth=2),
+    icepool.Die([1, 3, 5, 7, 9, 11, 13, 15, 16]),
+    icepool.Die({
+        -3: 2,
+        -1: 0,
+        0: 5,
+        2: 1,
+        4: 7,
+        8: 0,
+    }),
+]
+
+
+@pytest.mark.parametrize('a', convolve_dice)
+@pytest.mark.parametrize('b', convolve_dice)
+def test_convolve_add(a, b):
+    result = a + b
+    expected = icepool.map(lambda x, y: x + y, a, b)
+    assert result.equals(expected)
+
+
+@pytest.mark.parametrize('a', convolve_dice)
+@pytest.mark.parametrize('b', convolve_dice)
+def test_convolve_sub(a, b):
+    result = a - b
+    expected = icepool.map(lambda x, y: x - y, a, b)
+    assert result.equals(expected)
+
+
+def test_convolve_big_quantities():
+    a = icepool.d100 @ icepool.d6
+    result = a + icepool.d1000
+    expected = icepool.map(lambda x, y: x + y, a, icepool.d1000)
+    assert result.equals(expected)
+
+
+@pytest.mark.parametrize('a', [
+    icepool.Die({
+        1: 1,
+        2: 0,
+        3: 1
+    }),
+    icepool.Die({
+        1: 1,
+        2: 0,
+        4: 1
+    }),
+    icepool.Die({
+        1: 0,
+        3: 1,
+        4: 0
+    }),
+])
+def test_convolve_zero_quantities(a):
+    b = icepool.Die({0: 1, 5: 1, 6: 2, 7: 0, 8: 1, 9: 1, 10: 1, 11: 1})
+    # Both operands take the convolution path.
+    assert a._dense_int is not None
+    assert b._dense_int is not None
+    assert len(a) * len(b) >= icepool.Die.CONVOLVE_MIN_SIZE
+    for op in (operator.add, operator.sub):
+        result = op(a, b)
+        expected = icepool.map(op, a, b)
+        assert result.equals(expected)
+        assert result.outcomes() == expected.outcomes()
+        assert result.has_zero_quantities()
+
+
+@pytest.mark.parametrize('rolls', [2, 3, 7, 16, 33])
+@pytest.mark.parametrize('die', [icepool.d6, icepool.d20 - 10, icepool.d2])
+def test_sum_all_doubling(rolls, die):
+    result = rolls @ die
+    expected = die
+    for _ in range(rolls - 1):
+        expected = icepool.map(lambda x, y: x + y, expected, die)
+    assert result.equals(expected)
+
+
+def test_convolve_zeros():
+    assert icepool.math.convolve([300], [0]) == (0, )
+    assert icepool.math.convolve([0, 0], [1000, 1]) == (0, 0, 0)
+
+
+def test_convolve_zero_quantities_in_pool():
+    b = icepool.Die({0: 0, 3: 2, 4: 2})
+    pool = icepool.Pool([b, b, icepool.Die({0: 300, 3: 1})])
+    result = pool.keep_outcomes(lambda x: x > 1).count()
+    assert result.equals(icepool.Die({0: 0, 1: 0, 2: 4800, 3: 16}))
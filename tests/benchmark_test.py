@@ -0,0 +1,52 @@
+import copy
+
+from benchmarks.cases import CASES
+from benchmarks.compare import compare
+from benchmarks.run import reset_caches, run
+
+
+def test_cases_unique():
+    names = [case.name for case in CASES]
+    assert len(names) == len(set(names))
+
+
+def test_run_small():
+    data = run(['small'], pattern='^(pool_keep_sum|again_depth)', repeat=1)
+    assert set(data['results']) == {
+        'pool_keep_sum[small]', 'again_depth[small]'
+    }
+    for result in data['results'].values():
+        assert len(result['times']) == 1
+        assert result['min'] >= 0.0
+
+
+def test_compare():
+    baseline = run(['small'], pattern='^matmul_die', repeat=1)
+    current = copy.deepcopy(baseline)
+    comparisons = compare(baseline, current)
+    assert [c.status for c in comparisons] == ['ok']
+
+    current['results']['matmul_die[small]']['min'] = 10.0
+    comparisons = compare(baseline, current)
+    assert [c.status for c in comparisons] == ['regression']
+    assert comparisons[0].flagged
+
+    current['results']['matmul_die[small]']['checksum'] = 'different'
+    comparisons = compare(baseline, current)
+    assert [c.status for c in comparisons] == ['changed']
+
+    current['results']['other[small]'] = current['results'].pop(
+        'matmul_die[small]')
+    comparisons = compare(baseline, current)
+    assert [c.status for c in comparisons] == ['missing', 'new']
+    assert not any(c.flagged for c in comparisons)
+
+
+def test_reset_caches_older_version(monkeypatch):
+    import icepool
+    from icepool.evaluator.multiset_evaluator import MultisetEvaluator
+    # Simulate a release predating these caches.
+    monkeypatch.delattr(MultisetEvaluator, 'set_default_cache')
+    monkeypatch.delattr(MultisetEvaluator, 'clear_interned_caches')
+    monkeypatch.delattr(icepool, 'set_persistent_cache')
+    reset_caches()
@@ -0,0 +1,97 @@
+import icepool
+import icepool.binary
+import pytest
+
+from fractions import Fraction
+from icepool import d6, d20, Die, Deck
+from icepool.collection.counts import Counts
+
+test_dice = [
+    d6,
+    3 @ d6,
+    d20.highest(40),
+    Die([1.5, 2.5]),
+    Die(['a', 'b', 'c']),
+    Die([(1, 2), (3, 4)]),
+    Die([(1, ('a', 2.5)), (2, ('b', -0.5))]),
+    Die([icepool.Vector((1, 2)), icepool.Vector((3, 4))]),
+    Die({1: 0, 2: 3}),
+    Die([]),
+    Die([-2**70, 5]),
+    Die([-300, 70000]),
+    Die([Fraction(1, 2), Fraction(-3, 2), Fraction(7)]),
+]
+
+
+@pytest.mark.parametrize('die', test_dice)
+def test_die_round_trip(die):
+    result = Die.from_bytes(die.to_bytes())
+    assert result.equals(die)
+    assert result.outcomes() == die.outcomes()
+
+
+def test_deck_round_trip():
+    deck = Deck([1, 2, 2, 3])
+    result = Deck.from_bytes(deck.to_bytes())
+    assert result == deck
+
+
+def test_counts_round_trip():
+    counts = Counts([(1, 5), (2, -3), (3, 0)])
+    result = icepool.binary.loads(icepool.binary.dumps(counts))
+    assert result == counts
+
+
+def test_wrong_class():
+    with pytest.raises(TypeError):
+        Deck.from_bytes(d6.to_bytes())
+
+
+def test_not_binary():
+    with pytest.raises(ValueError):
+        Die.from_bytes(b'not a die')
+
+
+def test_read_columns_zero_copy():
+    die = Die([-1000, 0, 1000], times=[1, 2, 3])
+    data = bytearray(die.to_bytes())
+    kind, outcomes, quantities = icepool.binary.read_columns(data)
+    assert kind == 'Die'
+    assert list(outcomes) == [-1000, 0, 1000]
+    assert list(quantities) == [1, 2, 3]
+    if isinstance(outcomes, memoryview):
+        assert outcomes.obj is data
+
+
+def test_compact():
+    die = 10 @ d6
+    assert len(die.to_bytes()) < 8 * 2 * len(die)
+
+
+def test_fast_outcomes_from_bytes():
+    die = Die.from_bytes((3 @ d6).to_bytes())
+    assert die.fast.mean() == pytest.approx(10.5)
+
+
+def test_unsupported_outcome_type():
+    from decimal import Decimal
+    with pytest.raises(TypeError):
+        Die([Decimal('0.5'), Decimal('1.5')]).to_bytes()
+
+
+def test_unknown_outcome_tag():
+    data = bytearray(Die([(1, 2)]).to_bytes())
+    data[data.index(b't', 8) + 2] = ord('?')
+    with pytest.raises(ValueError):
+        Die.from_bytes(bytes(data))
+
+
+@pytest.mark.parametrize(
+    'outcome', [True, (False, 'x'), -2**70,
+                Fraction(-2**70, 3), (Fraction(1, 2), 1)])
+def test_tagged_outcome_round_trip(outcome):
+    counts = Counts([(outcome, 3)])
+    data = icepool.binary.dumps(counts)
+    if type(outcome) is not int:
+        assert data[6:7] == b't'
+    assert icepool.binary.loads(data) == counts
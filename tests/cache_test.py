@@ -0,0 +1,366 @@
+import icepool
+import os
+import pytest
+import sqlite3
+import subprocess
+import sys
+
+from icepool import d6, d8, Pool, LRUCache
+from icepool.evaluator import SumEvaluator, LargestCountEvaluator
+
+
+def test_lru_eviction_order():
+    cache = LRUCache(2)
+    cache['a'] = 1
+    cache['b'] = 2
+    assert cache['a'] == 1
+    cache['c'] = 3
+    assert 'a' in cache
+    assert 'b' not in cache
+    assert 'c' in cache
+    assert cache.stats().evictions == 1
+
+
+def test_lru_stats():
+    cache = LRUCache()
+    cache['a'] = 1
+    assert cache.get('a') == 1
+    assert cache.get('b') is None
+    stats = cache.stats()
+    assert stats.hits == 1
+    assert stats.misses == 1
+    assert stats.entries == 1
+
+
+def test_lru_max_size():
+    cache = LRUCache(max_size=1000, estimate_size=lambda k, v: v)
+    cache['a'] = 400
+    cache['b'] = 400
+    cache['c'] = 400
+    assert list(cache) == ['b', 'c']
+    assert cache.stats().size == 800
+
+
+def test_evaluator_cache_bounded():
+    cache = LRUCache(10)
+    evaluator = SumEvaluator(cache=cache)
+    result = evaluator.evaluate(Pool([d6, d6, d8, d8]).highest(3))
+    assert result.equals(Pool([d6, d6, d8, d8]).highest(3).sum())
+    assert len(cache) <= 10
+    assert cache.stats().evictions > 0
+
+
+def test_evaluator_cache_reuse():
+    cache = LRUCache()
+    evaluator = LargestCountEvaluator(cache=cache)
+    evaluator.evaluate(Pool([d6, d6, d6]))
+    misses = cache.stats().misses
+    evaluator.evaluate(Pool([d6, d6, d6]))
+    assert cache.stats().misses == misses
+    assert cache.stats().hits > 0
+
+
+def test_default_cache_shared():
+    cache = LRUCache(1000)
+    try:
+        icepool.MultisetEvaluator.set_default_cache(cache)
+        a = SumEvaluator()
+        b = LargestCountEvaluator()
+        # Pools that keep all their dice are summed without the cache.
+        a_result = a.evaluate(Pool([d6, d6, d6]).highest(2))
+        b_result = b.evaluate(Pool([d6, d6]))
+    finally:
+        icepool.MultisetEvaluator.set_default_cache(None)
+    assert a_result.equals(d6.highest(3, 2))
+    assert b_result.equals(Pool([d6, d6]).largest_count())
+    assert len(a._cache) > 0
+    assert len(b._cache) > 0
+    assert len(cache) == len(a._cache) + len(b._cache)
+
+
+def test_evaluators_interned():
+    assert SumEvaluator()._cache is SumEvaluator()._cache
+    assert SumEvaluator()._cache is not LargestCountEvaluator()._cache
+    assert SumEvaluator(abs)._cache is not SumEvaluator()._cache
+    # Different mappings are distinguished by identity.
+    assert SumEvaluator({1: 2})._cache is not SumEvaluator({1: 2})._cache
+
+
+class ListSumEvaluator(icepool.MultisetEvaluator):
+
+    def __init__(self, weights):
+        self._weights = weights
+
+    def next_state(self, state, outcome, count):
+        return (state or 0) + self._weights[outcome] * count
+
+
+def test_unhashable_evaluator_not_interned():
+    a = ListSumEvaluator([0, 1, 2, 3, 4, 5, 6])
+    b = ListSumEvaluator([0, 1, 2, 3, 4, 5, 6])
+    assert a._hash_key is None
+    assert a._cache is not b._cache
+    assert a.evaluate(Pool([d6, d6])).equals(2 @ d6)
+
+
+def test_expression_evaluators_interned():
+    icepool.MultisetEvaluator.clear_interned_caches()
+
+    def query(sides):
+        a = Pool([icepool.d(sides)] * 3)
+        b = Pool([icepool.d(sides)] * 2)
+        return icepool.evaluator.ExpressionEvaluator(a - b,
+                                                     evaluator=SumEvaluator())
+
+    first = query(6)
+    second = query(8)
+    assert first._hash_key == second._hash_key
+    assert first._cache is second._cache
+    assert first.evaluate().equals((Pool([d6] * 3) - Pool([d6] * 2)).sum())
+    assert second.evaluate().equals((Pool([d8] * 3) - Pool([d8] * 2)).sum())
+
+    with icepool.instrument() as recorder:
+        query(6).evaluate()
+    assert recorder.metrics[0].cache_hits == 1
+    assert recorder.metrics[0].cache_misses == 0
+
+
+def test_expression_structure_distinguished():
+    a = Pool([d6] * 3)
+    b = Pool([d6] * 2)
+    difference = icepool.evaluator.ExpressionEvaluator(
+        a - b, evaluator=SumEvaluator())
+    union = icepool.evaluator.ExpressionEvaluator(a + b,
+                                                  evaluator=SumEvaluator())
+    kept = icepool.evaluator.ExpressionEvaluator(
+        (a - b).keep_counts_ge(2), evaluator=SumEvaluator())
+    assert difference._hash_key != union._hash_key
+    assert difference._hash_key != kept._hash_key
+    assert difference._cache is not union._cache
+
+
+def test_pool_cache_limit():
+    try:
+        Pool.clear_cache()
+        Pool.set_cache_limit(8)
+        for n in range(1, 6):
+            result = Pool([d6, d8] * n).highest(2).sum()
+            assert result.equals(icepool.highest(*([d6, d8] * n), keep=2))
+        stats = Pool.cache_stats()
+        assert stats.entries <= 8
+        assert stats.evictions > 0
+    finally:
+        Pool.set_cache_limit(65536)
+        Pool.clear_cache()
+
+
+def test_pool_interned():
+    assert Pool([d6, d8]) is Pool([d8, d6])
+
+
+def test_pool_transitions_shared_between_evaluators():
+    try:
+        Pool.clear_cache()
+        pool = Pool([d6, d6, d8])
+        icepool.evaluator.ExpandEvaluator().evaluate(pool)
+        misses = Pool.transition_cache_stats().misses
+        assert misses > 0
+        result = LargestCountEvaluator().evaluate(pool)
+        assert result.equals(pool.largest_count())
+        stats = Pool.transition_cache_stats()
+        assert stats.misses == misses
+        assert stats.hits > 0
+    finally:
+        Pool.clear_cache()
+
+
+def test_pool_transition_cache_limit():
+    try:
+        Pool.clear_cache()
+        Pool.set_transition_cache_limit(4)
+        result = Pool([d6, d8, d8]).highest(2).sum()
+        assert result.equals(icepool.highest(d6, d8, d8, keep=2))
+        assert Pool.transition_cache_stats().entries <= 4
+    finally:
+        Pool.set_transition_cache_limit(65536)
+        Pool.clear_cache()
+
+
+def countdown(x):
+    if x <= 0:
+        return x
+    return x - d6
+
+
+def test_persistent_cache_evaluate(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    try:
+        icepool.set_persistent_cache(path)
+        expected = SumEvaluator().evaluate(Pool([d6, d6, d8]))
+        # A new cache on the same file, as in a different process.
+        cache = icepool.PersistentCache(path)
+        icepool.set_persistent_cache(cache)
+        result = SumEvaluator().evaluate(Pool([d6, d6, d8]))
+        assert result.equals(expected)
+        assert cache.stats().hits == 1
+        assert cache.stats().misses == 0
+    finally:
+        icepool.set_persistent_cache(None)
+
+
+def test_persistent_cache_distinguishes_evaluators(tmp_path):
+    try:
+        icepool.set_persistent_cache(tmp_path / 'cache.sqlite')
+        a = SumEvaluator().evaluate(Pool([d6, d6]))
+        b = LargestCountEvaluator().evaluate(Pool([d6, d6]))
+        c = LargestCountEvaluator().evaluate(Pool([d6, d6]))
+    finally:
+        icepool.set_persistent_cache(None)
+    assert a.equals(2 @ d6)
+    assert b.equals(c)
+    assert not a.equals(b)
+
+
+def test_persistent_cache_map(tmp_path):
+    cache = icepool.PersistentCache(tmp_path / 'cache.sqlite')
+    try:
+        icepool.set_persistent_cache(cache)
+        expected = icepool.Die([20]).map(countdown, repeat=None)
+        result = icepool.Die([20]).map(countdown, repeat=None)
+        assert result.equals(expected)
+        assert cache.stats().hits == 1
+        # Lambdas cannot be identified across processes.
+        icepool.Die([20]).map(lambda x: x, repeat=None)
+        assert len(cache) == 1
+    finally:
+        icepool.set_persistent_cache(None)
+
+
+def test_persistent_cache_distinguishes_mappings(tmp_path):
+    try:
+        icepool.set_persistent_cache(tmp_path / 'cache.sqlite')
+        a = SumEvaluator({x: 10 * x for x in range(1, 7)}).evaluate(d6.pool(2))
+        b = SumEvaluator({x: x for x in range(1, 7)}).evaluate(d6.pool(2))
+    finally:
+        icepool.set_persistent_cache(None)
+    assert a.equals(10 * (2 @ d6))
+    assert b.equals(2 @ d6)
+
+
+def _digest_subject(x):
+    return x + 1
+
+
+def _digest_replacement(x):
+    return x + 2
+
+
+def test_persistent_key_changes_with_code():
+    from icepool.cache import persistent_key
+    original = _digest_subject.__code__
+    before = persistent_key(_digest_subject)
+    try:
+        _digest_subject.__code__ = _digest_replacement.__code__
+        after = persistent_key(_digest_subject)
+    finally:
+        _digest_subject.__code__ = original
+    assert before is not None
+    assert before != after
+    assert persistent_key(_digest_subject) == before
+
+
+_DIGEST_OFFSET = 1
+
+
+def _digest_helper(x):
+    return x + _DIGEST_OFFSET
+
+
+def _digest_caller(x):
+    return _digest_helper(x) * 2
+
+
+def _digest_recursive(x):
+    return x if x <= 0 else _digest_recursive(x - 1)
+
+
+def test_persistent_key_changes_with_globals():
+    global _DIGEST_OFFSET
+    from icepool.cache import persistent_key
+    before = persistent_key(_digest_caller)
+    try:
+        _DIGEST_OFFSET = 2
+        after = persistent_key(_digest_caller)
+    finally:
+        _DIGEST_OFFSET = 1
+    assert before is not None
+    assert before != after
+    assert persistent_key(_digest_caller) == before
+    assert persistent_key(_digest_recursive) is not None
+
+
+def test_persistent_key_unidentifiable_global():
+    global _DIGEST_OFFSET
+    from icepool.cache import persistent_key
+    try:
+        _DIGEST_OFFSET = object()
+        assert persistent_key(_digest_caller) is None
+    finally:
+        _DIGEST_OFFSET = 1
+
+
+def test_persistent_cache_version(tmp_path):
+    path = tmp_path / 'cache.sqlite'
+    try:
+        icepool.set_persistent_cache(icepool.PersistentCache(path, version=1))
+        SumEvaluator().evaluate(Pool([d6, d6, d8]))
+        cache = icepool.PersistentCache(path, version=2)
+        icepool.set_persistent_cache(cache)
+        SumEvaluator().evaluate(Pool([d6, d6, d8]))
+        assert cache.stats().hits == 0
+        assert len(cache) == 2
+    finally:
+        icepool.set_persistent_cache(None)
+
+
+def test_set_persistent_cache_closes_previous(tmp_path):
+    first = icepool.PersistentCache(tmp_path / 'first.sqlite')
+    try:
+        icepool.set_persistent_cache(first)
+        icepool.set_persistent_cache(tmp_path / 'second.sqlite')
+    finally:
+        icepool.set_persistent_cache(None)
+    with pytest.raises(sqlite3.ProgrammingError):
+        len(first)
+
+
+def test_interned_cache_bounded():
+    icepool.MultisetEvaluator.clear_interned_caches()
+    try:
+        icepool.MultisetEvaluator.set_interned_cache_limit(4)
+        evaluator = LargestCountEvaluator()
+        result = evaluator.evaluate(Pool([d6, d6, d8]))
+        assert isinstance(evaluator._cache, LRUCache)
+        assert len(evaluator._cache) <= 4
+        assert result.equals(Pool([d6, d6, d8]).largest_count())
+    finally:
+        icepool.MultisetEvaluator.set_interned_cache_limit(65536)
+        icepool.MultisetEvaluator.clear_interned_caches()
+
+
+def test_persistent_key_independent_of_hash_seed():
+    code = ('import icepool; from icepool.cache import persistent_key; '
+            "pool = icepool.Pool([icepool.Die(['a', 'b']), icepool.Die(['c']),"
+            " icepool.Die(['b', 'd'])]); "
+            'print(pool._dice, persistent_key(pool))')
+    outputs = set()
+    for seed in ('1', '2', '3'):
+        env = dict(os.environ, PYTHONHASHSEED=seed)
+        env['PYTHONPATH'] = os.pathsep.join(sys.path)
+        outputs.add(
+            subprocess.run([sys.executable, '-c', code],
+                           env=env,
+                           capture_output=True,
+                           text=True,
+                           check=True).stdout)
+    assert len(outputs) == 1
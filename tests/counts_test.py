@@ -0,0 +1,128 @@
+import icepool
+import pickle
+import pytest
+
+from icepool.collection.counts import Counts
+
+
+def test_counts_sorted_lookup():
+    counts = Counts([(3, 1), (1, 2), (2, 0), (1, 1)])
+    assert list(counts.keys()) == [1, 2, 3]
+    assert list(counts.values()) == [3, 0, 1]
+    assert counts[1] == 3
+    assert counts.get(4) is None
+    assert 2 in counts
+    assert 'a' not in counts
+    with pytest.raises(KeyError):
+        counts['a']
+
+
+def test_counts_no_dict():
+    counts = Counts([(1, 1)])
+    assert not hasattr(counts, '__dict__')
+
+
+def test_counts_items_view():
+    counts = Counts([(1, 2), (2, 3), (3, 4)])
+    assert counts.items()[1] == (2, 3)
+    assert counts.items()[1:] == ((2, 3), (3, 4))
+    assert list(counts.items()) == [(1, 2), (2, 3), (3, 4)]
+
+
+def test_counts_remove():
+    counts = Counts([(1, 2), (2, 3), (3, 4)])
+    assert counts.remove_min() == Counts([(2, 3), (3, 4)])
+    assert counts.remove_max() == Counts([(1, 2), (2, 3)])
+    assert counts.remove_min() is counts.remove_min()
+
+
+def test_counts_pickle():
+    counts = Counts([(1, 2), (2, 3)])
+    result = pickle.loads(pickle.dumps(counts))
+    assert result == counts
+    assert hash(result) == hash(counts)
+
+
+def test_counts_remove_shares_storage():
+    counts = Counts([(i, i + 1) for i in range(10)])
+    popped = counts.remove_min().remove_min().remove_max()
+    assert popped._store is counts._store
+    assert popped == Counts([(i, i + 1) for i in range(2, 9)])
+    assert hash(popped) == hash(Counts([(i, i + 1) for i in range(2, 9)]))
+    assert popped.keys()[0] == 2
+    assert popped.keys()[-1] == 8
+    assert popped.values()[::-1] == tuple(range(9, 2, -1))
+    assert popped.items()[1:3] == ((3, 4), (4, 5))
+    assert 1 not in popped
+    assert 9 not in popped
+    assert popped.get(9) is None
+
+
+def test_counts_remove_to_empty():
+    counts = Counts([(1, 1), (2, 1)])
+    empty = counts.remove_min().remove_max()
+    assert len(empty) == 0
+    assert empty == Counts([])
+    assert hash(empty) == hash(Counts([]))
+
+
+def test_die_pop_shares_storage():
+    die = icepool.d(1000)
+    popped, _ = die._pop_max()
+    assert popped._data._store is die._data._store
+    assert popped == icepool.d(999)
+    assert hash(popped) == hash(icepool.d(999))
+
+
+def test_partially_ordered_keys():
+    die = icepool.Die({
+        frozenset([1]): 1,
+        frozenset([2]): 2,
+        frozenset([3]): 3
+    })
+    assert die.quantity(frozenset([1])) == 1
+    assert die.quantity(frozenset([2])) == 2
+    assert die.quantity(frozenset([3])) == 3
+    assert frozenset([9]) not in die
+
+
+def test_unrecognized_ordered_keys_use_hash_index():
+    counts = Counts([(icepool.Vector((i, -i)), i) for i in range(100)])
+    popped = counts.remove_min()
+    assert popped[icepool.Vector((50, -50))] == 50
+    assert icepool.Vector((0, 0)) not in popped
+    assert icepool.Vector((0, 0)) in counts
+    assert icepool.Vector((1000, 0)) not in popped
+    # Shared by both ranges and built once.
+    assert counts._store.hash_index is popped._store.hash_index is not None
+
+
+def test_nan_key_not_found():
+    assert float('nan') not in icepool.Die([1.0, 2.0])
+
+
+def test_range_equality_and_views():
+    counts = Counts([(i, i + 1) for i in range(10)])
+    popped = counts.remove_min().remove_max()
+    assert popped == Counts([(i, i + 1) for i in range(1, 9)])
+    assert popped.keys() == tuple(range(1, 9))
+    assert popped.values() == tuple(range(2, 10))
+    assert popped.items() == tuple((i, i + 1) for i in range(1, 9))
+    assert popped.keys() != tuple(range(0, 8))
+    assert popped.keys() == Counts([(i, 0) for i in range(1, 9)]).keys()
+
+
+def test_pickle_ranges_share_storage():
+    counts = Counts([(i, i + 1) for i in range(10)])
+    a = counts.remove_min()
+    b = a.remove_max()
+    a2, b2 = pickle.loads(pickle.dumps((a, b)))
+    assert a2 == a
+    assert b2 == b
+    assert a2._store.keys is b2._store.keys
+    small = b
+    for _ in range(6):
+        small = small.remove_min()
+    small2 = pickle.loads(pickle.dumps(small))
+    assert small2 == small
+    assert len(small2._store.keys) == len(small)
@@ -1,6 +1,11 @@
 import icepool
+import operator
 import pytest
 
+import concurrent.futures
+import pickle
+import weakref
+
 from icepool import d4, d6, d8, d10, d12, Pool, Vector
 from icepool.expression import multiset_function
 
@@ -172,3 +177,439 @@ def test_contains_subset_vs_intersection_size():
 def test_any():
     result = (d6.pool(1) & d6.pool(1)).any()
     assert result == (d6 == d6)
+
+
+@pytest.mark.parametrize('executor_type', [
+    concurrent.futures.ThreadPoolExecutor,
+    concurrent.futures.ProcessPoolExecutor
+])
+def test_evaluate_executor(executor_type):
+    generator = d6.explode_to_pool(4, depth=2).highest(3)
+    expected = generator.sum()
+    with executor_type(max_workers=2) as executor:
+        result = icepool.evaluator.SumEvaluator().evaluate(generator,
+                                                           executor=executor)
+    assert result.equals(expected)
+
+
+def test_evaluate_executor_expression():
+    expression = d6.reroll_to_pool(4, [1], 2) & Pool([d4, d6, d8])
+    expected = expression.sum()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        result = icepool.evaluator.SumEvaluator().evaluate(expression,
+                                                           executor=executor)
+    assert result.equals(expected)
+
+
+@pytest.mark.parametrize('obj', [
+    d6, icepool.Deck([1, 2, 2, 3]),
+    Pool([d4, d6]).highest(1),
+    icepool.evaluator.SumEvaluator({
+        1: 2,
+        2: 3
+    })
+])
+def test_pickle(obj):
+    result = pickle.loads(pickle.dumps(obj))
+    assert type(result) is type(obj)
+    if isinstance(obj, icepool.Population):
+        assert result.items() == obj.items()
+
+
+def test_evaluate_many_outcomes_without_recursion():
+    die = icepool.d(1500)
+    result = icepool.evaluator.LargestCountEvaluator().evaluate(
+        Pool([die, die]))
+    assert result.probability(2) == pytest.approx(1 / 1500)
+
+
+many_evaluators = [
+    icepool.evaluator.SumEvaluator(),
+    icepool.evaluator.LargestCountEvaluator(),
+    icepool.evaluator.LargestStraightEvaluator(),
+    icepool.evaluator.CountEvaluator(),
+    SumRerollIfAnyOnes(),
+]
+
+
+@pytest.mark.parametrize('pool', test_pools)
+def test_evaluate_many(pool):
+    results = icepool.evaluate_many(pool, evaluators=many_evaluators)
+    for result, evaluator in zip(results, many_evaluators):
+        assert result.equals(evaluator.evaluate(pool))
+
+
+def test_evaluate_many_expression():
+    expression = Pool([d6, d6, d8]) - Pool([d6])
+    evaluators = many_evaluators[:-1]
+    results = icepool.evaluate_many(expression, evaluators=evaluators)
+    for result, evaluator in zip(results, evaluators):
+        assert result.equals(evaluator.evaluate(expression))
+
+
+def test_evaluate_many_conflicting_orders():
+
+    class DescendingSum(icepool.evaluator.SumEvaluator):
+
+        def order(self):
+            return icepool.Order.Descending
+
+    class AscendingSum(icepool.evaluator.SumEvaluator):
+
+        def order(self):
+            return icepool.Order.Ascending
+
+    pool = Pool([d6, d8])
+    results = icepool.evaluate_many(
+        pool, evaluators=[DescendingSum(),
+                          AscendingSum(),
+                          icepool.evaluator.LargestCountEvaluator()])
+    assert results[0].equals(d6 + d8)
+    assert results[1].equals(d6 + d8)
+    assert results[2].equals(pool.largest_count())
+
+
+class ReachesTotal(icepool.MultisetEvaluator):
+    """Whether the sum of the outcomes reaches a threshold."""
+
+    def __init__(self, threshold):
+        self._threshold = threshold
+
+    def next_state(self, state, outcome, count):
+        return min((state or 0) + outcome * count, self._threshold)
+
+    def final_outcome(self, final_state):
+        return (final_state or 0) >= self._threshold
+
+    def order(self):
+        # Opposed to the cheaper direction for mixed standard dice, so that
+        # such pools use the algorithm that supports absorbing states.
+        return icepool.Order.Descending
+
+
+class ReachesTotalAbsorbing(ReachesTotal):
+
+    def is_absorbing(self, state):
+        return state >= self._threshold
+
+
+class ReachesTotalNeverAbsorbing(ReachesTotal):
+
+    def is_absorbing(self, state):
+        return False
+
+
+@pytest.mark.parametrize('pool', test_pools)
+def test_absorbing_same_result(pool):
+    expected = ReachesTotal(12).evaluate(pool)
+    result = ReachesTotalAbsorbing(12).evaluate(pool)
+    assert result.equals(expected)
+
+
+def test_absorbing_precision():
+    pool = Pool([d4, d6, d8, d10, d12] * 2)
+    expected = ReachesTotal(20).evaluate(pool)
+    icepool.set_precision('float64')
+    try:
+        result = ReachesTotalAbsorbing(20).evaluate(pool)
+    finally:
+        icepool.set_precision(None)
+    assert result.probability(True) == pytest.approx(
+        expected.probability(True))
+
+
+def test_absorbing_skips_states():
+    pool = Pool([d4, d6, d8, d10, d12] * 2)
+    with icepool.instrument() as recorder:
+        ReachesTotal(12).evaluate(pool)
+        ReachesTotalAbsorbing(12).evaluate(pool)
+    full, absorbing = recorder.metrics
+    assert full.algorithm == '_eval_internal_iterative'
+    assert absorbing.algorithm == '_eval_internal_iterative'
+    assert absorbing.transitions < full.transitions
+
+
+def test_absorbing_keeps_preferred_algorithm():
+    pool = Pool([d12] * 10)
+    with icepool.instrument() as recorder:
+        ReachesTotalAbsorbing(12).evaluate(pool)
+        (pool & Pool([d12] * 3)).any()
+    for metrics in recorder.metrics:
+        assert metrics.algorithm == '_eval_internal'
+
+
+class AtLeastTwoHighEvaluator(icepool.evaluator.AnyEvaluator):
+    """Whether at least two outcomes are 5 or more."""
+
+    def next_state(self, state, outcome, count):
+        return (state or 0) + (count if outcome >= 5 else 0)
+
+    def final_outcome(self, final_state):
+        return (final_state or 0) >= 2
+
+
+def test_absorbing_not_inherited_by_next_state_override():
+    evaluator = AtLeastTwoHighEvaluator()
+    assert not evaluator._can_absorb()
+    pool = Pool([d6] * 3)
+    expected = icepool.Die({False: 160, True: 56})
+    assert evaluator.evaluate(pool).equals(expected)
+    # The iterative algorithm must not stop at a tally of 1.
+    alignment = icepool.generator.alignment.Alignment(())
+    dist = evaluator._eval_internal_iterative(icepool.Order.Descending,
+                                              alignment, (pool, ))
+    assert sum(weight for state, weight in dist.items() if state >= 2) == 56
+
+
+def test_absorbing_comparison():
+    a = Pool([d6] * 6)
+    b = Pool([d6] * 3)
+    assert icepool.evaluator.IsSubsetEvaluator()._can_absorb()
+    assert b.issubset(a).equals(icepool.evaluator.IsSubsetEvaluator().evaluate(
+        b, a))
+    assert (a & b).any().equals(
+        icepool.map(lambda x, y: bool(set(x) & set(y)), a.expand(),
+                    b.expand()))
+
+
+def test_absorbing_joint_and_expression():
+    joint = icepool.evaluator.JointEvaluator(ReachesTotalAbsorbing(8),
+                                             ReachesTotal(8))
+    assert not joint._can_absorb()
+    joint = icepool.evaluator.JointEvaluator(ReachesTotalAbsorbing(8),
+                                             ReachesTotalAbsorbing(10))
+    assert joint._can_absorb()
+    pool = Pool([d6] * 4)
+    expected = icepool.evaluator.JointEvaluator(ReachesTotal(8),
+                                                ReachesTotal(10)).evaluate(pool)
+    assert joint.evaluate(pool).equals(expected)
+    expression = pool.keep_counts_ge(2)
+    assert ReachesTotalAbsorbing(8).evaluate(expression).equals(
+        ReachesTotal(8).evaluate(expression))
+
+
+class UnbucketedSumEvaluator(icepool.evaluator.SumEvaluator):
+    outcome_key = icepool.MultisetEvaluator.outcome_key
+
+
+def test_bucket_sum_map():
+    pool = Pool([d6, d8, d8, d12])
+    mapping = lambda x: x // 4
+    evaluator = icepool.evaluator.SumEvaluator(mapping)
+    buckets = evaluator._bucket_generators((pool, ))[0]
+    assert buckets.outcomes() == (1, 4, 8, 12)
+    assert evaluator.evaluate(pool).equals(
+        UnbucketedSumEvaluator(mapping).evaluate(pool))
+
+
+def test_bucket_not_applied_with_keep():
+    pool = Pool([d6, d8, d8, d12]).highest(2)
+    evaluator = icepool.evaluator.SumEvaluator(lambda x: x // 4)
+    assert evaluator._bucket_generators((pool, )) == (pool, )
+    assert evaluator.evaluate(pool).equals(
+        UnbucketedSumEvaluator(lambda x: x // 4).evaluate(pool))
+
+
+def test_bucket_success_count():
+    pool = icepool.d(100).pool(20)
+    with icepool.instrument() as recorder:
+        result = pool.keep_outcomes(lambda x: x >= 90).count()
+    assert set(recorder.metrics[0].states_per_outcome) == {1, 90}
+    assert result.equals(20 @ icepool.Die({0: 89, 1: 11}))
+
+
+def test_bucket_expression_not_applied():
+    pool = icepool.d(10).pool(4)
+    evaluator = icepool.evaluator.ExpressionEvaluator(
+        pool.unique(), evaluator=icepool.evaluator.CountEvaluator())
+    assert not evaluator._can_bucket()
+    assert evaluator.evaluate().equals(pool.unique().count())
+
+
+def test_bucket_deal():
+    deck = icepool.Deck(range(1, 14), times=4)
+    deal = deck.deal(5)
+    values = {outcome: min(outcome, 10) for outcome in range(1, 14)}
+    evaluator = icepool.evaluator.SumEvaluator(values)
+    bucketed, = evaluator._bucket_generators((deal, ))
+    assert len(bucketed.outcomes()) == 10
+    assert bucketed.denominator() == deal.denominator()
+    assert evaluator.evaluate(deal).equals(
+        UnbucketedSumEvaluator(values).evaluate(deal))
+
+
+class CountHighEvaluator(icepool.evaluator.CountEvaluator):
+
+    def next_state(self, state, outcome, count):
+        return (state or 0) + (count if outcome >= 5 else 0)
+
+
+class AnyHighEvaluator(icepool.evaluator.AnyEvaluator):
+
+    def next_state(self, state, outcome, count):
+        return state or (outcome >= 5 and count > 0)
+
+
+def test_bucket_not_inherited_by_next_state_override():
+    assert not CountHighEvaluator()._can_bucket()
+    assert not AnyHighEvaluator()._can_bucket()
+    pool = icepool.d6.pool(2)
+    assert CountHighEvaluator().evaluate(pool).equals(
+        icepool.Die({
+            0: 16,
+            1: 16,
+            2: 4
+        }))
+    assert AnyHighEvaluator().evaluate(pool).equals(
+        icepool.Die({
+            False: 16,
+            True: 20
+        }))
+
+
+class UnfoldedSumEvaluator(icepool.evaluator.SumEvaluator):
+    fold_operator = icepool.MultisetEvaluator.fold_operator
+
+
+class UnionEvaluator(icepool.MultisetEvaluator):
+    """The set of outcomes with positive count."""
+
+    def next_state(self, state, outcome, count):
+        if count > 0:
+            return (state or frozenset()) | {outcome}
+        return state or frozenset()
+
+    def final_outcome(self, final_state):
+        return tuple(sorted(final_state))
+
+    def order(self):
+        return icepool.Order.Any
+
+
+class FoldUnionEvaluator(UnionEvaluator):
+
+    def fold_operator(self):
+        return operator.or_
+
+
+@pytest.mark.parametrize('pool', [
+    d6.pool(5),
+    Pool([d6, d8, d8, d12]),
+    Pool([d6, -d8, icepool.Die([0, 10, 100])]),
+])
+def test_fold_sum(pool):
+    evaluator = icepool.evaluator.SumEvaluator()
+    assert evaluator._select_direct_algorithm((pool, )) is not None
+    assert evaluator.evaluate(pool).equals(
+        UnfoldedSumEvaluator().evaluate(pool))
+
+
+def test_fold_sum_map():
+    pool = Pool([d6, d8, d8])
+    mapping = {x: x * x for x in range(1, 9)}
+    assert pool.sum(mapping).equals(UnfoldedSumEvaluator(mapping).evaluate(pool))
+
+
+@pytest.mark.parametrize('pool', [d6.pool(1), Pool([d6, d8])])
+def test_fold_sum_bool_map(pool):
+    evaluator = icepool.evaluator.SumEvaluator(_greater_than_three)
+    expected = UnfoldedSumEvaluator(_greater_than_three).evaluate(pool)
+    result = evaluator.evaluate(pool)
+    assert result.equals(expected)
+    assert all(type(outcome) is int for outcome in result)
+
+
+def _greater_than_three(outcome):
+    return outcome > 3
+
+
+def test_fold_not_applied_with_keep():
+    evaluator = icepool.evaluator.SumEvaluator()
+    assert evaluator._select_direct_algorithm(
+        (d6.pool(5).highest(3), )) is None
+    assert evaluator._select_direct_algorithm((d6.pool([2, 1, 1]), )) is None
+
+
+def test_fold_count_any():
+    pool = Pool([d6, d8, d8])
+    assert pool.count().simplify().equals(icepool.Die([3]))
+    assert pool.any().simplify().equals(icepool.Die([True]))
+
+
+def test_fold_precision():
+    pool = Pool([d6] * 30)
+    expected = UnfoldedSumEvaluator().evaluate(pool)
+    icepool.set_precision('float64')
+    try:
+        result = pool.sum()
+    finally:
+        icepool.set_precision(None)
+    assert result.probability(105) == pytest.approx(expected.probability(105))
+
+
+def test_fold_custom_operator():
+    pool = Pool([d6, d6, d6, icepool.Die([1, 7])])
+    assert FoldUnionEvaluator().evaluate(pool).equals(
+        UnionEvaluator().evaluate(pool))
+
+
+def test_fold_not_applied_to_sequences():
+    result = Pool([icepool.Die(['a', 'b'])] * 2).sum()
+    assert result.equals(icepool.Die({'aa': 1, 'ab': 2, 'bb': 1}))
+    pool = Pool([icepool.Die([(1, ), (2, )])] * 2)
+    evaluator = icepool.evaluator.SumEvaluator()
+    assert evaluator._select_direct_algorithm((pool, )) is None
+
+
+class DoubleSumEvaluator(icepool.evaluator.SumEvaluator):
+
+    def next_state(self, state, outcome, count):
+        return super().next_state(state, outcome * 2, count)
+
+
+def test_fold_not_inherited_by_next_state_override():
+    evaluator = DoubleSumEvaluator()
+    assert not evaluator._can_fold()
+    assert evaluator.evaluate(d6.pool(2)).equals(2 * (2 @ d6))
+
+
+class _LastCount():
+    """A state that can be tracked by weak references."""
+
+    def __init__(self, outcome, count):
+        self.key = (outcome, count)
+
+    def __eq__(self, other):
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+
+class LastCountEvaluator(icepool.MultisetEvaluator):
+    """The count of the last outcome. Each outcome gets distinct states."""
+
+    def __init__(self, alive, **kwargs):
+        super().__init__(**kwargs)
+        self._alive = alive
+        self.peak = 0
+
+    def next_state(self, state, outcome, count):
+        state = _LastCount(outcome, count)
+        self._alive.add(state)
+        self.peak = max(self.peak, len(self._alive))
+        return state
+
+    def final_outcome(self, final_state):
+        return final_state.key[1]
+
+
+def test_eval_internal_releases_subresults():
+    pool = icepool.d(30).pool(8)
+    evaluator = LastCountEvaluator(weakref.WeakSet(),
+                                   cache=icepool.LRUCache(1))
+    result = evaluator.evaluate(pool)
+    assert result.equals(LastCountEvaluator(weakref.WeakSet()).evaluate(pool))
+    # Only a few outcomes' worth of subresults are alive at once, rather than
+    # one for each subproblem.
+    assert evaluator.peak < 50
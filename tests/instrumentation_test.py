@@ -0,0 +1,103 @@
+import icepool
+import pytest
+
+from icepool import Order
+
+
+@pytest.fixture(autouse=True)
+def cold_caches():
+    icepool.MultisetEvaluator.clear_interned_caches()
+
+
+def test_instrument_records_evaluation():
+    evaluator = icepool.evaluator.SumEvaluator()
+    with icepool.instrument() as recorder:
+        result = evaluator.evaluate(icepool.d(6).pool(4).highest(2))
+    assert result == icepool.d(6).highest(4, 2)
+    assert len(recorder.metrics) == 1
+    metrics = recorder.metrics[0]
+    assert metrics.algorithm == '_eval_internal'
+    assert metrics.order == Order.Ascending
+    assert metrics.pop_min_cost is not None
+    assert metrics.pop_max_cost is not None
+    assert set(metrics.states_per_outcome) == {1, 2, 3, 4, 5, 6}
+    assert metrics.transitions > 0
+    assert metrics.cache_misses > 0
+    assert set(metrics.phase_times) == set(icepool.instrumentation.PHASES)
+    assert metrics.wall_time >= sum(metrics.phase_times.values())
+
+
+def test_instrument_cache_hits():
+    evaluator = icepool.evaluator.SumEvaluator()
+    pool = icepool.d(6).pool(4).highest(3)
+    with icepool.instrument() as recorder:
+        evaluator.evaluate(pool)
+        evaluator.evaluate(pool)
+    first, second = recorder.metrics
+    assert first.cache_hits < first.cache_misses
+    assert second.cache_hits == 1
+    assert second.cache_misses == 0
+    assert second.cache_hit_rate == 1.0
+
+
+class AscendingSumEvaluator(icepool.MultisetEvaluator):
+
+    def next_state(self, state, outcome, count):
+        return (state or 0) + outcome * count
+
+    def order(self):
+        return Order.Ascending
+
+
+@pytest.mark.parametrize('pool', [
+    icepool.Pool([icepool.d(6)] * 20).highest(1),
+    icepool.Pool([icepool.d(6)] * 20).lowest(1)
+])
+def test_instrument_algorithm(pool):
+    evaluator = AscendingSumEvaluator()
+    expected, _ = evaluator._select_algorithm(pool)
+    with icepool.instrument() as recorder:
+        evaluator.evaluate(pool)
+    metrics = recorder.metrics[0]
+    assert metrics.algorithm == expected.__name__
+    assert metrics.order == Order.Ascending
+    assert metrics.transitions > 0
+    assert set(metrics.states_per_outcome) == {1, 2, 3, 4, 5, 6}
+
+
+def test_instrument_off():
+    with icepool.instrument() as recorder:
+        pass
+    icepool.d(6).pool(3).sum()
+    assert recorder.metrics == []
+    assert icepool.instrumentation.current() is None
+
+
+def test_evaluation_callback():
+    calls = []
+    icepool.add_evaluation_callback(calls.append)
+    try:
+        icepool.d(6).pool(3).sum()
+    finally:
+        icepool.remove_evaluation_callback(calls.append)
+    icepool.d(6).pool(3).sum()
+    assert len(calls) == 1
+    data = calls[0].to_dict()
+    assert data['evaluator'] == 'SumEvaluator'
+    assert data['generators'] == ['Pool']
+    assert data['algorithm'] == '_eval_fold'
+    assert data['order'] == 'Ascending'
+
+
+def test_evaluation_callback_not_called_on_error():
+
+    class BadEvaluator(icepool.MultisetEvaluator):
+
+        def next_state(self, state, outcome, count):
+            raise ZeroDivisionError()
+
+    with icepool.instrument() as recorder:
+        with pytest.raises(ZeroDivisionError):
+            BadEvaluator().evaluate(icepool.d(6).pool(3))
+    assert recorder.metrics == []
+    assert icepool.instrumentation.current() is None
@@ -1,7 +1,7 @@
 import icepool
 import pytest
 
-from icepool import d4, d6, d8, d10, d12, Pool, Die, Deck
+from icepool import d4, d6, d8, d10, d12, d20, Pool, Die, Deck
 
 max_tuple_length = 5
 max_num_values = 5
@@ -250,3 +250,89 @@ def test_keep_expression_both_negative():
     result = Deck([0, 10, 20, 30, 40]).deal(5)[-4:-1].sum()
     expected = Die([60])
     assert result == expected
+
+
+def test_pool_pop_merges_identical_popped_dice():
+    # Both dice become 2..6 after popping 1.
+    a = d6
+    b = icepool.Die([1, 1, 2, 3, 4, 5, 6])
+    pool = Pool([a] * 3 + [b] * 4)
+    transitions = list(pool._generate_min(1))
+    assert len(transitions) == 8
+    assert sum(weight * popped.denominator()
+               for popped, _, weight in transitions) == pool.denominator()
+    result = pool.lowest(2).sum()
+    expected = icepool.lowest(*([a] * 3 + [b] * 4), keep=2)
+    assert result.equals(expected)
+
+
+order_statistic_pools = [
+    Pool([d6] * 7),
+    Pool([d4, d6, d6, d8, d12]),
+    Pool([-d4, d6, Die([1, 3, 9])]),
+    Pool([Die({1: 2, 5: 0, 6: 1})] * 4),
+]
+
+
+@pytest.mark.parametrize('pool', order_statistic_pools)
+def test_order_statistic(pool):
+    for i in range(len(pool.keep_tuple())):
+        expected = icepool.evaluator.sum_evaluator.evaluate(pool[i:i + 1])
+        assert pool[i].equals(expected)
+        assert icepool.evaluator.KeepEvaluator(i).evaluate(pool).equals(
+            expected)
+        assert icepool.evaluator.KeepEvaluator(i - len(
+            pool.keep_tuple())).evaluate(pool).equals(expected)
+
+
+def test_order_statistic_skips_generation():
+    with icepool.instrument() as recorder:
+        d20.pool(9)[4]
+    assert recorder.metrics[0].algorithm == '_eval_order_statistic'
+    assert recorder.metrics[0].transitions == 0
+
+
+def test_order_statistic_precision():
+    pool = Pool([d6, d8, d10, d12] * 5)
+    expected = pool[9]
+    icepool.set_precision('float64')
+    try:
+        result = Pool([d6, d8, d10, d12] * 5)[9]
+    finally:
+        icepool.set_precision(None)
+    assert result.probability(5) == pytest.approx(expected.probability(5))
+
+
+def test_middle_single():
+    assert d6.middle(5).equals(d6.pool(5).middle(1).sum())
+    pool = Pool([d6, d8, d10, d12])
+    expected = pool.middle(1, tie='high').sum()
+    assert icepool.middle(d6, d8, d10, d12, tie='high').equals(expected)
+
+
+def random_die(rng, allow_zero):
+    outcomes = rng.sample(range(-2, 9), rng.randint(1, 4))
+    low = 0 if allow_zero else 1
+    quantities = [rng.randint(low, 3) for _ in outcomes]
+    if not any(quantities):
+        quantities[0] = 1
+    return Die(dict(zip(outcomes, quantities)))
+
+
+@pytest.mark.parametrize('allow_zero', [False, True])
+def test_order_statistic_matches_popping(allow_zero):
+    import random
+    rng = random.Random(2024)
+    for _ in range(100):
+        pool = Pool(
+            [random_die(rng, allow_zero) for _ in range(rng.randint(1, 5))])
+        size = len(pool.keep_tuple())
+        for i in range(size):
+            expected = icepool.evaluator.sum_evaluator.evaluate(pool[i:i + 1])
+            assert pool[i].equals(expected)
+
+
+def test_order_statistic_not_applied_with_zero_quantities():
+    pool = Pool([Die({1: 2, 5: 0, 6: 1})] * 3)
+    evaluator = icepool.evaluator.KeepEvaluator(1)
+    assert evaluator._select_direct_algorithm((pool, )) is None
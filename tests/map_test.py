@@ -177,3 +177,95 @@ def test_fractional_coin():
 def test_stochastic_round():
     assert ((6 @ d6) / 2).stochastic_round().mean() == 10.5
     assert ((6 @ d6) / Fraction(3)).stochastic_round().mean() == 7
+
+
+def test_map_infinite_absorbing_initial():
+
+    def repl(x):
+        if x >= 3:
+            return x
+        return x + Die([1, 2])
+
+    result = Die([0, 5]).map(repl, repeat=None)
+    expected = Die([0, 5]).map(repl, repeat=10)
+    assert result.equals(expected.simplify())
+
+
+def test_map_infinite_countdown():
+
+    def repl(x):
+        if x <= 0:
+            return x
+        return x - d6
+
+    result = Die([100]).map(repl, repeat=None)
+    expected = Die([100]).map(repl, repeat=100)
+    assert result.equals(expected.simplify())
+
+
+def test_solve_sparse():
+    from icepool.population.markov_chain import solve_sparse
+    # 2x + y = 5, x - y + 2z = 3, 3y + z = 7
+    rows = {
+        'x': {
+            'x': 2,
+            'y': 1
+        },
+        'y': {
+            'x': 1,
+            'y': -1,
+            'z': 2
+        },
+        'z': {
+            'y': 3,
+            'z': 1
+        },
+    }
+    result = solve_sparse(rows, {'x': 5, 'y': 3, 'z': 7})
+    assert 2 * result['x'] + result['y'] == 5
+    assert result['x'] - result['y'] + 2 * result['z'] == 3
+    assert 3 * result['y'] + result['z'] == 7
+
+
+def test_solve_sparse_singular():
+    from icepool.population.markov_chain import solve_sparse
+    rows = {'x': {'x': 1, 'y': 1}, 'y': {'x': 2, 'y': 2}}
+    with pytest.raises(ValueError):
+        solve_sparse(rows, {'x': 1, 'y': 2})
+
+
+def test_strongly_connected_components():
+    from icepool.population.markov_chain import strongly_connected_components
+    transients = {
+        0: Die([1, 2]),
+        1: Die([0, 3]),
+        2: Die([3, 4]),
+        3: Die([5]),
+        4: Die([4, 2]),
+    }
+    components = strongly_connected_components(transients)
+    assert sorted(sorted(c) for c in components) == [[0, 1], [2, 4], [3]]
+    position = {s: i for i, c in enumerate(components) for s in c}
+    for src, transition in transients.items():
+        for dst in transition.outcomes():
+            if dst in position:
+                assert position[src] <= position[dst]
+
+
+def test_map_infinite_mixed_components():
+    # Accumulate a total, but each step there is a chance to fall back a bit.
+    def repl(x):
+        if x >= 20:
+            return x
+        if x % 5 == 4:
+            return Die([x + 1, x - 2])
+        return x + Die([1, 2, 3])
+
+    result = Die([0]).map(repl, repeat=None)
+    assert tuple(result.outcomes()) == (20, 21)
+    assert result.denominator() > 0
+    # Compare with a long finite repeat.
+    approximate = Die([0]).map(repl, repeat=400)
+    for outcome in result.outcomes():
+        assert result.probability(outcome) == pytest.approx(
+            approximate.probability(outcome))
@@ -0,0 +1,87 @@
+import icepool
+import concurrent.futures
+import pytest
+import threading
+
+from icepool import d6, d8, d10, d20, Pool
+
+
+@pytest.fixture
+def float64():
+    icepool.set_precision('float64')
+    yield
+    icepool.set_precision(None)
+
+
+def assert_close(result, expected, tolerance=1e-12):
+    assert result.outcomes() == expected.outcomes()
+    for outcome in expected.outcomes():
+        assert result.probability(outcome) == pytest.approx(
+            expected.probability(outcome), abs=tolerance)
+
+
+exact_cases = {
+    'sum_all': lambda: 60 @ d20,
+    'add': lambda: (20 @ d6) + (20 @ d10),
+    'matmul': lambda: d6 @ (d20 @ d10),
+    'highest_single': lambda: d20.highest(40),
+    'lowest_single': lambda: icepool.lowest(d6, d8, d10, d20),
+    'pool_sum': lambda: Pool([d6] * 20 + [d8] * 10).highest(5).sum(),
+    'pool_descending': lambda: Pool([d10] * 30).lowest(3).sum(),
+    'mixture': lambda: d6.explode_to_pool(10, depth=3).highest(4).sum(),
+}
+
+
+@pytest.mark.parametrize('name', exact_cases.keys())
+def test_precision_matches_exact(name, float64):
+    icepool.set_precision(None)
+    expected = exact_cases[name]()
+    icepool.set_precision('float64')
+    result = exact_cases[name]()
+    assert_close(result, expected)
+    assert result.denominator().bit_length() <= 64
+
+
+def test_precision_preserves_tiny_outcomes(float64):
+    result = d20.highest(100)
+    assert result.quantity(1) > 0
+
+
+def test_precision_cached_separately():
+    die = icepool.d(30)
+    exact = die._sum_all(40)
+    icepool.set_precision(16)
+    try:
+        approximate = die._sum_all(40)
+    finally:
+        icepool.set_precision(None)
+    assert die._sum_all(40) is exact
+    assert approximate.denominator() < exact.denominator()
+
+
+def test_precision_invalid():
+    with pytest.raises(ValueError):
+        icepool.set_precision(0)
+
+
+def test_worker_precision_is_thread_local():
+    from icepool.evaluator.multiset_evaluator import _call_with_precision
+    started = threading.Event()
+    release = threading.Event()
+
+    def task():
+        started.set()
+        release.wait(timeout=10)
+        return icepool.get_precision()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        future = executor.submit(_call_with_precision, 20, task)
+        started.wait(timeout=10)
+        try:
+            # The worker's precision does not leak into other threads.
+            assert icepool.get_precision() is None
+            assert executor.submit(icepool.get_precision).result() is None
+        finally:
+            release.set()
+        assert future.result() == 20
+    assert icepool.get_precision() is None
@@ -1,4 +1,6 @@
 import icepool
+import math
+import random
 
 
 def test_die_sample():
@@ -22,3 +24,66 @@ def test_deal_sample():
     a, b = icepool.Deck({'A': 1, 'B': 2, 'C': 3}).deal(3, 2).sample()
     assert all(x in ['A', 'B', 'C'] for x in a)
     assert all(x in ['A', 'B', 'C'] for x in b)
+
+
+def test_die_sample_batch_seeded():
+    a = icepool.d6.sample(100, rng=random.Random(0))
+    b = icepool.d6.sample(100, rng=random.Random(0))
+    assert a == b
+    assert len(a) == 100
+    assert set(a) <= set(range(1, 7))
+
+
+def test_generator_sample_seeded():
+    pool = icepool.d6.explode_to_pool(4, depth=2)
+    a = pool.sample(rng=random.Random(0))
+    b = pool.sample(rng=random.Random(0))
+    assert a == b
+
+
+def assert_sample_mean(samples, expected):
+    mean = sum(samples) / len(samples)
+    sd = float(expected.sd()) / math.sqrt(len(samples))
+    assert abs(mean - float(expected.mean())) < 5 * sd
+
+
+def test_evaluator_sample_pool():
+    pool = icepool.Pool([icepool.d6, icepool.d6, icepool.d8, icepool.d10])
+    samples = icepool.evaluator.sum_evaluator.sample(pool.highest(2),
+                                                     n=2000,
+                                                     rng=random.Random(0))
+    assert_sample_mean(samples, pool.highest(2).sum())
+
+
+def test_evaluator_sample_expression():
+    expression = icepool.d6.pool(4) & icepool.d6.pool(4)
+    samples = icepool.evaluator.count_evaluator.sample(expression,
+                                                       n=2000,
+                                                       rng=random.Random(0))
+    assert_sample_mean(samples, expression.count())
+
+
+def test_evaluator_sample_mixture():
+    pool = icepool.d6.explode_to_pool(3, depth=2)
+    samples = icepool.evaluator.sum_evaluator.sample(pool,
+                                                     n=2000,
+                                                     rng=random.Random(0))
+    assert_sample_mean(samples, pool.sum())
+
+
+class SumRerollIfAnyOnes(icepool.MultisetEvaluator):
+
+    def next_state(self, state, outcome, count):
+        if outcome == 1 and count > 0:
+            return icepool.Reroll
+        return (state or 0) + outcome * count
+
+    def order(self):
+        return 0
+
+
+def test_evaluator_sample_reroll():
+    samples = SumRerollIfAnyOnes().sample(icepool.d6.pool(3),
+                                          n=200,
+                                          rng=random.Random(0))
+    assert min(samples) >= 6
@@ -55,3 +55,61 @@ def test_percent():
     assert die.probability_lt(4, percent=True) == die.probability_lt(4) * 100.0
     assert die.probability_ge(4, percent=True) == die.probability_ge(4) * 100.0
     assert die.probability_gt(4, percent=True) == die.probability_gt(4) * 100.0
+
+
+fast_dice = [
+    icepool.d6, icepool.d20 - 7, 3 @ icepool.d6,
+    icepool.d10.explode(depth=2),
+    Die({
+        1: 3,
+        4: 0,
+        9: 5
+    })
+]
+
+
+@pytest.mark.parametrize('die', fast_dice)
+def test_fast_moments(die):
+    assert die.fast.mean() == pytest.approx(float(die.mean()))
+    assert die.fast.variance() == pytest.approx(float(die.variance()))
+    assert die.fast.sd() == pytest.approx(die.sd())
+    assert die.fast.skewness() == pytest.approx(die.skewness(), abs=1e-12)
+    assert die.fast.excess_kurtosis() == pytest.approx(die.excess_kurtosis())
+    assert die.fast.entropy() == pytest.approx(die.entropy())
+
+
+@pytest.mark.parametrize('die', fast_dice)
+def test_fast_probabilities(die):
+    assert list(die.fast.probabilities()) == pytest.approx(
+        [float(p) for p in die.probabilities()])
+    assert list(die.fast.probabilities_le()) == pytest.approx(
+        [float(p) for p in die.probabilities_le()])
+    assert list(die.fast.probabilities_ge()) == pytest.approx(
+        [float(p) for p in die.probabilities_ge()])
+
+
+@pytest.mark.parametrize('a', fast_dice)
+@pytest.mark.parametrize('b', fast_dice)
+def test_fast_cdf_distances(a, b):
+    assert a.fast.kolmogorov_smirnov(b) == pytest.approx(
+        float(a.kolmogorov_smirnov(b)))
+    assert a.fast.cramer_von_mises(b) == pytest.approx(
+        float(a.cramer_von_mises(b)))
+
+
+def test_fast_probabilities_ge_tail():
+    die = icepool.d6.pool(30).sum()
+    tail = die.fast.probabilities_ge()[-1]
+    assert tail > 0.0
+    assert tail == pytest.approx(float(die.probabilities_ge()[-1]), rel=1e-12)
+
+
+@pytest.mark.parametrize('method', [
+    'outcomes', 'probabilities', 'probabilities_le', 'probabilities_ge'
+])
+def test_fast_results_are_copies(method):
+    die = icepool.d6 + icepool.d8
+    expected = list(getattr(die.fast, method)())
+    result = getattr(die.fast, method)()
+    result[0] = -1.0
+    assert list(getattr(die.fast, method)()) == expected